@@ -0,0 +1,171 @@
+"""Provides headless batch generation of environments for parameter sweeps.
+
+Every instance of the sweep is generated in its own worker process and
+written as a .lp file (optionally with a PNG). An index.csv manifest lists
+all instances with their parameters, status and generation time.
+
+Example usage:
+    import batch_gen
+
+    params = files.load_params()
+    manifest = batch_gen.gen_batch(params, {'seed': [1, 2, 3], 'agents': [4, 8]})
+"""
+
+import os
+import time
+import itertools
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+from PIL import Image
+
+from code.build_png import calc_resolution
+from code.files import ensure_directory, save_env
+from code.gen_png import generate_env, new_gen_state
+from code.native_render import render_image, env_agents, native_cell_size
+
+
+def build_jobs(params, sweep):
+    """Builds the parameters of every instance in a sweep.
+
+    Args:
+        params (dict): Base user parameters.
+        sweep (dict): Lists of values by parameter name, combined as a cartesian product.
+
+    Returns:
+        list[tuple[str, dict]]: Name and parameters of every instance.
+    """
+    keys = list(sweep)
+    jobs = []
+    for index, values in enumerate(itertools.product(*(sweep[key] for key in keys))):
+        env_params = dict(params)
+        env_params.update(zip(keys, values))
+        name = (f"{index:04d}_{env_params['rows']}x{env_params['cols']}"
+                f"_a{env_params['agents']}_s{env_params['seed']}")
+        jobs.append((name, env_params))
+    return jobs
+
+
+def generate_instance(name, env_params, out_dir, png=False):
+    """Generates one instance and saves it.
+
+    Runs in a worker process, errors are reported in the result.
+
+    Args:
+        name (str): File name of the instance without extension.
+        env_params (dict): Parameters of the instance.
+        out_dir (str): Output directory.
+        png (bool): Flag for saving a PNG next to the .lp file.
+
+    Returns:
+        dict: Manifest entry of the instance.
+    """
+    entry = {
+        'name': name,
+        'status': 'ok',
+        'error': '',
+        'seconds': 0.0,
+        'lp': os.path.join(out_dir, f"{name}.lp"),
+        'png': '',
+        'rows': env_params['rows'],
+        'cols': env_params['cols'],
+        'agents': env_params['agents'],
+        'cities': env_params['cities'],
+        'seed': env_params['seed'],
+        'trains': 0,
+        'attempts': 0,
+    }
+    state = new_gen_state(parallel_retries=False)  # Already in a worker of the batch pool
+    start = time.perf_counter()
+    try:
+        with warnings.catch_warnings():
+            warnings.filterwarnings("ignore", category=UserWarning)
+            env, tracks, trains = generate_env(env_params, state)
+        save_env(tracks, trains, env_params, entry['lp'])
+        entry['rows'], entry['cols'] = env.height, env.width
+        entry['trains'] = len(trains)
+        if png:
+            entry['png'] = os.path.join(out_dir, f"{name}.png")
+            screen_res = calc_resolution(env_params['lowQuality'], tracks)
+            cell_size = native_cell_size(screen_res, env.height, env.width)
+            image = render_image(tracks, env_agents(env), cell_size)
+            Image.fromarray(image).save(entry['png'], compress_level=1)
+    except Exception as e:
+        entry['status'] = 'error'
+        entry['error'] = f"{type(e).__name__}: {e}"
+    entry['seconds'] = round(time.perf_counter() - start, 3)
+    entry['attempts'] = sum(attempt['status'] != 'cancelled' for attempt in state['attempts'])
+    return entry
+
+
+def gen_batch(params, sweep, out_dir="data/batch", workers=None, png=False):
+    """Generates all instances of a sweep across a process pool.
+
+    Args:
+        params (dict): Base user parameters.
+        sweep (dict): Lists of values by parameter name.
+        out_dir (str): Output directory for the instances and the manifest.
+        workers (int, optional): Number of worker processes. Default is the CPU count.
+        png (bool): Flag for saving a PNG of every instance.
+
+    Returns:
+        pd.DataFrame: Manifest of all instances, also saved as index.csv.
+    """
+    ensure_directory(out_dir)
+    jobs = build_jobs(params, sweep)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs) or 1))
+    print(f"\nGenerating {len(jobs)} environment(s) with {workers} worker(s)...")
+
+    entries = []
+
+    def collect(entry, env_params):
+        # Swept parameters that are not part of the default columns
+        entry.update({key: env_params[key] for key in sweep if key not in entry})
+        entries.append(entry)
+        print_entry(entry, len(entries), len(jobs))
+
+    if workers == 1:
+        for name, env_params in jobs:
+            collect(generate_instance(name, env_params, out_dir, png), env_params)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(generate_instance, name, env_params, out_dir, png): env_params
+                       for name, env_params in jobs}
+            for future in as_completed(futures):
+                collect(future.result(), futures[future])
+
+    manifest = pd.DataFrame(entries, columns=manifest_columns(sweep))
+    manifest = manifest.sort_values('name').reset_index(drop=True)
+    manifest.to_csv(os.path.join(out_dir, "index.csv"), index=False)
+    failed = int((manifest['status'] != 'ok').sum())
+    if failed:
+        print(f"⚠️ {failed} of {len(jobs)} environment(s) could not be generated.")
+    print(f"✅ Batch saved in {out_dir}.")
+    return manifest
+
+
+def manifest_columns(sweep):
+    """Lists the manifest columns, followed by swept parameters not listed yet.
+
+    Args:
+        sweep (dict): Lists of values by parameter name.
+
+    Returns:
+        list[str]: Column names.
+    """
+    columns = ['name', 'status', 'error', 'seconds', 'lp', 'png',
+               'rows', 'cols', 'agents', 'cities', 'seed', 'trains', 'attempts']
+    return columns + [key for key in sweep if key not in columns]
+
+
+def print_entry(entry, done, total):
+    """Prints the progress of a batch.
+
+    Args:
+        entry (dict): Manifest entry of the finished instance.
+        done (int): Number of finished instances.
+        total (int): Number of instances.
+    """
+    status = "✅" if entry['status'] == 'ok' else f"❌ {entry['error']}"
+    print(f"> [{done}/{total}] {entry['name']} ({entry['seconds']}s) {status}")
@@ -0,0 +1,429 @@
+"""Provides batch solving of environment directories across a worker pool.
+
+Every environment is solved with the encodings of the user parameters in
+its own worker process, with an optional time limit per instance. A
+worker still busy after the time limit plus KILL_GRACE is stopped, since
+Clingo cannot interrupt grounding. The report lists status, solve time,
+optimization cost, makespan and validation results of every instance. It
+grows with every finished instance, so an interrupted batch resumes with
+the missing and failed ones.
+
+Example usage:
+    import batch_solve
+
+    params = files.load_params()
+    report = batch_solve.solve_batch(params, ['env'], workers=4, time_limit=60)
+"""
+
+import os
+import json
+import time
+import shutil
+import signal
+import hashlib
+import subprocess
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+
+from code.files import ensure_directory
+from code.pipeline import find_lp_files, run_instance
+
+REPORT_COLUMNS = [
+    'name', 'lp', 'status', 'error_code', 'error', 'rows', 'cols', 'trains',
+    'solve_seconds', 'total_seconds', 'cost', 'optimal', 'makespan', 'arrived',
+    'act_err', 'late', 'valid', 'config',
+]
+
+# Seconds an instance may exceed its time limit before its worker is stopped
+KILL_GRACE = 60
+
+# File in a worker directory naming the instance it solves
+RUNNING_FILE = "running.txt"
+
+
+def file_digest(path):
+    """Calculates the hash of a file's content.
+
+    Args:
+        path (str): Path of the file.
+
+    Returns:
+        str or None: Hex digest of the content, None if the file cannot be read.
+    """
+    try:
+        with open(path, 'rb') as file:
+            return hashlib.sha256(file.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def solve_config(params, time_limit):
+    """Calculates a hash of everything that changes the results of a batch.
+
+    Encodings count by path and content, so an edited encoding is solved again.
+
+    Args:
+        params (dict): User parameters.
+        time_limit (int or None): Seconds per instance.
+
+    Returns:
+        str: Short hex digest of encodings, Clingo options, answer and time limit.
+    """
+    config = {
+        'lpFiles': [[os.path.abspath(path), file_digest(path)] for path in params['lpFiles']],
+        'clingo': params['clingo'],
+        'clingoOptions': sorted(params['clingoOptions']),
+        'answer': params['answer'],
+        'malfunction': list(params['malfunction']),
+        'timeLimit': time_limit,
+    }
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()[:12]
+
+
+def report_entry(result, config):
+    """Converts the result of an instance into a report row.
+
+    Args:
+        result (dict): Result of pipeline.run_instance.
+        config (str): Hash of the batch configuration.
+
+    Returns:
+        dict: Report row.
+    """
+    cost = result.get('cost')
+    return {
+        'name': result['name'],
+        'lp': result['lp'],
+        'status': result['status'],
+        'error_code': result['error_code'],
+        'error': result['error'],
+        'rows': result.get('rows'),
+        'cols': result.get('cols'),
+        'trains': result['trains'],
+        'solve_seconds': result['timings'].get('solve'),
+        'total_seconds': result['timings']['total'],
+        'cost': " ".join(map(str, cost)) if cost else '',
+        'optimal': result.get('optimal', False),
+        'makespan': result.get('makespan'),
+        'arrived': result.get('arrived'),
+        'act_err': len(result.get('act_err_trains', [])),
+        'late': len(result.get('late_trains', [])),
+        'valid': result.get('valid', False),
+        'config': config,
+    }
+
+
+def stopped_entry(lp_file, status, error, config, seconds=None):
+    """Creates the report row of an instance without a result.
+
+    Args:
+        lp_file (str): Path of the environment .lp file.
+        status (str): Status of the instance.
+        error (str): Reason for the missing result.
+        config (str): Hash of the batch configuration.
+        seconds (float, optional): Seconds until the instance was stopped.
+
+    Returns:
+        dict: Report row.
+    """
+    result = {'name': os.path.splitext(os.path.basename(lp_file))[0], 'lp': lp_file,
+              'status': status, 'error_code': 0, 'error': error, 'trains': None,
+              'timings': {'total': seconds}}
+    return report_entry(result, config)
+
+
+def init_worker(work_dir):
+    """Gives a worker process its own working directory.
+
+    Simulations write temporary files to data/, which must not be shared
+    between workers. On POSIX, the worker also leads its own process group,
+    so that stopping it stops the Clingo processes it started.
+
+    Args:
+        work_dir (str): Directory for the working directories of all workers.
+    """
+    if hasattr(os, 'setpgrp'):
+        os.setpgrp()
+    path = os.path.join(work_dir, str(os.getpid()))
+    ensure_directory(os.path.join(path, "data"))
+    os.chdir(path)
+
+
+def solve_instance(lp_file, params, out_dir, time_limit, config):
+    """Solves one instance and returns its report row.
+
+    Runs in a worker process, errors are reported in the row. While it
+    runs, RUNNING_FILE in the working directory names the instance.
+
+    Args:
+        lp_file (str): Absolute path of the environment .lp file.
+        params (dict): User parameters with absolute lpFiles.
+        out_dir (str): Absolute output directory of the instance.
+        time_limit (int or None): Seconds after which Clingo stops solving.
+        config (str): Hash of the batch configuration.
+
+    Returns:
+        dict: Report row of the instance.
+    """
+    with open(RUNNING_FILE, 'w') as file:
+        file.write(lp_file)
+    try:
+        result = run_instance(lp_file, params, out_dir, time_limit=time_limit)
+    finally:
+        os.remove(RUNNING_FILE)
+    return report_entry(result, config)
+
+
+def kill_worker(pid):
+    """Kills a worker process together with the Clingo processes it started.
+
+    Args:
+        pid (int): Process ID of the worker.
+
+    Returns:
+        bool: False if the worker was already gone.
+    """
+    if hasattr(os, 'killpg'):
+        try:
+            os.killpg(pid, signal.SIGKILL)  # Workers lead their own process group
+        except OSError:
+            return False
+        return True
+    # Windows: kill the process tree
+    result = subprocess.run(["taskkill", "/F", "/T", "/PID", str(pid)], capture_output=True)
+    return result.returncode == 0
+
+
+def kill_workers(work_dir):
+    """Kills all workers that have a working directory, with their Clingo processes.
+
+    Args:
+        work_dir (str): Directory for the working directories of all workers.
+    """
+    pids = os.listdir(work_dir) if os.path.isdir(work_dir) else []
+    for pid in pids:
+        if pid.isdigit():
+            kill_worker(int(pid))
+
+
+def stop_overdue(work_dir, hard_limit):
+    """Stops the workers whose instance runs longer than the hard limit.
+
+    Args:
+        work_dir (str): Directory for the working directories of all workers.
+        hard_limit (int): Wall-clock seconds per instance.
+
+    Returns:
+        list[tuple[str, float]]: Absolute .lp files of the stopped instances and their seconds.
+    """
+    stopped = []
+    pids = os.listdir(work_dir) if os.path.isdir(work_dir) else []
+    for pid in pids:
+        marker = os.path.join(work_dir, pid, RUNNING_FILE)
+        try:
+            seconds = time.time() - os.path.getmtime(marker)
+            with open(marker) as file:
+                lp_file = file.read()
+        except OSError:
+            continue  # Idle worker
+        if not lp_file or seconds <= hard_limit:
+            continue
+        if not kill_worker(int(pid)):
+            continue  # Worker already gone
+        shutil.rmtree(os.path.join(work_dir, pid), ignore_errors=True)
+        stopped.append((lp_file, round(seconds, 3)))
+    return stopped
+
+
+def solve_parallel(lp_files, params, out, time_limit, config, work_dir, workers, collect):
+    """Solves instances across a process pool with a wall-clock limit per instance.
+
+    A worker running longer than the time limit plus KILL_GRACE is stopped
+    and its instance reported as timeout. This breaks the pool, so the
+    other unfinished instances start again in a new one.
+
+    Args:
+        lp_files (list[str]): Paths of the environment .lp files.
+        params (dict): User parameters with absolute lpFiles.
+        out (callable): Output directory of an .lp file.
+        time_limit (int or None): Seconds per instance.
+        config (str): Hash of the batch configuration.
+        work_dir (str): Directory for the working directories of all workers.
+        workers (int): Number of worker processes.
+        collect (callable): Receives every report row.
+
+    Returns:
+        bool: True if all instances are finished, False after a crashed worker.
+    """
+    hard_limit = time_limit + KILL_GRACE if time_limit else None
+    remaining = list(lp_files)
+    while remaining:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(work_dir,))
+        stopped = []
+        try:
+            futures = {pool.submit(solve_instance, os.path.abspath(lp_file), params,
+                                   out(lp_file), time_limit, config): lp_file
+                       for lp_file in remaining}
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, timeout=1, return_when=FIRST_COMPLETED)
+                for future in done:
+                    lp_file = futures[future]
+                    try:
+                        entry = future.result()
+                    except BrokenProcessPool:
+                        continue  # Started again or left for resuming
+                    except Exception as e:
+                        entry = stopped_entry(lp_file, 'error', f"{type(e).__name__}: {e}", config)
+                    entry['lp'] = lp_file
+                    collect(entry)
+                    remaining.remove(lp_file)
+                if hard_limit:
+                    stopped += stop_overdue(work_dir, hard_limit)
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+            if remaining:
+                # A broken or interrupted pool leaves workers and their Clingo processes running
+                kill_workers(work_dir)
+            shutil.rmtree(work_dir, ignore_errors=True)
+        if remaining and not stopped:
+            return False
+        lp_by_path = {os.path.abspath(lp_file): lp_file for lp_file in remaining}
+        for path, seconds in stopped:
+            if path in lp_by_path:
+                lp_file = lp_by_path[path]
+                collect(stopped_entry(lp_file, 'timeout', f"Stopped after {seconds}s", config, seconds))
+                remaining.remove(lp_file)
+    return True
+
+
+def load_report(path, config):
+    """Loads the rows of a previous run with the same configuration.
+
+    Args:
+        path (str): Path of the CSV report.
+        config (str): Hash of the batch configuration.
+
+    Returns:
+        pd.DataFrame: Finished rows, empty if there are none.
+    """
+    if not os.path.isfile(path):
+        return pd.DataFrame(columns=REPORT_COLUMNS)
+    # An interrupted write leaves an incomplete last line
+    report = pd.read_csv(path, on_bad_lines='skip', dtype={'cost': str, 'config': str})
+    same = report['config'] == config
+    if not same.all():
+        print(f"⚠️ {int((~same).sum())} result(s) of other settings in {path} are replaced.")
+    return report[same].drop_duplicates('lp', keep='last')
+
+
+def append_report(path, entry):
+    """Appends a report row to the CSV report.
+
+    Args:
+        path (str): Path of the CSV report.
+        entry (dict): Report row.
+    """
+    header = not os.path.isfile(path)
+    pd.DataFrame([entry], columns=REPORT_COLUMNS).to_csv(path, mode='a', header=header, index=False)
+
+
+def solve_batch(params, paths, out_dir="data/solve", workers=None, time_limit=None, parquet=False, fresh=False):
+    """Solves all environments across a process pool and saves a report.
+
+    Solved instances of a previous run with the same configuration are
+    skipped, unless fresh is set. Failed or stopped ones are solved again.
+
+    Args:
+        params (dict): User parameters, lpFiles are the encodings to solve with.
+        paths (list[str]): .lp files or directories containing them.
+        out_dir (str): Output directory for the instances and the report.
+        workers (int, optional): Number of worker processes. Default is the CPU count.
+        time_limit (int, optional): Seconds per instance. Instances then always
+            run in worker processes, so that they can be stopped.
+        parquet (bool): Flag for saving the report as Parquet next to the CSV.
+        fresh (bool): Flag for solving all instances again.
+
+    Returns:
+        pd.DataFrame: Report of all instances, also saved as report.csv.
+    """
+    ensure_directory(out_dir)
+    out_dir = os.path.abspath(out_dir)
+    report_path = os.path.join(out_dir, "report.csv")
+    config = solve_config(params, time_limit)
+    if fresh and os.path.isfile(report_path):
+        os.remove(report_path)
+    previous = load_report(report_path, config)
+    done = previous[previous['status'] == 'ok']
+    if len(done) < len(previous):
+        print(f"\nRetrying {len(previous) - len(done)} environment(s) that were not solved.")
+
+    # Workers run in their own directories, so all paths must be absolute
+    params = dict(params)
+    params['lpFiles'] = [os.path.abspath(path) for path in params['lpFiles']]
+    solved = set(done['lp'])
+    lp_files = [lp for lp in find_lp_files(paths) if lp not in solved]
+    total = len(lp_files) + len(done)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(lp_files) or 1))
+    if len(done):
+        print(f"\nResuming: {len(done)} of {total} environment(s) already solved.")
+    print(f"\nSolving {len(lp_files)} environment(s) with {workers} worker(s)...")
+
+    entries = done.to_dict('records')
+
+    def collect(entry):
+        append_report(report_path, entry)
+        entries.append(entry)
+        print_entry(entry, len(entries), total)
+
+    def out(lp_file):
+        return os.path.join(out_dir, os.path.splitext(os.path.basename(lp_file))[0])
+
+    try:
+        if workers == 1 and not time_limit:
+            for lp_file in lp_files:
+                result = run_instance(os.path.abspath(lp_file), params, out(lp_file), time_limit=time_limit)
+                result['lp'] = lp_file
+                collect(report_entry(result, config))
+        else:
+            if not solve_parallel(lp_files, params, out, time_limit, config,
+                                  os.path.join(out_dir, ".work"), workers, collect):
+                # A crashed worker breaks the pool, the rest is left for resuming
+                print(f"\n❌ A worker process crashed after {len(entries)} of {total} environment(s). "
+                      "Run the same command again to resume.")
+    except KeyboardInterrupt:
+        print(f"\n⚠️ Interrupted after {len(entries)} of {total} environment(s). "
+              "Run the same command again to resume.")
+
+    report = pd.DataFrame(entries, columns=REPORT_COLUMNS).sort_values('lp').reset_index(drop=True)
+    report.to_csv(report_path, index=False)
+    if parquet:
+        try:
+            report.to_parquet(os.path.join(out_dir, "report.parquet"), index=False)
+        except ImportError as e:
+            print(f"⚠️ Parquet report not saved: {str(e).splitlines()[0]}")
+    failed = int((report['status'] != 'ok').sum())
+    if failed:
+        print(f"⚠️ {failed} of {len(report)} environment(s) were not solved in full.")
+    print(f"✅ Report saved in {report_path}.")
+    return report
+
+
+def print_entry(entry, done, total):
+    """Prints the progress of a batch.
+
+    Args:
+        entry (dict): Report row of the finished instance.
+        done (int): Number of finished instances.
+        total (int): Number of instances.
+    """
+    if entry['status'] == 'ok':
+        status = "✅"
+    elif entry['status'] == 'timeout':
+        status = "⏱️ time limit"
+    else:
+        status = f"❌ {entry['status']} {entry['error_code'] or entry['error']}"
+    cost = f" cost {entry['cost']}" if entry['cost'] else ""
+    print(f"> [{done}/{total}] {entry['name']} ({entry['total_seconds']}s{cost}) {status}")
@@ -1,16 +1,26 @@
 import os
+import shutil
+import threading
+import numpy as np
 import imageio.v2 as imageio
 from PIL import Image, ImageDraw, ImageFont
 from flatland.utils.rendertools import RenderTool
 from code.build_png import create_custom_env, pil_config
+from code.native_render import render_tracks, render_stations, render_trains, native_cell_size
 from code.config import DIR_MAP
+from code.files import delete_tmp_frames
+from code.frame_cache import scene_key, animation_key, load_cached_frames, store_frames
 
 images = []  # Frame list for GIF
 
 # Re-rendering parameters
-old_env_counter = 0  # Detector for environment change
-old_low_q = None  # Detector for quality change
-old_answer = None  # Detector for answer change
+old_cache_key = None  # Detector for changes of environment, plan or quality
+old_scene_key = None  # Detector for changes of environment or quality
+old_states = None  # Train states per timestep of the last animation
+
+TMP_DIR = "data/tmp_frames"  # Temporary directory to store gif frames
+
+PALETTE_SAMPLE_LIMIT = 1000000  # Max. pixels used to build the global GIF palette
 
 def build_gif_from_frames(output_gif, fps):
     """Saves the collected frames as a GIF.
@@ -25,18 +35,125 @@ def build_gif_from_frames(output_gif, fps):
     imageio.mimsave(output_gif, images, format='GIF', loop=0, duration=ms_per_timestep)
 
 
+def changed_bbox(prev_frame, frame):
+    """Calculates the bounding box of all pixels that changed between two frames.
+
+    Args:
+        prev_frame (np.ndarray): Previous RGB frame.
+        frame (np.ndarray): Current RGB frame.
+
+    Returns:
+        tuple[int, int, int, int] or None: (left, upper, right, lower) box,
+            or None if both frames are identical.
+    """
+    if prev_frame.shape != frame.shape:
+        return (0, 0, frame.shape[1], frame.shape[0])  # Full frame on size change
+    diff = np.any(prev_frame != frame, axis=-1)
+    changed_rows = np.flatnonzero(diff.any(axis=1))
+    if changed_rows.size == 0:
+        return None
+    changed_cols = np.flatnonzero(diff.any(axis=0))
+    return (int(changed_cols[0]), int(changed_rows[0]),
+            int(changed_cols[-1]) + 1, int(changed_rows[-1]) + 1)
+
+
+def build_global_palette(frames, bboxes):
+    """Builds one shared 256 color palette for all GIF frames.
+
+    The palette is sampled from the first frame and the changed regions
+    of all following frames.
+
+    Args:
+        frames (list[np.ndarray]): RGB frames.
+        bboxes (list[tuple or None]): Changed region of each frame.
+
+    Returns:
+        Image.Image: Palette image for Image.quantize.
+    """
+    regions = [frames[0]]
+    for frame, bbox in zip(frames[1:], bboxes[1:]):
+        if bbox is None:
+            continue  # Nothing new to sample
+        left, upper, right, lower = bbox
+        regions.append(frame[upper:lower, left:right])
+    # Subsample pixels evenly to bound quantization time
+    total_pixels = sum(region.shape[0] * region.shape[1] for region in regions)
+    step = max(1, total_pixels // PALETTE_SAMPLE_LIMIT)
+    pixels = np.concatenate([region.reshape(-1, 3)[::step] for region in regions])
+    sample = Image.fromarray(np.ascontiguousarray(pixels.reshape(1, -1, 3)), 'RGB')
+    return sample.quantize(colors=256, method=Image.Quantize.MEDIANCUT)
+
+
+def build_delta_gif_from_frames(output_gif, fps):
+    """Saves the collected frames as a delta-encoded GIF.
+
+    Only the changed region of each frame is quantized against a shared
+    global palette, so Pillow stores partial frames without local color tables.
+    Frames without changes extend the duration of the previous frame.
+
+    Args:
+        output_gif (str): File path to save the GIF.
+        fps (float): Frames per second.
+    """
+    global images
+    ms_per_timestep = int(1000/fps)
+    frames = [np.asarray(image)[..., :3] for image in images]  # Drop alpha channel
+    # Changed region of every frame compared to its predecessor
+    bboxes = [None] + [changed_bbox(prev, curr) for prev, curr in zip(frames, frames[1:])]
+    palette = build_global_palette(frames, bboxes)
+    current = Image.fromarray(np.ascontiguousarray(frames[0])).quantize(
+        palette=palette, dither=Image.Dither.NONE)
+    gif_frames = [current]
+    durations = [ms_per_timestep]
+    for frame, bbox in zip(frames[1:], bboxes[1:]):
+        if bbox is None:
+            durations[-1] += ms_per_timestep  # Hold previous frame longer
+            continue
+        left, upper, right, lower = bbox
+        # Quantize only the changed region and paste it on the previous frame
+        region = Image.fromarray(np.ascontiguousarray(frame[upper:lower, left:right])).quantize(
+            palette=palette, dither=Image.Dither.NONE)
+        current = current.copy()
+        current.paste(region, (left, upper))
+        gif_frames.append(current)
+        durations.append(ms_per_timestep)
+    gif_frames[0].save(
+        output_gif,
+        save_all=True,
+        append_images=gif_frames[1:],
+        duration=durations,
+        loop=0,
+        disposal=1,  # Keep previous frame as background for partial frames
+        optimize=False
+    )
+
+
+def save_gif_frames(output_gif, fps, delta_encoding):
+    """Saves the collected frames with the selected GIF encoder.
+
+    Args:
+        output_gif (str): File path to save the GIF.
+        fps (float): Frames per second.
+        delta_encoding (bool): Flag for storing only changed frame regions.
+    """
+    if delta_encoding:
+        build_delta_gif_from_frames(output_gif, fps)
+    else:
+        build_gif_from_frames(output_gif, fps)
+
+
 def calc_gif_resolution(low_quality_mode, env):
     """Calculates the screen resolution for GIF rendering based on environment size and quality mode.
 
     Args:
         low_quality_mode (bool): Flag to use low resolution settings.
-        env (RailEnv or list): Environment object or 2D list of tracks.
+        env (RailEnv, list or np.ndarray): Environment object or 2D list of tracks.
 
     Returns:
         int: Screen resolution.
     """
     # Determine env dimensions based on input
-    if isinstance(env, list):  # tracks list
+    if isinstance(env, (list, np.ndarray)):  # tracks list
         env_dim_max = max(len(env), len(env[0]))
     else:  # RailEnv object
         env_dim_max = max(env.height, env.width)
@@ -84,95 +201,365 @@ def draw_timestep(t, frame_filename):
         img.save(frame_filename)  # Save modified image
 
 
-def render_gif(tracks, trains, df_pos, env_params, env_counter, output_gif='data/running_tmp.gif', fps=2, low_quality_mode=False):
+def frame_states(df_pos, remove, min_timestep, max_timestep):
+    """Determines the displayed state of every train at every timestep.
+
+    Timesteps without a position keep the last state, unless trains are removed.
+
+    Args:
+        df_pos (pd.DataFrame): Train positions.
+        remove (bool): Flag for removing trains without position.
+        min_timestep (int): First timestep of the animation.
+        max_timestep (int): Last timestep of the animation.
+
+    Returns:
+        pd.DataFrame: 'y,x,dir' state per timestep (rows) and train (columns),
+            '-' for trains without a position: drawn at their start, or
+            hidden if trains are removed.
+    """
+    # Use the first matching row per train and timestep
+    states = df_pos.drop_duplicates(subset=['trainID', 'timestep'])
+    state = (states['y'].astype(int).astype(str) + ',' +
+             states['x'].astype(int).astype(str) + ',' +
+             states['dir'].astype(str))
+    table = (states.assign(state=state, timestep=states['timestep'].astype(int))
+             .pivot(index='timestep', columns='trainID', values='state')
+             .reindex(range(min_timestep, max_timestep + 1)))
+    if not remove:
+        table = table.ffill()  # Trains stay at their last position
+    return table.fillna('-')
+
+
+def unchanged_timesteps(prev_states, states):
+    """Finds timesteps at which no train changed compared to the last animation.
+
+    Args:
+        prev_states (pd.DataFrame): Train states of the last animation.
+        states (pd.DataFrame): Train states of the current animation.
+
+    Returns:
+        set[int]: Timesteps whose frames can be reused.
+    """
+    trains = prev_states.columns.union(states.columns)
+    # Missing timesteps or trains never match
+    prev_aligned = prev_states.reindex(index=states.index, columns=trains).fillna('?')
+    aligned = states.reindex(columns=trains).fillna('!')
+    unchanged = (prev_aligned == aligned).all(axis=1)
+    return set(unchanged.index[unchanged.to_numpy()])
+
+
+def set_agent_states(agent_by_id, row, remove):
+    """Moves the agents to their states of one timestep.
+
+    Args:
+        agent_by_id (dict): Agents by train ID.
+        row (pd.Series): Train states of the timestep.
+        remove (bool): Flag for removing trains without position.
+    """
+    for id, agent in agent_by_id.items():
+        state = row.get(id, '-')
+        if state == '-':
+            if remove:
+                # Remove train if data is missing and remove flag is set
+                agent.position = None
+                agent.direction = None
+            else:
+                # Train waits at its start
+                agent.position = agent.initial_position
+                agent.direction = agent.initial_direction
+            continue
+        y, x, dir = state.split(',')
+        agent.position = (int(y), int(x))
+        agent.direction = DIR_MAP[dir]
+
+
+def load_gif_frames(cached_frames, tmp_dir):
+    """Restores cached frames into the temporary frame directory and the frame list.
+
+    Args:
+        cached_frames (list[tuple[int, str]]): (timestep, frame path) pairs.
+        tmp_dir (str): Temporary directory for GIF frames.
+    """
+    global images
+    images = []
+    for _, path in cached_frames:
+        frame_filename = os.path.join(tmp_dir, os.path.basename(path))
+        shutil.copy2(path, frame_filename)
+        images.append(imageio.imread(frame_filename))
+
+
+class TimestepRenderer:
+    """Renders single timesteps of an animation on demand.
+
+    Keeps one RenderTool for all frames, so the rail layer is drawn once
+    and only the agents are redrawn per timestep.
+
+    Attributes:
+        tracks (list[list[int]]): 2D list of track types.
+        trains (pd.DataFrame): Train configuration.
+        env_params (dict): Environment parameters.
+        screen_res (int): Render resolution.
+        graphics_lib (str): Flatland graphics library or "native".
+        remove (bool): Flag for removing trains without position.
+        scene_key (str): Hash of tracks, trains, resolution and renderer.
+        cache_key (str): Hash of the scene and the train positions.
+        min_timestep (int): First timestep of the animation.
+        max_timestep (int): Last timestep of the animation.
+        states (pd.DataFrame): Train states per timestep.
+        frames (dict[int, str]): Paths of already rendered frames by timestep.
+        static_layer (np.ndarray): Tracks and stations of the native renderer.
+        cell_size (int): Cell size of the native renderer in pixels.
+    """
+    def __init__(self, tracks, trains, df_pos, env_params, low_quality_mode=False):
+        self.tracks = tracks
+        self.trains = trains
+        self.env_params = env_params
+        if env_params.get('nativeRender', False):
+            # Sprite tiles are fast enough for large environments in full quality
+            self.graphics_lib = "native"
+        else:
+            if len(tracks) * len(tracks[0]) > 1000000:
+                low_quality_mode = True  # Force low quality on large environments
+            self.graphics_lib = "PIL" if low_quality_mode else "PILSVG"  # Rendering lib based on quality
+        self.screen_res = calc_gif_resolution(low_quality_mode, tracks)
+        self.remove = env_params["remove"]
+        self.scene_key = scene_key(tracks, trains, self.screen_res, self.graphics_lib, self.remove)
+        self.cache_key = animation_key(self.scene_key, df_pos)
+        # Get timestep range to determine animation length
+        self.min_timestep = int(df_pos['timestep'].min())
+        self.max_timestep = int(df_pos['timestep'].max())
+        self.states = frame_states(df_pos, self.remove, self.min_timestep, self.max_timestep)
+        self.frames = {}
+        # Environment and renderer are created with the first frame
+        self.agent_by_id = None
+        self.renderer = None
+        self.static_layer = None  # Tracks and stations of the native renderer
+        self.cell_size = native_cell_size(self.screen_res, len(tracks), len(tracks[0]))
+        # Frames of this renderer are drawn one at a time
+        self.render_lock = threading.RLock()
+        self.pending = []  # Timesteps to prefetch
+        self.pending_lock = threading.Lock()
+        self.prefetch_thread = None
+
+    def setup_renderer(self):
+        """Creates the environment and the renderer."""
+        if self.graphics_lib == "native":
+            # Tracks and stations never change during the animation
+            self.static_layer = render_tracks(self.tracks, self.cell_size)
+            stations = [(None, None, (y_end, x_end)) for y_end, x_end
+                        in zip(self.trains['y_end'], self.trains['x_end'])]
+            render_stations(self.static_layer, stations, self.cell_size)
+            return
+        # Own agents: the cached ones are re-placed by other callers
+        env,_,_,_ = create_custom_env(self.tracks, self.trains, self.env_params, own_agents=True)
+        # Map IDs to their corresponding agent objects for custom id settings
+        self.agent_by_id = {id: agent for id, agent in zip(self.trains['id'], env.agents)}
+        self.renderer = RenderTool(env, gl=self.graphics_lib, screen_height=self.screen_res, screen_width=self.screen_res)
+        self.renderer.reset()
+        if self.graphics_lib == "PIL":
+            pil_config(self.renderer)
+
+    def draw_frame(self, t, frame_filename):
+        """Renders a timestep and saves it as an annotated frame.
+
+        Args:
+            t (int): Timestep.
+            frame_filename (str): File path of the frame.
+        """
+        with self.render_lock:
+            if self.renderer is None and self.static_layer is None:
+                self.setup_renderer()
+            if self.graphics_lib == "native":
+                self.draw_native_frame(t, frame_filename)
+                return
+            # Update trains' positions and directions
+            set_agent_states(self.agent_by_id, self.states.loc[t], self.remove)
+            self.renderer.render_env(
+                show=False,
+                show_observations=False,
+                show_predictions=False
+            )
+            self.renderer.gl.save_image(frame_filename)
+            # Draw timestep on frame
+            draw_timestep(t, frame_filename)
+            self.frames[t] = frame_filename
+
+    def draw_native_frame(self, t, frame_filename):
+        """Draws the trains of a timestep on the static layer and saves the frame.
+
+        Args:
+            t (int): Timestep.
+            frame_filename (str): File path of the frame.
+        """
+        row = self.states.loc[t]
+        agents = []
+        for id, y, x, dir in zip(self.trains['id'], self.trains['y'], self.trains['x'], self.trains['dir']):
+            state = row.get(id, '-')
+            if state == '-':
+                # Removed trains are hidden, others wait at their start
+                agents.append((None, None, None) if self.remove else ((y, x), DIR_MAP[dir], None))
+                continue
+            y_t, x_t, dir_t = state.split(',')
+            agents.append(((int(y_t), int(x_t)), DIR_MAP[dir_t], None))
+        image = self.static_layer.copy()
+        render_trains(image, agents, self.cell_size)
+        Image.fromarray(image).save(frame_filename, compress_level=1)
+        # Draw timestep on frame
+        draw_timestep(t, frame_filename)
+        self.frames[t] = frame_filename
+
+    def render(self, t):
+        """Returns the frame of a timestep and renders it if necessary.
+
+        Args:
+            t (int): Timestep.
+
+        Returns:
+            str: File path of the frame.
+        """
+        with self.render_lock:
+            if t not in self.frames:
+                os.makedirs(TMP_DIR, exist_ok=True)
+                self.draw_frame(t, os.path.join(TMP_DIR, f"frame_{t:04d}.png"))
+            return self.frames[t]
+
+    def prefetch(self, timesteps):
+        """Renders timesteps in the background, replacing older prefetch requests.
+
+        Args:
+            timesteps (list[int]): Timesteps to render.
+        """
+        with self.pending_lock:
+            self.pending = [t for t in timesteps
+                            if self.min_timestep <= t <= self.max_timestep and t not in self.frames]
+        if self.pending and (self.prefetch_thread is None or not self.prefetch_thread.is_alive()):
+            self.prefetch_thread = threading.Thread(target=self._prefetch_worker)
+            self.prefetch_thread.daemon = True  # Preventing thread from blocking exit
+            self.prefetch_thread.start()
+
+    def _prefetch_worker(self):
+        """Renders pending timesteps until none are left."""
+        while True:
+            with self.pending_lock:
+                if not self.pending:
+                    return
+                t = self.pending.pop(0)
+            try:
+                self.render(t)
+            except Exception as e:
+                print(f"⚠️ Timestep {t} could not be prefetched:\n{e}")
+                return
+
+
+def timestep_renderer(tracks, trains, df_pos, env_params, low_quality_mode=False):
+    """Creates a renderer for the timestep viewer that reuses existing frames.
+
+    Args:
+        tracks (list[list[int]]): 2D list of track types.
+        trains (pd.DataFrame): Train configuration.
+        df_pos (pd.DataFrame): Train positions.
+        env_params (dict): Environment parameters.
+        low_quality_mode (bool): Flag for low resolution rendering.
+
+    Returns:
+        TimestepRenderer: Renderer with known frames of the same animation.
+    """
+    frame_renderer = TimestepRenderer(tracks, trains, df_pos, env_params, low_quality_mode)
+    if images and old_cache_key == frame_renderer.cache_key:
+        # Frames of the last animation
+        for t in old_states.index:
+            frame_filename = os.path.join(TMP_DIR, f"frame_{t:04d}.png")
+            if os.path.isfile(frame_filename):
+                frame_renderer.frames[t] = frame_filename
+        return frame_renderer
+    cached_frames = load_cached_frames(frame_renderer.cache_key)
+    if cached_frames is not None:
+        frame_renderer.frames = dict(cached_frames)  # Frames on disk
+    else:
+        delete_tmp_frames()  # Remove frames of previous plans
+    return frame_renderer
+
+
+def render_gif(tracks, trains, df_pos, env_params, output_gif='data/running_tmp.gif', fps=2, low_quality_mode=False, delta_encoding=True):
     """Creates an animated GIF of the environment by rendering each timestep or reusing cached frames.
 
+    Frames are cached on disk by a hash of tracks, trains, positions,
+    resolution and renderer, so previously seen plans are not rendered again.
+    If only the plan changed since the last animation, only timesteps
+    at which a train's position or direction changed are rendered.
+
     Args:
         tracks (list[list[int]]): 2D list of track types.
         trains (pd.DataFrame): Train configuration.
         df_pos (pd.DataFrame): Train positions.
         env_params (dict): Environment parameters.
-        env_counter (int): Environment counter to detect changes.
         output_gif (str): File path to save the GIF.
         fps (float): Frames per second.
         low_quality_mode (bool): Flag for low resolution rendering.
+        delta_encoding (bool): Flag for storing only changed frame regions.
 
     Returns:
         None if successful, or returns early if caching applies.
     """
-    global images, old_env_counter, old_low_q, old_answer
-    answer = env_params["answer"]
-    # Check if env and quality stayed the same since last render
-    if images and old_env_counter == env_counter and old_low_q == low_quality_mode and old_answer == answer:
-        # No re-render needed: reuse cached frames
-        build_gif_from_frames(output_gif, fps)
+    global images, old_cache_key, old_scene_key, old_states
+    frame_renderer = TimestepRenderer(tracks, trains, df_pos, env_params, low_quality_mode)
+    cache_key = frame_renderer.cache_key
+    states = frame_renderer.states
+    # Check if env, plan and quality stayed the same since last render
+    if images and old_cache_key == cache_key:
+        # No re-render needed: reuse frames in memory
+        save_gif_frames(output_gif, fps, delta_encoding)
         return
+    cached_frames = load_cached_frames(cache_key)
+    if cached_frames is not None:
+        # No re-render needed: reuse frames on disk
+        print("\nLoading cached animation...")
+        delete_tmp_frames()  # Remove frames of previous plans
+        os.makedirs(TMP_DIR, exist_ok=True)
+        load_gif_frames(cached_frames, TMP_DIR)
+        save_gif_frames(output_gif, fps, delta_encoding)
+        old_cache_key, old_scene_key, old_states = cache_key, frame_renderer.scene_key, states
+        print(f"✅ Animation done.")
+        return
+    # Frames of the last animation that can be reused
+    reusable = {}
+    if images and old_scene_key == frame_renderer.scene_key and len(images) == len(old_states):
+        prev_frames = dict(zip(old_states.index, images))
+        reusable = {t: prev_frames[t] for t in unchanged_timesteps(old_states, states)}
+    if reusable:
+        # Remove only frames outside of the new timestep range
+        for t in old_states.index.difference(states.index):
+            frame_filename = os.path.join(TMP_DIR, f"frame_{t:04d}.png")
+            if os.path.isfile(frame_filename):
+                os.remove(frame_filename)
+    else:
+        delete_tmp_frames()  # Remove frames of previous plans
+    os.makedirs(TMP_DIR, exist_ok=True)
     images = []
+    render_timesteps = [t for t in states.index if t not in reusable]
     print("\nRendering animation...")
-    env,_,_,_ = create_custom_env(tracks, trains, env_params)  # Environment for rendering
-    # Get timestep range to determine gif length
-    min_timestep = int(df_pos['timestep'].min())
-    max_timestep = int(df_pos['timestep'].max())
-    print(f"{max_timestep-min_timestep+1} Timesteps to render.\nProgress:", end=" ")
-    # Temporary directory to store gif frames
-    tmp_dir = "data/tmp_frames"
-    os.makedirs(tmp_dir, exist_ok=True)
-    # Separate trains into groups
-    groups = {id: group.sort_values(by='timestep') 
-              for id, group in df_pos.groupby('trainID')}
-    
-    # Map IDs to their corresponding agent objects for custom id settings
-    agent_by_id = {id: agent for id, agent in zip(trains['id'], env.agents)}
+    print(f"{len(render_timesteps)} of {len(states)} Timesteps to render.\nProgress:", end=" ")
+    frame_files = []  # Frames for the cache
     
-    # Loop over each timestep to render frame
-    for t in range(min_timestep, max_timestep + 1):
+    # Loop over each timestep to render or reuse frame
+    for t in states.index:
+        frame_filename = os.path.join(TMP_DIR, f"frame_{t:04d}.png")  # Filename for current frame
+        frame_files.append((t, frame_filename))
+        if t in reusable:
+            # Unchanged frame: restore file if it was deleted meanwhile
+            if not os.path.isfile(frame_filename):
+                imageio.imwrite(frame_filename, reusable[t])
+            images.append(reusable[t])
+            continue
         print(f"{t}", end=" ", flush=True)
-        # For each train
-        for id, group in groups.items():
-            if id not in agent_by_id:
-                continue  # Skip ID if there is no agent assigned
-            agent = agent_by_id[id]
-            row = group[group['timestep'] == t]  # Line of current timestep
-            if row.empty:
-                if env_params["remove"]:
-                    # Remove train if data is missing and remove flag is set
-                    agent.position = None
-                    agent.direction = None
-                continue
-            else:
-                row = row.iloc[0]  # Use the first matching row
-            # Update train's position and direction
-            agent.position = (int(row['y']), int(row['x']))
-            agent.direction = DIR_MAP[row['dir']]
-        
-        # Render image
-        if env.width * env.height > 1000000:
-            low_quality_mode = True  # Force low quality on large environments
-        screen_res = calc_gif_resolution(low_quality_mode, env)
-        graphics_lib = "PIL" if low_quality_mode else "PILSVG"  # Rendering lib based on quality
-        renderer = RenderTool(env, gl=graphics_lib, screen_height=screen_res, screen_width=screen_res)
-        renderer.reset()
-        if graphics_lib == "PIL":
-            pil_config(renderer)
-        renderer.render_env(
-            show=False,
-            show_observations=False,
-            show_predictions=False
-        )
-        # Save tmp frames
-        frame_filename = os.path.join(tmp_dir, f"frame_{t:04d}.png")  # Filename for current frame
-        renderer.gl.save_image(frame_filename)
-        renderer.reset()
-        
-        # Draw timestep on frame
-        draw_timestep(t, frame_filename)
+        # Render and save tmp frame
+        frame_renderer.draw_frame(t, frame_filename)
         # Add frame to list
         images.append(imageio.imread(frame_filename))
     
     # Combine frames into one GIF
-    build_gif_from_frames(output_gif, fps)
+    save_gif_frames(output_gif, fps, delta_encoding)
     # Update caching parameters
-    old_env_counter = env_counter
-    old_low_q = low_quality_mode
-    old_answer = answer
+    old_cache_key, old_scene_key, old_states = cache_key, frame_renderer.scene_key, states
+    store_frames(cache_key, frame_files)
     print(f"\n✅ Animation done.")
@@ -1,5 +1,8 @@
+import copy
+import threading
 from warnings import filterwarnings
 import numpy as np
+from PIL import Image
 from flatland.envs.rail_env import RailEnv
 from flatland.envs.rail_generators import rail_from_grid_transition_map
 from flatland.envs.malfunction_generators import MalfunctionParameters, ParamMalfunctionGen
@@ -8,40 +11,16 @@ from flatland.core.transition_map import GridTransitionMap
 from flatland.core.grid.grid4 import Grid4TransitionsEnum
 from flatland.envs.rail_trainrun_data_structures import Waypoint
 from code.config import DIR_MAP, AGENT_COLORS
+from code.native_render import render_image, env_agents, native_cell_size
+from code.image_pyramid import ResizeWorker
+from code.transitions import DIRS, TRACK_INDEX, ENTRY_DIR
 
 filterwarnings("ignore", category=RuntimeWarning)
 
-# Dictionary for replacing invalid agent orientations based on track type
-dir_replacement = {
-    # Straights
-    ('e', 32800):  's',
-    ('w', 32800):  'n',
-    ('n', 1025):  'e',
-    ('s', 1025):  'w',
-    # Curves
-    ('s', 4608):  'e',
-    ('w', 4608):  'n',
-    ('s', 16386):  'w',
-    ('e', 16386):  'n',
-    ('n', 72):  'w',
-    ('e', 72):  's',
-    ('n', 2064):  'e',
-    ('w', 2064):  's',
-    # Switches
-    ('w', 37408):  'n',
-    ('s', 17411):  'w',
-    ('e', 32872):  's',
-    ('n', 3089):  'e',
-    ('e', 49186):  'n',
-    ('n', 1097):  'w',
-    ('w', 34864):  's',
-    ('s', 5633):  'e',
-    # Split
-    ('s', 20994):  'w',
-    ('e', 16458):  's',
-    ('n', 2136):  'e',
-    ('w', 6672):  'n',
-}
+preview_worker = ResizeWorker("High quality preview render")  # Background renders of data/running_tmp.png
+
+env_cache = {'key': None, 'env': None}  # Last custom environment and its rail key
+env_lock = threading.RLock()  # Guards the agents of the cached environment
 
 class DummyLine:
     """Serves as a placeholder for line generation when no actual line generation is required.
@@ -251,8 +230,11 @@ def pil_config(renderer):
 def initial_render_test():
     """Renders a minimal 1x1 environment to verify that the rendering pipeline is operational.
 
+    Runs in the background after the window is up, so it renders
+    offscreen. It also loads Flatland for the first environment.
+
     Returns:
-        int: 0 if successful; -1 on failure.
+        tuple[int, int]: Height and width of the rendered image.
     """
     # Set up minimal env with a horizontal track
     tracks = [[1025]]
@@ -301,19 +283,27 @@ def initial_render_test():
     renderer = RenderTool(env, gl="PILSVG")
     renderer.reset()
     renderer.render_env(
-        show=True,
+        show=False,
         show_observations=False,
         show_predictions=False
     )
+    return renderer.get_image().shape[:2]
 
 
-def create_custom_env(tracks, trains, params):
+def create_custom_env(tracks, trains, params, own_agents=False):
     """Creates a Flatland environment for PNG generation.
 
+    The environment is cached: while only the trains change, its rail and
+    reset are reused and only the agents are updated in place. This serves
+    loading, builder edits and save_png. Callers that keep the environment,
+    like the GIF and timestep renderers, get a copy with their own agents,
+    which still shares the cached rail.
+
     Args:
         tracks (list[list[int]]): 2D list of track types.
         trains (pd.DataFrame): Train configuration.
         params (dict): Environment parameters.
+        own_agents (bool): Flag for a copy whose agents other callers do not move.
 
     Returns:
         RailEnv: Flatland environment.
@@ -321,8 +311,60 @@ def create_custom_env(tracks, trains, params):
         int or None: Invalid train.
         int or None: Invalid station.
     """
-    invalid_train = None
-    invalid_station = None
+    with env_lock:
+        env = get_custom_env(tracks, params)
+        if own_agents:
+            env = copy.copy(env)
+            env.agents = copy.deepcopy(env.agents)
+        return place_trains(env, tracks, trains)
+
+
+def custom_env_key(tracks, params):
+    """Builds the key of everything that requires a new environment when it changes.
+
+    Args:
+        tracks (list[list[int]]): 2D list of track types.
+        params (dict): Environment parameters.
+
+    Returns:
+        tuple: Grid shape and content, agent count and environment parameters.
+    """
+    grid = np.asarray(tracks, dtype=np.uint16)
+    return (
+        grid.shape, grid.tobytes(),
+        params['rows'], params['cols'], params['agents'],
+        tuple(params['malfunction']), params['min'], params['max'],
+        params['remove'], params['seed'],
+    )
+
+
+def get_custom_env(tracks, params):
+    """Returns the cached environment for the tracks or builds and resets a new one.
+
+    Args:
+        tracks (list[list[int]]): 2D list of track types.
+        params (dict): Environment parameters.
+
+    Returns:
+        RailEnv: Flatland environment without placed trains.
+    """
+    key = custom_env_key(tracks, params)
+    if env_cache['key'] != key:
+        env_cache['env'] = build_custom_env(tracks, params)
+        env_cache['key'] = key
+    return env_cache['env']
+
+
+def build_custom_env(tracks, params):
+    """Builds and resets a new environment for the tracks.
+
+    Args:
+        tracks (list[list[int]]): 2D list of track types.
+        params (dict): Environment parameters.
+
+    Returns:
+        RailEnv: Flatland environment without placed trains.
+    """
     # Custom map
     grid_map = GridTransitionMap(params['rows'], params['cols'])
     grid_map.grid = np.array(tracks, dtype=np.uint16)
@@ -355,79 +397,129 @@ def create_custom_env(tracks, trains, params):
         obs, info = env.reset()
     except ValueError as e:
         print("⚠️ Warning: No agents specified.")
+    return env
+
+
+def place_trains(env, tracks, trains):
+    """Places trains and stations on the agents of an environment.
+
+    Raises a ValueError if there are fewer trains than agents.
+
+    Args:
+        env (RailEnv): Flatland environment.
+        tracks (list[list[int]]): 2D list of track types.
+        trains (pd.DataFrame): Train configuration.
 
-    # Trains and stations
-    for i, agent in enumerate(env.agents):
-        id = trains.loc[i, 'id']
-        # Starting position
-        row_start = trains.loc[i, 'y']
-        col_start = trains.loc[i, 'x']
-        agent.initial_position = (row_start, col_start)
-        agent.position = agent.initial_position
-        # Direction
-        dir = trains.loc[i, 'dir']
-        train_track = tracks[row_start][col_start]
-        if train_track == 0:
+    Returns:
+        RailEnv: Flatland environment.
+        pd.DataFrame: Train configuration.
+        int or None: Invalid train.
+        int or None: Invalid station.
+    """
+    invalid_train = None
+    invalid_station = None
+    count = len(env.agents)
+    if count == 0:
+        return env, trains, invalid_train, invalid_station
+    if len(trains) < count:
+        # Unplaced agents would be rendered at stale positions
+        raise ValueError(f"{count} agents but only {len(trains)} trains configured.")
+    # Train columns as arrays, in agent order
+    ids = trains['id'].to_numpy()[:count]
+    rows_start = trains['y'].to_numpy(dtype=np.intp)[:count]
+    cols_start = trains['x'].to_numpy(dtype=np.intp)[:count]
+    rows_target = trains['y_end'].to_numpy(dtype=np.intp)[:count]
+    cols_target = trains['x_end'].to_numpy(dtype=np.intp)[:count]
+    headings = trains['dir'].iloc[:count].map(DIR_MAP).to_numpy(dtype=np.intp)
+    grid = np.asarray(tracks)
+    # Directions: redirect improperly oriented trains on tracks
+    train_tracks = grid[rows_start, cols_start]
+    off_track = train_tracks == 0
+    corrected = ENTRY_DIR[TRACK_INDEX[train_tracks], headings]
+    redirected = ~off_track & (corrected != headings)
+    headings = np.where(redirected, corrected, headings)
+    trains.iloc[:count, trains.columns.get_loc('dir')] = np.array(list(DIRS))[headings]
+    # Stations
+    missing_station = (rows_target < 0) | (cols_target < 0)
+    station_tracks = np.zeros(count, dtype=grid.dtype)
+    placed = ~missing_station
+    station_tracks[placed] = grid[rows_target[placed], cols_target[placed]]
+    station_off_track = placed & (station_tracks == 0)
+    # Agents
+    starts = zip(rows_start.tolist(), cols_start.tolist())
+    targets = zip(rows_target.tolist(), cols_target.tolist())
+    for agent, start, heading, target in zip(env.agents, starts, headings.tolist(), targets):
+        agent.initial_position = start
+        agent.position = start
+        agent.direction = heading
+        agent.initial_direction = heading
+        agent.target = target
+    # Reports, in train order
+    reported = off_track | redirected | missing_station | station_off_track
+    for i in np.flatnonzero(reported).tolist():
+        id = ids[i]
+        if off_track[i]:
             invalid_train = id  # Report train not on track
             print(f"❌ Train {id} not on track.")
-        # Redirect improperly oriented trains on tracks
-        elif (dir, train_track) in dir_replacement:
-            dir = dir_replacement[(dir, train_track)]
-            print(f"⚠️ Train {id} at ({row_start},{col_start}): Invalid orientation corrected.")
-        trains.loc[i, 'dir'] = dir
-        agent.direction = DIR_MAP[dir]
-        agent.initial_direction = agent.direction
-        # Station
-        row_target = trains.loc[i, 'y_end']
-        col_target = trains.loc[i, 'x_end']
-        agent.target = (row_target, col_target)
-        if row_target < 0 or col_target < 0:
+        elif redirected[i]:
+            print(f"⚠️ Train {id} at ({rows_start[i]},{cols_start[i]}): Invalid orientation corrected.")
+        if missing_station[i]:
             invalid_station = -(i+1)  # Report missing station
             print(f"❌ Missing Station of Train {id}.")
-        else:
-            station_track = tracks[row_target][col_target]
-            if station_track == 0:
-                invalid_station = id  # Report station not on track
-                print(f"❌ Station of Train {id} not on track.")
-
+        elif station_off_track[i]:
+            invalid_station = id  # Report station not on track
+            print(f"❌ Station of Train {id} not on track.")
 
     return env, trains, invalid_train, invalid_station
 
 
-def save_png(env, path="data/running_tmp.png", low_quality_mode=False):
+def save_png(env, path="data/running_tmp.png", low_quality_mode=False, native=False):
     """Renders and saves a PNG image of the environment.
 
     Args:
         env (RailEnv): Flatland environment.
         path (str): File path to save the PNG.
         low_quality_mode (bool): Flag for low resolution rendering.
+        native (bool): Flag for Clingonia's sprite renderer instead of Flatland's RenderTool.
 
     Returns:
         int: 0 if successful; -1 if an OverflowError occurs.
     """
     print("Rendering image...")
-    # Render image
-    try:
-        if env.width * env.height > 1000000:
-            low_quality_mode = True  # Force low quality on large environments
-        screen_res = calc_resolution(low_quality_mode, env)
-        graphics_lib = "PIL" if low_quality_mode else "PILSVG"  # Rendering lib based on quality
-        renderer = RenderTool(env, gl=graphics_lib, screen_height=screen_res, screen_width=screen_res)
+    # A newer image replaces pending background renders
+    preview_worker.cancel()
+    # Frame renderers may move the agents of the cached environment meanwhile
+    with env_lock:
+        if native:
+            # Sprite tiles are fast enough for large environments in full quality
+            screen_res = calc_resolution(low_quality_mode, env)
+            cell_size = native_cell_size(screen_res, env.height, env.width)
+            image = render_image(env.rail.grid, env_agents(env), cell_size)
+            Image.fromarray(image).save(path, compress_level=1)
+            print("✅ Build done.")
+            return 0
+        # Render image
+        try:
+            if env.width * env.height > 1000000:
+                low_quality_mode = True  # Force low quality on large environments
+            screen_res = calc_resolution(low_quality_mode, env)
+            graphics_lib = "PIL" if low_quality_mode else "PILSVG"  # Rendering lib based on quality
+            renderer = RenderTool(env, gl=graphics_lib, screen_height=screen_res, screen_width=screen_res)
+            renderer.reset()
+            pil_config(renderer)
+            renderer.render_env(
+                show=True,
+                show_observations=False,
+                show_predictions=False
+            )
+        except OverflowError as e:
+            print("❌ Image could not be generated.")
+            return -1
+        # Save image
+        renderer.gl.save_image(path)
         renderer.reset()
-        pil_config(renderer)
-        renderer.render_env(
-            show=True,
-            show_observations=False,
-            show_predictions=False
-        )
-    except OverflowError as e:
-        print("❌ Image could not be generated.")
-        return -1
-    # Save image
-    renderer.gl.save_image(path)
-    renderer.reset()
-    print("✅ Build done.")
-    return 0
+        print("✅ Build done.")
+        return 0
 
 
 # Apply the PIL patch
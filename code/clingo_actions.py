@@ -29,6 +29,8 @@ clingo_finisher = {
     5: "Tracks laid, but what a ride! Victory's ours!"
 }
 
+TIME_LIMIT_GRACE = 10  # Seconds the Clingo CLI may exceed its time limit before it is stopped
+
 def seconds_to_str(s):
     """Converts seconds to a human-readable time string.
 
@@ -103,6 +105,9 @@ def run_timer_thread(is_running, timer_start):
 def run_clingo(clingo_path, clingo_options, lp_files, answer_number):
     """Runs Clingo on given ASP files and returns its output.
 
+    With a time limit, the Clingo CLI is stopped after the limit plus
+    TIME_LIMIT_GRACE seconds, even if it is still grounding.
+
     Args:
         clingo_path (str): Path to Clingo installation or "API".
         clingo_options (list[str]): List of additional Clingo options.
@@ -119,10 +124,11 @@ def run_clingo(clingo_path, clingo_options, lp_files, answer_number):
     elif malf_path in lp_files:
         lp_files.remove(malf_path)
     timer_start = time.perf_counter() # Timer for Clingo execution time
+    time_limit = get_time_limit(clingo_options)
     if clingo_path.lower() == "api":
         # Using clingo's python API, not the clingo.exe CLI
         print("Activating Clingo-API...")
-        return run_clingo_api(lp_files, answer_number)
+        return run_clingo_api(lp_files, answer_number, time_limit)
     else:
         try:
             # Run Clingo as a subprocess
@@ -136,29 +142,38 @@ def run_clingo(clingo_path, clingo_options, lp_files, answer_number):
         except FileNotFoundError:
             # Fallback to Clingo-API
             print("⚠️ No clingo.exe found: Switching to Clingo-API...")
-            return run_clingo_api(lp_files, answer_number)
+            return run_clingo_api(lp_files, answer_number, time_limit)
     # Thread for periodic updates
     timer_thread = run_timer_thread(lambda: proc.poll() is None, timer_start)
     # Capture Clingo's output
-    stdout, stderr = proc.communicate()
+    try:
+        stdout, stderr = proc.communicate(timeout=time_limit + TIME_LIMIT_GRACE if time_limit else None)
+    except subprocess.TimeoutExpired:
+        # Clingo's time limit does not interrupt grounding
+        proc.kill()
+        stdout, _ = proc.communicate()
+        timer_thread.join(timeout=1)
+        print(f"⚠️ Clingo exceeded its time limit of {time_limit}s and was stopped.")
+        return f"{(stdout or '').strip()}\nTIME LIMIT   : 1".strip()
     # End thread
     timer_thread.join(timeout=1)
     # Check for Clingo error
     if proc.returncode != 0:
         error_message = (stderr or "").strip()  # "".strip if stderr is None
-        # If error is not a warning, print it and return error code
-        if error_message and "Warn" not in error_message:
+        # If error is not a warning or info (e.g. time limit), print it and return error code
+        if error_message and "Warn" not in error_message and "*** Info" not in error_message:
             print(f"❌ Clingo returned an error:\n{error_message}")
             return -2
     return stdout.strip()
 
 
-def run_clingo_api(lp_files, answer_number):
+def run_clingo_api(lp_files, answer_number, time_limit=None):
     """Runs Clingo via Python API and returns a CLI-like output string.
     
     Args:
         lp_files (list[str]): List of ASP files.
         answer_number (int): Desired answer number from Clingo.
+        time_limit (int, optional): Seconds after which solving is stopped.
     
     Returns:
         str: Clingo output with its answers.
@@ -201,7 +216,16 @@ def run_clingo_api(lp_files, answer_number):
             cost = None
 
     # Solve
-    res = ctl.solve(on_model=on_model)
+    interrupted = False
+    if time_limit:
+        with ctl.solve(on_model=on_model, async_=True) as handle:
+            if not handle.wait(time_limit):
+                # Like CLI --time-limit: stop and keep the answers so far
+                handle.cancel()
+                interrupted = True
+            res = handle.get()
+    else:
+        res = ctl.solve(on_model=on_model)
     # End process and thread
     termination_flag.set()
     timer_thread.join(timeout=1)
@@ -218,6 +242,8 @@ def run_clingo_api(lp_files, answer_number):
     output.append(f"Models       : {ans_count}")
     if cost is not None:
         output.append(f"Optimization : {' '.join(map(str, cost))}")
+    if interrupted:
+        output.append("TIME LIMIT   : 1")
     output.append("Calls        : 1")
     output.append(f"Time         : {elapsed:.3f}s")
 
@@ -277,6 +303,47 @@ def get_clingo_answer(clingo_output, answer_number):
         return print_last_clingo_answer(lines, answer_number)
 
 
+def get_clingo_cost(clingo_output, answer_number):
+    """Extracts the optimization costs of a specific answer from Clingo output.
+
+    Args:
+        clingo_output (str): Full output from Clingo.
+        answer_number (int): Desired answer number.
+
+    Returns:
+        list[int] or None: Costs by priority, None without optimization.
+    """
+    cost = None
+    in_answer = False
+    for line in clingo_output.split('\n'):
+        line = line.strip()
+        if line.startswith("Answer:"):
+            if in_answer:
+                break  # Next answer
+            in_answer = re.match(rf"Answer: {answer_number}\b", line) is not None
+        elif in_answer and line.startswith("Optimization:"):
+            cost = [int(c) for c in line[len("Optimization:"):].split()]
+    return cost
+
+
+def get_time_limit(clingo_options):
+    """Extracts the time limit from Clingo options.
+
+    Args:
+        clingo_options (list[str]): List of Clingo options.
+
+    Returns:
+        int or None: Time limit in seconds, None without a time limit.
+    """
+    for opt in clingo_options:
+        if opt.startswith("--time-limit="):
+            try:
+                return int(opt.split("=", 1)[1]) or None
+            except ValueError:
+                return None
+    return None
+
+
 def get_action_params(clingo_answer):
     """Extracts parameters for each action predicate from Clingo answer.
 
@@ -376,14 +443,31 @@ def clingo_to_df(clingo_path="clingo", clingo_options=[], lp_files=[], answer_nu
     Returns:
         pd.DataFrame: DataFrame containing reduced output of specified Clingo answer or an error code.
     """
+    df_actions, _ = solve_clingo(clingo_path, clingo_options, lp_files, answer_number)
+    return df_actions
+
+
+def solve_clingo(clingo_path, clingo_options, lp_files, answer_number):
+    """Runs Clingo and returns the DataFrame of action predicates with the Clingo output.
+
+    Args:
+        clingo_path (str): Path to Clingo installation.
+        clingo_options (list[str]): List of additional Clingo options.
+        lp_files (list[str]): List of ASP files.
+        answer_number (int): Desired answer number.
+
+    Returns:
+        pd.DataFrame or int: DataFrame of the specified Clingo answer or an error code.
+        str or None: Clingo output, None if Clingo did not run or returned an error.
+    """
     print("\nRun Simulation: START")
     # Check if there are lp files for solving the env
     if len(lp_files) < 2:
         print("❌ Error: No .lp files given.")
-        return -1  # no lp files
+        return -1, None  # no lp files
     if answer_number < 1:
         print(f"❌ Invalid answer to display: {answer_number}.")
-        return -4
+        return -4, None
     # Ignore invalid clingo options
     clingo_options = validate_clingo_options(clingo_options)
 
@@ -391,19 +475,19 @@ def clingo_to_df(clingo_path="clingo", clingo_options=[], lp_files=[], answer_nu
     # Run Clingo and capture its output
     output = run_clingo(clingo_path, clingo_options, lp_files, answer_number)
     if output == -2:
-        return -2  # clingo error
+        return -2, None  # clingo error
     # Extract desired answer
     answer = get_clingo_answer(output, answer_number)
     if answer in (-3, -4):
-        return answer  # invalid answer number
+        return answer, output  # invalid answer number
     # Extract action parameters
     params = get_action_params(answer)
     if isinstance(params, int):
-        return -6  # invalid action format
+        return -6, output  # invalid action format
     # Create the DataFrame
     df_actions = create_df(params)
     if isinstance(df_actions, int):
-        return -5  # invalid actions
+        return -5, output  # invalid actions
     print("✅ Clingo done.")
     print(f"\n===\nOutput:\n{output}\n===\n")
-    return df_actions
+    return df_actions, output
@@ -3,8 +3,9 @@ Configuration Constants for Flatland Simulation.
 
 - DIR_MAP (dict): Maps cardinal directions to numeric values.
 - TRACKS (set): Set of Flatland track IDs grouped by type.
-- DEAD_ENDS (set): Set of Flatland dead-end IDs.
+- DEFAULT_PARAMS (dict): Default user parameters for generation, solving and rendering.
 - AGENT_COLORS (list): List of hex color codes for Flatland agents.
+- SPRITES (dict): Maps Flatland track IDs, trains and stations to sprite names and rotations.
 - CLINGO_OPTIONS (set): Set of valid Clingo options.
 - INCOMPATIBLE_CLINGO_OPTIONS (set): Set of Clingo options that cause Clingonia to malfunction.
 """
@@ -21,7 +22,32 @@ TRACKS = {
   20994, 16458, 2136, 6672  # Type 6
 }
 
-DEAD_ENDS = {8192, 4, 128, 256}
+DEFAULT_PARAMS = {
+    'rows': 40,
+    'cols': 40,
+    'agents': 4,
+    'cities': 4,
+    'seed': 1,
+    'globalTimeLimit': 100,
+    'grid': False,
+    'intercity': 2,
+    'incity': 2,
+    'remove': True,
+    'speedMap': {1.0 : 1.0},
+    'malfunction': (0, 30),
+    'min': 2,
+    'max': 6,
+    'malfuncRepro': False,
+    'lowQuality': False,
+    'saveImage': False,
+    'answer': 1,
+    'clingo': 'clingo',
+    'clingoOptions': [],
+    'lpFiles': [],
+    'lowQualityGIF': False,
+    'frameRate': 2.0,
+    'nativeRender': False,
+}
 
 AGENT_COLORS = [
     "#d50000", "#c51162", "#aa00ff", "#6200ea", "#304ffe", "#2962ff",
@@ -29,6 +55,40 @@ AGENT_COLORS = [
     "#ffd600", "#ffab00", "#ff6d00", "#ff3d00", "#5d4037", "#455a64"
 ]
 
+SPRITES = {
+    0: ('eraser', 0),
+    1: ('train', 0),  # Train facing n
+    2: ('train', 270),  # Train facing e
+    3: ('train', 180),  # Train facing s
+    4: ('train', 90),  # Train facing w
+    5: ('train_station', 0),
+    32800: ('track_vertical', 0),
+    1025: ('track_horizontal', 0),
+    2064: ('track_curve_top_left', 0),
+    72: ('track_curve_top_right', 0),
+    16386: ('track_curve_bottom_right', 0),
+    4608: ('track_curve_bottom_left', 0),
+    3089: ('switch_horizontal_top_left', 0),
+    1097: ('switch_horizontal_top_right', 0),
+    17411: ('switch_horizontal_bottom_right', 0),
+    5633: ('switch_horizontal_bottom_left', 0),
+    34864: ('switch_vertical_top_left', 0),
+    32872: ('switch_vertical_top_right', 0),
+    49186: ('switch_vertical_bottom_right', 0),
+    37408: ('switch_vertical_bottom_left', 0),
+    33825: ('track_diamond_crossing', 0),
+    35889: ('switch_single_slip', 270),
+    33897: ('switch_single_slip', 180),
+    50211: ('switch_single_slip', 90),
+    38433: ('switch_single_slip', 0),
+    52275: ('switch_double_slip', 90),
+    38505: ('switch_double_slip', 0),
+    2136: ('switch_symmetrical', 180),
+    16458: ('switch_symmetrical', 90),
+    20994: ('switch_symmetrical', 0),
+    6672: ('switch_symmetrical', 270),
+}
+
 
 CLINGO_OPTIONS = {
     '--configuration', '--tester', '--stats', '-s', '--parse-ext', '--no-parse-ext',
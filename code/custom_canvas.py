@@ -22,18 +22,31 @@ Example usage:
     )
 """
 
-import threading
+from collections import OrderedDict
 
 import numpy as np
 import pandas as pd
 
 from code.custom_widgets import *
-from code.config import AGENT_COLORS
+from code.config import AGENT_COLORS, SPRITES
+from code.image_pyramid import ImagePyramid, ResizeWorker
+from code.native_render import render_paths
 
 
 # Platform: 
 sys_platform = platform.system()
 
+# Cell size in pixel below which path labels are combined to one per cell
+PATH_LABEL_AGGREGATE_SIZE = 24
+# Number of path labels in the drawn area above which paths are rasterized
+PATH_RASTER_LABEL_LIMIT = 3000
+PATH_RASTER_CACHE_SIZE = 8  # Max. number of cached path overlays
+
+# Builder sprites shared by all BuildCanvas instances
+SPRITE_SET_CACHE_SIZE = 32  # Max. number of cached zoom levels
+sprite_sources = {}  # rotated sprite images by Flatland id
+sprite_sets = OrderedDict()  # resized PhotoImages by cell size, least recently used first
+
 
 class EnvCanvas:
     """A custom tkinter Canvas to display created environments.
@@ -62,6 +75,8 @@ class EnvCanvas:
             width of the border around the canvas in pixel.
         image (str):
             path to an image file. Will be displayed on the canvas.
+        pyramid (ImagePyramid):
+            downscaled levels and tiles of the image used for zooming.
         display_image (ImageTk.PhotoImage):
             holds the image that is displayed on the canvas.
         canvas_image (int):
@@ -96,6 +111,8 @@ class EnvCanvas:
             holds the object id of the mouse coordinates text.
         high_quality_render(int):
             Holds the Tkinter id of the scheduled high-quality image update.
+        resize_worker(ResizeWorker):
+            runs the high-quality resizes and drops obsolete ones.
         draw_grid_numbers(bool):
             whether to draw row and col numbers on the outside of the canvas.
     """
@@ -158,6 +175,7 @@ class EnvCanvas:
         self.border_width = border_width
 
         self.image = self.get_image(image)
+        self.pyramid = ImagePyramid(self.image)
         self.display_image = None
         self.canvas_image = None
 
@@ -177,6 +195,7 @@ class EnvCanvas:
         self.buffer_y = 0
         self.text_label = None
         self.high_quality_render = None
+        self.resize_worker = ResizeWorker()
 
         # draw grid labels
         self.draw_grid_numbers = False
@@ -238,6 +257,17 @@ class EnvCanvas:
         image = image.crop(crop_box)
         return image
 
+    def set_image(self, image_path):
+        """Replace the displayed image and rebuild its pyramid.
+
+        Args:
+            image_path (str):
+                file path to the image.
+        """
+        self.image = self.get_image(image_path)
+        self.pyramid = ImagePyramid(self.image)
+        self.draw_image()
+
     def draw_mouse_symbols(self, event):
         """Draw the coordinates of the current grid cell next to the cursor.
 
@@ -581,7 +611,7 @@ class EnvCanvas:
 
         Returns:
             region (Image.Image):
-                projection of the visible area on the original image.
+                projection of the visible area on the closest pyramid level.
                 None if the visible area is non-existing.
             vis_width (int):
                 width of the visible area.
@@ -596,13 +626,10 @@ class EnvCanvas:
         sy = env_height / base_h
 
         # calculate visible are projected onto original image
-        src_left = int(vis_left / sx)
-        src_top = int(vis_top / sy)
-        src_right = int(vis_right / sx)
-        src_bottom = int(vis_bottom / sy)
-
-        # crop the original image to the visible area projected onto it
-        region = self.image.crop((src_left, src_top, src_right, src_bottom))
+        src_left = vis_left / sx
+        src_top = vis_top / sy
+        src_right = vis_right / sx
+        src_bottom = vis_bottom / sy
 
         # get the width and height of the visible area
         vis_width = int(vis_right - vis_left)
@@ -611,8 +638,12 @@ class EnvCanvas:
         # stop if the new visible area is non-existing
         if vis_width <= 0 or vis_height <= 0:
             return None, -1, -1
-        else:
-            return region, vis_width, vis_height
+
+        # assemble the visible area from the tiles of the closest pyramid level
+        region = self.pyramid.crop(
+            (src_left, src_top, src_right, src_bottom), (vis_width, vis_height)
+        )
+        return region, vis_width, vis_height
 
     def draw_image(self):
         """Display the image on the canvas and adjust to the current scale"""
@@ -694,38 +725,71 @@ class EnvCanvas:
         # schedule high quality render or reschedule on new zoom command
         if self.high_quality_render:
             self.root.after_cancel(self.high_quality_render)
+        # drop high quality renders of the previous view
+        self.resize_worker.cancel()
         self.high_quality_render = self.root.after(
             500, self.render_image_high_quality
         )
 
     def render_image_high_quality(self):
-        """Render the full image with high quality."""
-        # start worker thread to resize the original image
-        threading.Thread(
-            target=self._hq_resize_thread,
-            args=(),
-            daemon=True
-        ).start()
-
-    def _hq_resize_thread(self):
-        """Resize the image to the new size according to the current zoom level."""
+        """Render the visible area with high quality on the resize worker."""
         # compute environment size
         env_width, env_height = self.get_env_size()
 
+        # reload if the image is not loaded yet
+        if env_width == -1:
+            return
+
         # get canvas size
         canvas_width, canvas_height = self.get_canvas_size()
 
+        # reload if canvas is not loaded
+        if canvas_width == -1:
+            return
+
         # determine corner points of the visible area
-        vis_left, vis_top, vis_right, vis_bottom = self.get_visible_area(
+        visible_area = self.get_visible_area(
             env_width, env_height, canvas_width, canvas_height
         )
 
-        if vis_left == -1:
+        if visible_area[0] == -1:
+            return
+
+        # determine location of top left corner for the resized image
+        canvas_x = max(int(self.x_offset), 0)
+        canvas_y = max(int(self.y_offset), 0)
+
+        # replace any pending resize with the current view
+        self.resize_worker.submit(
+            lambda generation: self._hq_resize_thread(
+                generation, env_width, env_height, visible_area, canvas_x, canvas_y
+            )
+        )
+
+    def _hq_resize_thread(self, generation, env_width, env_height, visible_area, canvas_x, canvas_y):
+        """Resize the image to the new size according to the current zoom level.
+
+        Args:
+            generation (int):
+                generation number of the resize job.
+            env_width (int):
+                width of the environment grid.
+            env_height (int):
+                height of the environment grid.
+            visible_area (tuple(int,int,int,int)):
+                corner points of the visible area.
+            canvas_x (int):
+                x coordinate of the top left corner of the canvas.
+            canvas_y (int):
+                y coordinate of the top left corner of the canvas.
+        """
+        # stop if the view changed while the job was pending
+        if not self.resize_worker.is_current(generation):
             return
 
         # get cropped region and the dimensions of the visible are projected on the original image
         region, vis_width, vis_height = self.get_visible_projection_on_image(
-            env_width, env_height, vis_left, vis_top, vis_right, vis_bottom
+            env_width, env_height, *visible_area
         )
 
         # stop if the new visible area is non-existing
@@ -735,20 +799,22 @@ class EnvCanvas:
         # resize the image with LANCZOS interpolation
         hq_image = region.resize((vis_width, vis_height), Image.LANCZOS)
 
-        # determine location of top left corner for the resized image
-        canvas_x = max(int(self.x_offset), 0)
-        canvas_y = max(int(self.y_offset), 0)
+        # stop if the view changed during the resize
+        if not self.resize_worker.is_current(generation):
+            return
 
         # change to main thread and place the high quality image on the canvas
         self.root.after(
             10,
-            lambda: self._place_hq_image(hq_image, canvas_x, canvas_y, env_width, env_height),
+            lambda: self._place_hq_image(generation, hq_image, canvas_x, canvas_y, env_width, env_height),
         )
 
-    def _place_hq_image(self, hq_image, canvas_x, canvas_y, env_width, env_height):
+    def _place_hq_image(self, generation, hq_image, canvas_x, canvas_y, env_width, env_height):
         """Place the high quality image on the canvas.
 
         Args:
+            generation (int):
+                generation number of the resize job.
             hq_image (Image.Image):
                 image to be placed.
             canvas_x (int):
@@ -764,6 +830,10 @@ class EnvCanvas:
         if not self.canvas.winfo_exists():
             return
 
+        # drop the image if the view changed in the meantime
+        if not self.resize_worker.is_current(generation):
+            return
+
         # convert image to tk format
         self.display_image = ImageTk.PhotoImage(hq_image)
 
@@ -840,9 +910,27 @@ class BuildCanvas:
         image_refs (dict):
             holds image references to prevent garbage collection.
         resized_cache (dict):
-            holds resized images.
+            holds the resized images of the current zoom level, shared
+            with all builders at the same cell size.
         canvas_images (dict):
             hold object ids for images displayed in the grid cells.
+        free_images (list):
+            hidden canvas image ids of cells outside the view, reused for
+            new cells instead of creating new canvas items.
+        cell_layers (dict):
+            links grid cells to the layers that have an image in them.
+        id_label_items (dict):
+            links ('train' or 'station', index) to the object id of its label.
+        id_label_layout (dict):
+            links ('train' or 'station', index) to the cell and slot of its label.
+        id_label_scaled_font (tk.font.Font):
+            id label font scaled to the current zoom level.
+        view_bounds (tuple(int,int,int,int)):
+            first and last (exclusive) row and column of the cells that have
+            canvas items. None before the first draw.
+        view_margin (float):
+            margin around the visible area in which cells get canvas items,
+            relative to the canvas size.
         image_cache (dict):
             a cache for images in different zoom levels.
         image_dict (dict):
@@ -976,6 +1064,13 @@ class BuildCanvas:
         self.image_refs = {}
         self.resized_cache = {}
         self.canvas_images = {}
+        self.free_images = []
+        self.cell_layers = {}
+        self.id_label_items = {}
+        self.id_label_layout = {}
+        self.id_label_scaled_font = None
+        self.view_bounds = None
+        self.view_margin = 0.5
         self.image_cache = {}
         self.image_dict = self.set_img_dict()
         self.load_images()
@@ -1148,8 +1243,7 @@ class BuildCanvas:
             self.canvas.coords(self.text_label, event.x + 10, event.y + 10)
 
         if self.current_selection is not None:
-            image = self.image_cache[self.current_selection].resize((30, 30))
-            self.current_selection_image = ImageTk.PhotoImage(image)
+            self.current_selection_image = self.get_sprite_set(30)[self.current_selection]
 
             if self.mouse_image is None:
                 self.mouse_image = self.canvas.create_image(
@@ -1186,54 +1280,25 @@ class BuildCanvas:
                 trains, stations and tracks. Also contains a rotation that should
                 be applied to each image.
         """
-        dictionary = {
-            0: ('eraser', 0),
-            1: ('train', 0),
-            2: ('train', 270),
-            3: ('train', 180),
-            4: ('train', 90),
-            5: ('train_station', 0),
-            32800: ('track_vertical', 0),
-            1025: ('track_horizontal', 0),
-            2064: ('track_curve_top_left', 0),
-            72: ('track_curve_top_right', 0),
-            16386: ('track_curve_bottom_right', 0),
-            4608: ('track_curve_bottom_left', 0),
-            3089: ('switch_horizontal_top_left', 0),
-            1097: ('switch_horizontal_top_right', 0),
-            17411: ('switch_horizontal_bottom_right', 0),
-            5633: ('switch_horizontal_bottom_left', 0),
-            34864: ('switch_vertical_top_left', 0),
-            32872: ('switch_vertical_top_right', 0),
-            49186: ('switch_vertical_bottom_right', 0),
-            37408: ('switch_vertical_bottom_left', 0),
-            33825: ('track_diamond_crossing', 0),
-            35889: ('switch_single_slip', 270),
-            33897: ('switch_single_slip', 180),
-            50211: ('switch_single_slip', 90),
-            38433: ('switch_single_slip', 0),
-            52275: ('switch_double_slip', 90),
-            38505: ('switch_double_slip', 0),
-            2136: ('switch_symmetrical', 180),
-            16458: ('switch_symmetrical', 90),
-            20994: ('switch_symmetrical', 0),
-            6672: ('switch_symmetrical', 270),
-        }
+        dictionary = dict(SPRITES)
         return dictionary
 
     def load_images(self):
         """Load the images from image_dict to the image cache.
 
         Rotate according to the rotation parameter in the dictionary.
+        The images are loaded once and shared by all builders.
         """
-        for key, (filename, rotation) in self.image_dict.items():
-            try:
-                image = Image.open(f'data/png/{filename}.png')
-                rotated_image = image.rotate(rotation)
-                self.image_cache[key] = rotated_image
-            except FileNotFoundError:
-                print(f"Warning: Image {filename}.png not found.")
-                self.image_cache[key] = None
+        if not sprite_sources:
+            for key, (filename, rotation) in self.image_dict.items():
+                try:
+                    image = Image.open(f'data/png/{filename}.png')
+                    rotated_image = image.rotate(rotation)
+                    sprite_sources[key] = rotated_image
+                except FileNotFoundError:
+                    print(f"Warning: Image {filename}.png not found.")
+                    sprite_sources[key] = None
+        self.image_cache = sprite_sources
 
     def start_pan(self, event):
         """Get the initial mouse position when panning.
@@ -1265,6 +1330,10 @@ class BuildCanvas:
         self.canvas.move("grid_label", dx, dy)
         self.canvas.move("id_labels", dx, dy)
 
+        # materialize new cells once the visible area leaves the drawn area
+        if not self.view_contains(self.get_view_bounds(margin=0)):
+            self.update_viewport()
+
     def calculate_initial_pos(self):
         """Calculate the initial position of the grid centred on the canvas."""
         if self.rows > self.cols:
@@ -1315,11 +1384,12 @@ class BuildCanvas:
         # erase track
         if self.current_selection == 0:
             self.array[0][row, col] = 0
-            self.update_image_storage()
+            self.update_image_storage([(row, col)])
             return
 
         # place station
         if self.current_selection == 5:
+            old_pos = self.train_data['end_pos'].iloc[self.train_index]
 
             # remove old station if it exists
             if self.train_data['end_pos'].iloc[self.train_index] != (-1,-1):
@@ -1343,7 +1413,7 @@ class BuildCanvas:
             self.array[2][row, col] = 5
 
             # remove old image from the grid and place one on the new position
-            self.update_image_storage()
+            self.update_image_storage([old_pos])
             self.draw_station(self.train_index)
 
             # reset selections
@@ -1388,9 +1458,34 @@ class BuildCanvas:
         if adjusted_cell_size <= 0:
             return
 
-        for value, img in self.image_cache.items():
-            resized = img.resize((adjusted_cell_size, adjusted_cell_size))
-            self.resized_cache[value] = ImageTk.PhotoImage(resized)
+        self.resized_cache = self.get_sprite_set(adjusted_cell_size)
+
+    def get_sprite_set(self, size) -> dict:
+        """Get all images resized to a cell size.
+
+        Sprite sets are cached for the most recent cell sizes, so zooming
+        back to a previous level reuses them.
+
+        Args:
+            size (int):
+                cell size in pixel.
+
+        Returns:
+            sprite_set (dict):
+                links flatland ids to the resized PhotoImages.
+        """
+        if size in sprite_sets:
+            sprite_sets.move_to_end(size)
+            return sprite_sets[size]
+
+        sprite_set = {
+            value: ImageTk.PhotoImage(img.resize((size, size)))
+            for value, img in self.image_cache.items() if img is not None
+        }
+        sprite_sets[size] = sprite_set
+        while len(sprite_sets) > SPRITE_SET_CACHE_SIZE:
+            sprite_sets.popitem(last=False)
+        return sprite_set
 
     def put_img_on_canvas(self, value, layer, row, col):
         """Place a single image in the grid.
@@ -1405,6 +1500,10 @@ class BuildCanvas:
             col (int):
                 column in which to place the image.
         """
+        # cells outside the view only exist in the array
+        if not self.in_view(row, col):
+            return
+
         adjusted_cell_size = self.cell_size * self.scale
 
         image = self.resized_cache[value]
@@ -1415,20 +1514,139 @@ class BuildCanvas:
         # if there is an image already at that position modify it
         if (layer, row, col) in self.canvas_images:
             # if there is a different image change the image to the current one
-            if self.image_refs.get((layer, row, col)) != image:
+            if self.image_refs.get((layer, row, col)) is not image:
                 self.image_refs[(layer, row, col)] = image
-            self.canvas.itemconfig(
-                self.canvas_images[(layer, row, col)], image=image
-            )
+                self.canvas.itemconfig(
+                    self.canvas_images[(layer, row, col)], image=image
+                )
             self.canvas.coords(self.canvas_images[(layer, row, col)], x, y)
         else:
-            # create an image if there is none yet
-            canvas_img = self.canvas.create_image(
-                x, y, anchor='nw',image=image,
-                tags='track_image' if layer == 0 else 'train_station_image'
-            )
+            tags = ('track_image' if layer == 0 else 'train_station_image', f'layer_{layer}')
+            if self.free_images:
+                # reuse the image of a cell that left the view
+                canvas_img = self.free_images.pop()
+                self.canvas.itemconfig(canvas_img, image=image, tags=tags, state='normal')
+                self.canvas.coords(canvas_img, x, y)
+            else:
+                # create an image if there is none yet
+                canvas_img = self.canvas.create_image(
+                    x, y, anchor='nw',image=image,
+                    tags=tags
+                )
             self.canvas_images[(layer, row, col)] = canvas_img
             self.image_refs[(layer, row, col)] = image
+            self.cell_layers.setdefault((row, col), set()).add(layer)
+
+    def recycle_image(self, key):
+        """Hide the image of a cell and keep it for reuse.
+
+        Args:
+            key (tuple(int,int,int)):
+                layer, row and column of the image.
+        """
+        item_id = self.canvas_images.pop(key)
+        self.image_refs.pop(key, None)
+        self.canvas.itemconfig(item_id, state='hidden', tags=())
+        self.free_images.append(item_id)
+
+        layer, row, col = key
+        layers = self.cell_layers.get((row, col))
+        if layers is not None:
+            layers.discard(layer)
+            if not layers:
+                del self.cell_layers[(row, col)]
+
+    def get_view_bounds(self, margin=None) -> Tuple[int, int, int, int]:
+        """Calculate the cells inside the visible area plus a margin.
+
+        Args:
+            margin (float):
+                margin relative to the canvas size. Defaults to view_margin.
+
+        Returns:
+            row_start (int):
+                first row.
+            row_end (int):
+                last row, exclusive.
+            col_start (int):
+                first column.
+            col_end (int):
+                last column, exclusive.
+        """
+        if margin is None:
+            margin = self.view_margin
+        adjusted_cell_size = self.cell_size * self.scale
+
+        if adjusted_cell_size <= 0:
+            return 0, self.rows, 0, self.cols
+
+        # fall back to the requested size while the canvas is not mapped yet
+        canvas_width = self.canvas.winfo_width()
+        canvas_height = self.canvas.winfo_height()
+        if canvas_width <= 1 or canvas_height <= 1:
+            canvas_width, canvas_height = self.width, self.height
+
+        margin_x = canvas_width * margin
+        margin_y = canvas_height * margin
+
+        row_start = max(0, int((-self.y_offset - margin_y) // adjusted_cell_size))
+        row_end = min(self.rows, int((canvas_height - self.y_offset + margin_y) // adjusted_cell_size) + 1)
+        col_start = max(0, int((-self.x_offset - margin_x) // adjusted_cell_size))
+        col_end = min(self.cols, int((canvas_width - self.x_offset + margin_x) // adjusted_cell_size) + 1)
+        return row_start, row_end, col_start, col_end
+
+    def in_view(self, row, col) -> bool:
+        """Check whether a cell is inside the drawn area.
+
+        Args:
+            row (int):
+                row of the cell.
+            col (int):
+                column of the cell.
+
+        Returns:
+            bool (boolean):
+                whether the cell gets canvas items.
+        """
+        if self.view_bounds is None:
+            return True
+        row_start, row_end, col_start, col_end = self.view_bounds
+        return row_start <= row < row_end and col_start <= col < col_end
+
+    def view_contains(self, bounds) -> bool:
+        """Check whether a range of cells is inside the drawn area.
+
+        Args:
+            bounds (tuple(int,int,int,int)):
+                first and last (exclusive) row and column.
+
+        Returns:
+            bool (boolean):
+                whether all cells of the range have canvas items.
+        """
+        if self.view_bounds is None:
+            return False
+        row_start, row_end, col_start, col_end = self.view_bounds
+        return (
+            row_start <= bounds[0] and bounds[1] <= row_end and
+            col_start <= bounds[2] and bounds[3] <= col_end
+        )
+
+    def update_viewport(self):
+        """Draw the cells around the visible area and recycle all others."""
+        self.view_bounds = self.get_view_bounds()
+
+        for key in [key for key in self.canvas_images if not self.in_view(key[1], key[2])]:
+            self.recycle_image(key)
+
+        self.draw_tracks()
+        self.draw_trains()
+        self.draw_stations()
+
+        # reused images keep their old stacking position
+        self.canvas.tag_raise('layer_1')
+        self.canvas.tag_raise('layer_2')
+        self.canvas.tag_raise('id_labels')
 
     def restack_cell(self, row, col):
         """Redraw all trains and station in the grid.
@@ -1440,42 +1658,31 @@ class BuildCanvas:
                 col index of the cell to reorder.
         """
         # get all layers present at this cell
-        layers = sorted(
-            [layer for (layer, r, c) in self.canvas_images.keys()
-             if r == row and c == col]
-        )
+        layers = sorted(self.cell_layers.get((row, col), ()))
 
         for layer in layers:
             item_id = self.canvas_images[(layer, row, col)]
             self.canvas.tag_raise(item_id)
 
-        self.draw_id_labels()
+        # keep the id labels above the images
+        self.canvas.tag_raise('id_labels')
         return
 
-    def update_image_storage(self):
-        """Check the references are still valid."""
-        starts = set(self.train_data['start_pos'])
-        ends = set(self.train_data['end_pos'])
+    def update_image_storage(self, positions=None):
+        """Remove the images of objects that no longer exist in the array.
 
-        new_canvas_images = {}
-        new_image_refs = {}
-
-        # check if the objects in canvas images still exist in the train list
-        for (layer, row, col), item_id in self.canvas_images.items():
-            keep = (
-                    (layer == 0 and self.array[0][row, col] != 0) or
-                    (layer == 1 and (row, col) in starts) or
-                    (layer == 2 and (row, col) in ends)
-            )
-
-            if keep:
-                new_canvas_images[(layer, row, col)] = item_id
-                new_image_refs[(layer, row, col)] = self.image_refs[(layer, row, col)]
-            else:
-                self.canvas.delete(item_id)
+        Args:
+            positions (list[tuple(int,int)]):
+                cells that changed. All cells with images if None.
+        """
+        if positions is None:
+            positions = list(self.cell_layers)
 
-        self.canvas_images = new_canvas_images
-        self.image_refs = new_image_refs
+        for row, col in positions:
+            # the array holds the tracks, trains and stations of every cell
+            for layer in list(self.cell_layers.get((row, col), ())):
+                if self.array[layer][row, col] == 0:
+                    self.recycle_image((layer, row, col))
 
     def draw_train(self, index):
         """Redraw all trains and station in the grid.
@@ -1492,7 +1699,7 @@ class BuildCanvas:
             col=row['start_pos'][1]
         )
         self.restack_cell(row['start_pos'][0], row['start_pos'][1])
-        self.draw_id_labels()
+        self.update_id_labels()
 
     def draw_station(self, index):
         """Redraw all trains and station in the grid.
@@ -1510,28 +1717,31 @@ class BuildCanvas:
                 col=row['end_pos'][1]
             )
         self.restack_cell(row['end_pos'][0], row['end_pos'][1])
-        self.draw_id_labels()
+        self.update_id_labels()
 
     def draw_id_labels(self):
         """Draw ID labels on trains and station objects."""
         self.canvas.delete('id_labels')
+        self.id_label_items = {}
+        self.id_label_layout = {}
         adjusted_cell_size = self.cell_size * self.scale
 
-        # manage multiple ids in the same grid cell
-        # position label on a 3x3 grid in each cell to avoid overlay
-        # 0 is the center position 1 is on the left and then go clockwise
-        offset_dict = {
-            0: (adjusted_cell_size * 0.5, adjusted_cell_size * 0.5),
-            1: (adjusted_cell_size * 0.25, adjusted_cell_size * 0.5),
-            2: (adjusted_cell_size * 0.25, adjusted_cell_size * 0.25),
-            3: (adjusted_cell_size * 0.5, adjusted_cell_size * 0.25),
-            4: (adjusted_cell_size * 0.75, adjusted_cell_size * 0.25),
-            5: (adjusted_cell_size * 0.75, adjusted_cell_size * 0.5),
-            6: (adjusted_cell_size * 0.75, adjusted_cell_size * 0.75),
-            7: (adjusted_cell_size * 0.5, adjusted_cell_size * 0.75),
-            8: (adjusted_cell_size * 0.25, adjusted_cell_size * 0.75),
-        }
+        font = self.id_label_font.copy()
+
+        # double the font size for mac
+        sysmod = 2 if sys_platform == 'Darwin' else 1
+        font.config(size=int(self.id_label_font.cget("size") * (adjusted_cell_size / 100) * sysmod))
+        self.id_label_scaled_font = font
+
+        self.update_id_labels()
+
+    def get_id_label_layout(self) -> dict:
+        """Calculate the cell and slot of every train and station ID label.
 
+        Returns:
+            layout (dict):
+                links ('train' or 'station', index) to the cell and slot of its label.
+        """
         used = {}
 
         def assign_offset(pos) -> int:
@@ -1558,66 +1768,82 @@ class BuildCanvas:
             used[pos][chosen] += 1
             return chosen
 
-        font = self.id_label_font.copy()
+        layout = {}
+        for index, train_pos, station_pos in zip(
+                self.train_data.index,
+                self.train_data['start_pos'],
+                self.train_data['end_pos']
+        ):
+            layout[('train', index)] = (train_pos, assign_offset(train_pos))
 
-        # double the font size for mac
-        sysmod = 2 if sys_platform == 'Darwin' else 1
-        font.config(size=int(self.id_label_font.cget("size") * (adjusted_cell_size / 100) * sysmod))
+            # if there is a station placed for this train
+            if station_pos != (-1, -1):
+                layout[('station', index)] = (station_pos, assign_offset(station_pos))
+        return layout
 
-        # draw the ids on all trains and their stations
-        for index, row in self.train_data.iterrows():
-            train_pos = row['start_pos']
-            train_offset = assign_offset(train_pos)
+    def update_id_labels(self):
+        """Redraw only the ID labels whose cell or slot changed."""
+        if self.id_label_scaled_font is None:
+            self.draw_id_labels()
+            return
 
-            self.canvas.create_text(
-                (self.x_offset + offset_dict[train_offset][0] + train_pos[
-                    1] * adjusted_cell_size),
-                (self.y_offset + offset_dict[train_offset][1] + train_pos[
-                    0] * adjusted_cell_size),
+        adjusted_cell_size = self.cell_size * self.scale
+
+        # manage multiple ids in the same grid cell
+        # position label on a 3x3 grid in each cell to avoid overlay
+        # 0 is the center position 1 is on the left and then go clockwise
+        offset_dict = {
+            0: (adjusted_cell_size * 0.5, adjusted_cell_size * 0.5),
+            1: (adjusted_cell_size * 0.25, adjusted_cell_size * 0.5),
+            2: (adjusted_cell_size * 0.25, adjusted_cell_size * 0.25),
+            3: (adjusted_cell_size * 0.5, adjusted_cell_size * 0.25),
+            4: (adjusted_cell_size * 0.75, adjusted_cell_size * 0.25),
+            5: (adjusted_cell_size * 0.75, adjusted_cell_size * 0.5),
+            6: (adjusted_cell_size * 0.75, adjusted_cell_size * 0.75),
+            7: (adjusted_cell_size * 0.5, adjusted_cell_size * 0.75),
+            8: (adjusted_cell_size * 0.25, adjusted_cell_size * 0.75),
+        }
+
+        layout = self.get_id_label_layout()
+
+        # remove labels that were moved or deleted
+        for key, placement in self.id_label_layout.items():
+            if layout.get(key) != placement:
+                self.canvas.delete(self.id_label_items.pop(key))
+
+        # draw the ids on all new or moved trains and their stations
+        for (kind, index), (pos, offset) in layout.items():
+            if (kind, index) in self.id_label_items:
+                continue
+
+            self.id_label_items[(kind, index)] = self.canvas.create_text(
+                (self.x_offset + offset_dict[offset][0] + pos[1] * adjusted_cell_size),
+                (self.y_offset + offset_dict[offset][1] + pos[0] * adjusted_cell_size),
                 text=str(index),
                 anchor="center",
-                font=font,
-                fill=self.train_color,
+                font=self.id_label_scaled_font,
+                fill=self.train_color if kind == 'train' else self.station_color,
                 tags="id_labels"
             )
 
-            station_pos = row['end_pos']
-
-            # if there is a station placed for this train
-            if station_pos != (-1, -1):
-                station_offset = assign_offset(station_pos)
-
-                self.canvas.create_text(
-                    (self.x_offset + offset_dict[station_offset][0] +
-                     station_pos[1] * adjusted_cell_size),
-                    (self.y_offset + offset_dict[station_offset][1] +
-                     station_pos[0] * adjusted_cell_size),
-                    text=str(index),
-                    anchor="center",
-                    font=font,
-                    fill=self.station_color,
-                    tags="id_labels"
-                )
+        self.id_label_layout = layout
 
     def draw_images(self):
-        """Place all images in the grid and measure timing."""
-        self.draw_tracks()
-        self.draw_trains()
-        self.draw_stations()
+        """Place all images around the visible area of the grid."""
+        self.update_viewport()
         self.draw_id_labels()
 
     def draw_tracks(self):
-        """Draw all tracks in the grid."""
-        for row in range(self.rows):
-            for col in range(self.cols):
-                value = self.array[0][row, col]
-                if value == 0:
-                    continue
-                else:
-                    self.put_img_on_canvas(value, 0, row, col)
+        """Draw all tracks in the drawn area of the grid."""
+        row_start, row_end, col_start, col_end = self.view_bounds
+        tracks = self.array[0][row_start:row_end, col_start:col_end]
+
+        # only non-empty cells get an image
+        for row, col in zip(*np.nonzero(tracks)):
+            self.put_img_on_canvas(int(tracks[row, col]), 0, int(row_start + row), int(col_start + col))
 
     def draw_trains(self):
-        """Draw all unique train positions in the grid."""
+        """Draw all unique train positions in the drawn area of the grid."""
         unique_rows = self.train_data.drop_duplicates(subset='start_pos')
         for _, row in unique_rows.iterrows():
             self.put_img_on_canvas(
@@ -1628,7 +1854,7 @@ class BuildCanvas:
             )
 
     def draw_stations(self):
-        """Draw all unique station positions in the grid."""
+        """Draw all unique station positions in the drawn area of the grid."""
         unique_rows = self.train_data.drop_duplicates(subset='end_pos')
         for _, row in unique_rows.iterrows():
             if row['end_pos'] != (-1, -1):
@@ -1646,7 +1872,8 @@ class BuildCanvas:
             event (tk.Event):
                 event generated by the canvas when mouse wheel is scrolled.
         """
-        scale_factor = 1.2 if event.delta > 0 else 0.8
+        # zooming out reverses zooming in, so previous sprite sets are reused
+        scale_factor = 1.2 if event.delta > 0 else 1 / 1.2
         new_scale = self.scale * scale_factor
 
         new_scale = max(1/2, min(new_scale, max(self.rows / 3, self.cols / 3)))
@@ -2117,6 +2344,9 @@ class TrainListCanvas:
             index (int):
                 index of teh train to be removed.
         """
+        # cells whose images may have to be removed
+        positions = [self.train_data['start_pos'].iloc[index], self.train_data['end_pos'].iloc[index]]
+
         # get list of trains at the same grid position as the one to be deleted
         df = self.train_data[
             self.train_data['start_pos'] ==
@@ -2162,8 +2392,8 @@ class TrainListCanvas:
         self.update_widget_rows()
 
         # update the train and station images as well as the id labels on the builder grid
-        self.grid.update_image_storage()
-        self.grid.draw_id_labels()
+        self.grid.update_image_storage(positions)
+        self.grid.update_id_labels()
 
     def open_train_config_frame(self, index):
         """Builds the config frame for a single train.
@@ -2546,6 +2776,8 @@ class ResultCanvas:
             width of the border around the canvas in pixel.
         image (str):
             path to an image file. Will be displayed on the canvas.
+        pyramid (ImagePyramid):
+            downscaled levels and tiles of the image used for zooming.
         display_image (ImageTk.PhotoImage):
             holds the image that is displayed on the canvas.
         canvas_image (int):
@@ -2580,14 +2812,44 @@ class ResultCanvas:
             holds the object id of the mouse coordinates text.
         high_quality_render(int):
             Holds the Tkinter id of the scheduled high-quality image update.
+        resize_worker(ResizeWorker):
+            runs the high-quality resizes and drops obsolete ones.
         draw_grid_numbers(bool):
             whether to draw row and col numbers on the outside of the canvas.
         paths_df (pd.DataFrame):
             dataframe holding the locations of each train at each time step.
+        path_labels (pd.DataFrame):
+            labels of all paths with their precomputed slot in the cell.
+        train_colors (dict):
+            links train ids to their path label color.
         show_df (pd.DataFrame):
-            subset dataframe of paths_df holding only the trains to be shown.
+            subset dataframe of path_labels holding only the trains to be shown.
         show_list (list(bool)):
             keeps track which trains to show.
+        shown_trains (set):
+            train ids whose path labels are currently drawn.
+        path_label_items (dict):
+            links (x, y, slot) of a cell slot to the object id of its label.
+        path_label_bounds (tuple(int,int,int,int)):
+            first and last (exclusive) row and column of the cells whose
+            labels are drawn. None before the first draw.
+        path_label_scaled_font (tk.font.Font):
+            path label font scaled to the current zoom level.
+        path_label_aggregate (bool):
+            whether cells are too small for slots and get one label each.
+        raster_paths (bool):
+            whether to draw paths as one rasterized overlay instead of labels.
+            None switches automatically based on the number of labels.
+        path_ticks (bool):
+            whether the rasterized overlay marks every timestep with a dot.
+        path_overlay_image (ImageTk.PhotoImage):
+            holds the displayed path overlay. None while labels are shown.
+        path_raster_cache (OrderedDict):
+            path overlays by shown trains, zoom level and drawn area,
+            least recently used first.
+        view_margin (float):
+            margin around the visible area in which labels are drawn,
+            relative to the canvas size.
     """
     def __init__(
             self,
@@ -2658,6 +2920,7 @@ class ResultCanvas:
         self.border_width = border_width
 
         self.image = self.get_image(image)
+        self.pyramid = ImagePyramid(self.image)
         self.display_image = None
         self.canvas_image = None
 
@@ -2677,6 +2940,7 @@ class ResultCanvas:
         self.buffer_y = 0
         self.text_label = None
         self.high_quality_render = None
+        self.resize_worker = ResizeWorker()
 
         # draw grid labels
         self.draw_grid_numbers = False
@@ -2701,10 +2965,23 @@ class ResultCanvas:
         self.root.after(100, self.initial_zoom)
 
         self.paths_df = paths_df
-        self.show_df = pd.DataFrame(
-            columns=['trainID','start_pos', 'dir', 'end_pos', 'e_dep', 'l_arr']
+        self.path_labels = self.get_path_labels()
+        colors = (
+                AGENT_COLORS * ((len(self.paths_df) // len(AGENT_COLORS)) + 1)
         )
+        self.train_colors = dict(zip(self.path_labels['trainID'].unique(), colors))
+        self.show_df = self.path_labels.iloc[0:0]
         self.show_list = []
+        self.shown_trains = set()
+        self.path_label_items = {}
+        self.path_label_bounds = None
+        self.path_label_scaled_font = None
+        self.path_label_aggregate = False
+        self.raster_paths = None
+        self.path_ticks = True
+        self.path_overlay_image = None
+        self.path_raster_cache = OrderedDict()
+        self.view_margin = 0.5
 
     def create_canvas(self) -> tk.Canvas:
         """Initializes a tkinter canvas with the current attribute values.
@@ -2744,6 +3021,17 @@ class ResultCanvas:
         image = image.crop(crop_box)
         return image
 
+    def set_image(self, image_path):
+        """Replace the displayed image and rebuild its pyramid.
+
+        Args:
+            image_path (str):
+                file path to the image.
+        """
+        self.image = self.get_image(image_path)
+        self.pyramid = ImagePyramid(self.image)
+        self.draw_image()
+
     def draw_mouse_symbols(self, event):
         """Draw the coordinates of the current grid cell next to the cursor.
 
@@ -2936,6 +3224,14 @@ class ResultCanvas:
         if self._check_buffer_boundary():
             self.draw_image()
 
+        # draw the path labels of cells that come into view
+        if self.path_label_bounds is not None:
+            row_start, row_end, col_start, col_end = self.get_view_bounds(margin=0)
+            drawn = self.path_label_bounds
+            if (row_start < drawn[0] or row_end > drawn[1] or
+                    col_start < drawn[2] or col_end > drawn[3]):
+                self.draw_paths()
+
     def _check_buffer_boundary(self) -> bool:
         """Check if the visible area is still within the buffer zone.
 
@@ -3090,7 +3386,7 @@ class ResultCanvas:
 
         Returns:
             region (Image.Image):
-                projection of the visible area on the original image.
+                projection of the visible area on the closest pyramid level.
                 None if the visible area is non-existing.
             vis_width (int):
                 width of the visible area.
@@ -3105,13 +3401,10 @@ class ResultCanvas:
         sy = env_height / base_h
 
         # calculate visible are projected onto original image
-        src_left = int(vis_left / sx)
-        src_top = int(vis_top / sy)
-        src_right = int(vis_right / sx)
-        src_bottom = int(vis_bottom / sy)
-
-        # crop the original image to the visible area projected onto it
-        region = self.image.crop((src_left, src_top, src_right, src_bottom))
+        src_left = vis_left / sx
+        src_top = vis_top / sy
+        src_right = vis_right / sx
+        src_bottom = vis_bottom / sy
 
         # get the width and height of the visible area
         vis_width = int(vis_right - vis_left)
@@ -3120,8 +3413,12 @@ class ResultCanvas:
         # stop if the new visible area is non-existing
         if vis_width <= 0 or vis_height <= 0:
             return None, -1, -1
-        else:
-            return region, vis_width, vis_height
+
+        # assemble the visible area from the tiles of the closest pyramid level
+        region = self.pyramid.crop(
+            (src_left, src_top, src_right, src_bottom), (vis_width, vis_height)
+        )
+        return region, vis_width, vis_height
 
     def draw_image(self):
         """Display the image on the canvas and adjust to the current scale"""
@@ -3203,38 +3500,71 @@ class ResultCanvas:
         # schedule high quality render or reschedule on new zoom command
         if self.high_quality_render:
             self.root.after_cancel(self.high_quality_render)
+        # drop high quality renders of the previous view
+        self.resize_worker.cancel()
         self.high_quality_render = self.root.after(
             500, self.render_image_high_quality
         )
 
     def render_image_high_quality(self):
-        """Render the full image with high quality."""
-        # start worker thread to resize the original image
-        threading.Thread(
-            target=self._hq_resize_thread,
-            args=(),
-            daemon=True
-        ).start()
-
-    def _hq_resize_thread(self):
-        """Resize the image to the new size according to the current zoom level."""
+        """Render the visible area with high quality on the resize worker."""
         # compute environment size
         env_width, env_height = self.get_env_size()
 
+        # reload if the image is not loaded yet
+        if env_width == -1:
+            return
+
         # get canvas size
         canvas_width, canvas_height = self.get_canvas_size()
 
+        # reload if canvas is not loaded
+        if canvas_width == -1:
+            return
+
         # determine corner points of the visible area
-        vis_left, vis_top, vis_right, vis_bottom = self.get_visible_area(
+        visible_area = self.get_visible_area(
             env_width, env_height, canvas_width, canvas_height
         )
 
-        if vis_left == -1:
+        if visible_area[0] == -1:
+            return
+
+        # determine location of top left corner for the resized image
+        canvas_x = max(int(self.x_offset), 0)
+        canvas_y = max(int(self.y_offset), 0)
+
+        # replace any pending resize with the current view
+        self.resize_worker.submit(
+            lambda generation: self._hq_resize_thread(
+                generation, env_width, env_height, visible_area, canvas_x, canvas_y
+            )
+        )
+
+    def _hq_resize_thread(self, generation, env_width, env_height, visible_area, canvas_x, canvas_y):
+        """Resize the image to the new size according to the current zoom level.
+
+        Args:
+            generation (int):
+                generation number of the resize job.
+            env_width (int):
+                width of the environment grid.
+            env_height (int):
+                height of the environment grid.
+            visible_area (tuple(int,int,int,int)):
+                corner points of the visible area.
+            canvas_x (int):
+                x coordinate of the top left corner of the canvas.
+            canvas_y (int):
+                y coordinate of the top left corner of the canvas.
+        """
+        # stop if the view changed while the job was pending
+        if not self.resize_worker.is_current(generation):
             return
 
         # get cropped region and the dimensions of the visible are projected on the original image
         region, vis_width, vis_height = self.get_visible_projection_on_image(
-            env_width, env_height, vis_left, vis_top, vis_right, vis_bottom
+            env_width, env_height, *visible_area
         )
 
         # stop if the new visible area is non-existing
@@ -3244,20 +3574,22 @@ class ResultCanvas:
         # resize the image with LANCZOS interpolation
         hq_image = region.resize((vis_width, vis_height), Image.LANCZOS)
 
-        # determine location of top left corner for the resized image
-        canvas_x = max(int(self.x_offset), 0)
-        canvas_y = max(int(self.y_offset), 0)
+        # stop if the view changed during the resize
+        if not self.resize_worker.is_current(generation):
+            return
 
         # change to main thread and place the high quality image on the canvas
         self.root.after(
             10,
-            lambda: self._place_hq_image(hq_image, canvas_x, canvas_y, env_width, env_height),
+            lambda: self._place_hq_image(generation, hq_image, canvas_x, canvas_y, env_width, env_height),
         )
 
-    def _place_hq_image(self, hq_image, canvas_x, canvas_y, env_width, env_height):
+    def _place_hq_image(self, generation, hq_image, canvas_x, canvas_y, env_width, env_height):
         """Place the high quality image on the canvas.
 
         Args:
+            generation (int):
+                generation number of the resize job.
             hq_image (Image.Image):
                 image to be placed.
             canvas_x (int):
@@ -3273,6 +3605,10 @@ class ResultCanvas:
         if not self.canvas.winfo_exists():
             return
 
+        # drop the image if the view changed in the meantime
+        if not self.resize_worker.is_current(generation):
+            return
+
         # convert image to tk format
         self.display_image = ImageTk.PhotoImage(hq_image)
 
@@ -3288,30 +3624,215 @@ class ResultCanvas:
         self.canvas.config(scrollregion=(0, 0, env_width, env_height))
         self.draw_grid()
 
+    def get_path_labels(self) -> pd.DataFrame:
+        """Precompute the labels of all paths once per plan.
+
+        Labels of all trains in the same cell get consecutive slots, so the
+        slots do not change when trains are shown or hidden.
+
+        Returns:
+            path_labels (pd.DataFrame):
+                train id, cell, timestep and slot of every label.
+        """
+        if self.paths_df.empty:
+            return pd.DataFrame(columns=['trainID', 'x', 'y', 'timestep', 'cell_offset'])
+
+        path_labels = self.paths_df[['trainID', 'x', 'y', 'timestep']].copy()
+
+        count = path_labels.groupby(['x', 'y'])['x'].transform('count')
+
+        path_labels['cell_offset'] = (path_labels.groupby(['x', 'y'])
+                                      .cumcount()
+                                      .where(count > 1, 0) % 9)
+        return path_labels
+
+    def get_view_bounds(self, margin=None) -> Tuple[int, int, int, int]:
+        """Calculate the cells inside the visible area plus a margin.
+
+        Args:
+            margin (float):
+                margin relative to the canvas size. Defaults to view_margin.
+
+        Returns:
+            row_start (int):
+                first row.
+            row_end (int):
+                last row, exclusive.
+            col_start (int):
+                first column.
+            col_end (int):
+                last column, exclusive.
+        """
+        if margin is None:
+            margin = self.view_margin
+        adjusted_cell_size = self.cell_size * self.scale
+
+        if adjusted_cell_size <= 0:
+            return 0, self.rows, 0, self.cols
+
+        # fall back to the requested size while the canvas is not mapped yet
+        canvas_width = self.canvas.winfo_width()
+        canvas_height = self.canvas.winfo_height()
+        if canvas_width <= 1 or canvas_height <= 1:
+            canvas_width, canvas_height = self.width, self.height
+
+        margin_x = canvas_width * margin
+        margin_y = canvas_height * margin
+
+        row_start = max(0, int((-self.y_offset - margin_y) // adjusted_cell_size))
+        row_end = min(self.rows, int((canvas_height - self.y_offset + margin_y) // adjusted_cell_size) + 1)
+        col_start = max(0, int((-self.x_offset - margin_x) // adjusted_cell_size))
+        col_end = min(self.cols, int((canvas_width - self.x_offset + margin_x) // adjusted_cell_size) + 1)
+        return row_start, row_end, col_start, col_end
+
+    def get_path_label_font(self):
+        """Scale the path label font to the zoom level and the shown trains.
+
+        Returns:
+            font (tk.font.Font):
+                the scaled font.
+        """
+        adjusted_cell_size = self.cell_size * self.scale
+
+        font = self.path_label_font.copy()
+        sysmod = 2 if sys_platform == 'Darwin' else 1   # double the font size for mac
+
+        # if there is more than one path displayed shrink the font by  2/3
+        if len(self.shown_trains) > 1:
+            font.config(size=int(self.path_label_font.cget("size") * (adjusted_cell_size / 100) * (2/3) * sysmod))
+        else:
+            font.config(size=int(self.path_label_font.cget("size") * (adjusted_cell_size / 100) * sysmod))
+        return font
+
     def update_paths(self):
         """Update what paths to show based on the show-list.
 
         PathListCanvas updates show_list and calls this function.
+        Only the labels in cells of toggled trains are redrawn.
         """
-        show_dict = dict(zip(self.paths_df['trainID'].unique(), self.show_list))
+        show_dict = dict(zip(self.path_labels['trainID'].unique(), self.show_list))
+        shown_trains = {train for train, show in show_dict.items() if show}
+        changed = shown_trains ^ self.shown_trains
+        font_changed = (len(shown_trains) > 1) != (len(self.shown_trains) > 1)
 
-        self.show_df = (self.paths_df[self.paths_df['trainID'].map(show_dict)]
-                        .copy())
+        self.shown_trains = shown_trains
+        self.show_df = self.path_labels[self.path_labels['trainID'].isin(shown_trains)]
 
-        self.show_df['count'] = (self.show_df.groupby(['x', 'y'])['x']
-                                 .transform('count'))
+        # the font shrinks once more than one path is shown
+        if self.path_label_bounds is None or font_changed:
+            self.draw_paths()
+            return
 
-        self.show_df['cell_offset'] = (self.show_df.groupby(['x', 'y'])
-                                       .cumcount()
-                                       .where(self.show_df['count'] > 1, 0) % 9)
+        # overlays are cached per shown trains and replaced as a whole
+        if self.path_overlay_image is not None or self.use_path_raster():
+            self.draw_paths()
+            return
 
-        self.show_df.drop(columns=['count'], inplace=True)
+        # remove the labels of all cell slots the toggled trains pass
+        keys = ['x', 'y', 'cell_offset']
+        toggled = self.get_slotted_labels(self.path_labels[self.path_labels['trainID'].isin(changed)])
+        slots = pd.MultiIndex.from_frame(toggled[keys]).unique()
+        for slot in slots:
+            item_id = self.path_label_items.pop(slot, None)
+            if item_id is not None:
+                self.canvas.delete(item_id)
 
-        self.draw_paths()
+        # redraw these slots with the trains shown now
+        show_df = self.get_slotted_labels(self.show_df)
+        self.draw_path_labels(
+            show_df[pd.MultiIndex.from_frame(show_df[keys]).isin(slots)]
+        )
 
     def draw_paths(self):
-        """Draw the paths calculated in the solution."""
+        """Draw the paths calculated in the solution around the visible area."""
         self.canvas.delete("path_labels")
+        self.path_label_items = {}
+        self.path_overlay_image = None
+        self.path_label_scaled_font = self.get_path_label_font()
+        self.path_label_bounds = self.get_view_bounds()
+        self.path_label_aggregate = self.cell_size * self.scale < PATH_LABEL_AGGREGATE_SIZE
+
+        if self.use_path_raster():
+            self.draw_path_raster()
+            return
+
+        self.draw_path_labels(self.get_slotted_labels(self.show_df))
+
+    def use_path_raster(self) -> bool:
+        """Check whether the paths are drawn as a rasterized overlay.
+
+        Returns:
+            bool (boolean):
+                whether to rasterize, automatically if there are too many
+                labels in the drawn area.
+        """
+        if self.raster_paths is not None:
+            return self.raster_paths
+
+        row_start, row_end, col_start, col_end = self.path_label_bounds
+        labels = self.show_df
+        count = (
+            (labels['y'] >= row_start) & (labels['y'] < row_end) &
+            (labels['x'] >= col_start) & (labels['x'] < col_end)
+        ).sum()
+        return count > PATH_RASTER_LABEL_LIMIT
+
+    def draw_path_raster(self):
+        """Draw the paths of all shown trains as one rasterized overlay."""
+        adjusted_cell_size = self.cell_size * self.scale
+        key = (
+            frozenset(self.shown_trains),
+            round(adjusted_cell_size, 3),
+            self.path_label_bounds,
+            self.path_ticks,
+        )
+
+        if key in self.path_raster_cache:
+            self.path_raster_cache.move_to_end(key)
+        else:
+            overlay = render_paths(
+                self.show_df, self.train_colors, self.path_label_bounds,
+                adjusted_cell_size, self.path_ticks
+            )
+            self.path_raster_cache[key] = ImageTk.PhotoImage(overlay)
+            while len(self.path_raster_cache) > PATH_RASTER_CACHE_SIZE:
+                self.path_raster_cache.popitem(last=False)
+
+        self.path_overlay_image = self.path_raster_cache[key]
+        row_start, _, col_start, _ = self.path_label_bounds
+        self.canvas.create_image(
+            self.x_offset + col_start * adjusted_cell_size,
+            self.y_offset + row_start * adjusted_cell_size,
+            anchor="nw",
+            image=self.path_overlay_image,
+            tags="path_labels"
+        )
+
+    def get_slotted_labels(self, labels) -> pd.DataFrame:
+        """Move all labels to the center slot if cells get one label each.
+
+        Args:
+            labels (pd.DataFrame):
+                subset of path_labels.
+
+        Returns:
+            labels (pd.DataFrame):
+                the labels with the slots of the current zoom level.
+        """
+        if self.path_label_aggregate:
+            return labels.assign(cell_offset=0)
+        return labels
+
+    def draw_path_labels(self, labels):
+        """Draw path labels inside the drawn area, one per cell slot.
+
+        Labels of several timesteps in the same cell slot are combined.
+        Combined labels of whole cells only show the first timestep.
+
+        Args:
+            labels (pd.DataFrame):
+                subset of show_df to draw.
+        """
         adjusted_cell_size = self.cell_size * self.scale
 
         # manage multiple ids in the same grid cell
@@ -3329,33 +3850,42 @@ class ResultCanvas:
             8: (adjusted_cell_size * 0.2, adjusted_cell_size * 0.8),
         }
 
-        colors = (
-                AGENT_COLORS * ((len(self.paths_df) // len(AGENT_COLORS)) + 1)
-        )
-        train_colors = dict(zip(self.paths_df['trainID'].unique(), colors))
-
-        font = self.path_label_font.copy()
-        sysmod = 2 if sys_platform == 'Darwin' else 1   # double the font size for mac
+        # cull labels outside the drawn area
+        row_start, row_end, col_start, col_end = self.path_label_bounds
+        labels = labels[
+            (labels['y'] >= row_start) & (labels['y'] < row_end) &
+            (labels['x'] >= col_start) & (labels['x'] < col_end)
+        ]
 
-        # if there is more than one path displayed shrink the font by  2/3
-        if len(self.show_df['trainID'].unique()) > 1:
-            font.config(size=int(self.path_label_font.cget("size") * (adjusted_cell_size / 100) * (2/3) * sysmod))
+        # combine labels sharing a cell slot, colored by the first train
+        keys = ['x', 'y', 'cell_offset']
+        overlap = labels.duplicated(keys, keep=False)
+        single = labels[~overlap]
+        if self.path_label_aggregate:
+            combine = lambda t: f'{min(t)}+'
         else:
-            font.config(size=int(self.path_label_font.cget("size") * (adjusted_cell_size / 100) * sysmod))
+            combine = lambda t: ','.join(map(str, t))
+        merged = (labels[overlap]
+                  .groupby(keys, sort=False)
+                  .agg(trainID=('trainID', 'first'), timestep=('timestep', combine))
+                  .reset_index())
 
         # draw each train position for each timestep
-        for _, row in self.show_df.iterrows():
-            self.canvas.create_text(
-                (self.x_offset + row['x'] * adjusted_cell_size +
-                 offset_dict[row['cell_offset']][0]),
-                (self.y_offset + row['y'] * adjusted_cell_size +
-                 offset_dict[row['cell_offset']][1]),
-                text=row['timestep'],
-                anchor="center",
-                font=font,
-                fill=train_colors[row['trainID']],
-                tags="path_labels"
-            )
+        for df in (single, merged):
+            for x, y, cell_offset, train, timestep in zip(
+                    df['x'], df['y'], df['cell_offset'], df['trainID'], df['timestep']
+            ):
+                self.path_label_items[(x, y, cell_offset)] = self.canvas.create_text(
+                    (self.x_offset + x * adjusted_cell_size +
+                     offset_dict[cell_offset][0]),
+                    (self.y_offset + y * adjusted_cell_size +
+                     offset_dict[cell_offset][1]),
+                    text=timestep,
+                    anchor="center",
+                    font=self.path_label_scaled_font,
+                    fill=self.train_colors[train],
+                    tags="path_labels"
+                )
 
 
 class PathListCanvas:
@@ -14,18 +14,24 @@ Example usage:
     )
 """
 
+import io
 import platform
 import warnings
+import threading
 import tkinter as tk
 from tkinter import ttk
 from typing import Union, Tuple, Dict, List
+from collections import OrderedDict
 
-from PIL import Image, ImageTk, ImageDraw, ImageSequence
+from PIL import Image, ImageTk, ImageDraw
 
 
 # Platform:
 sys_platform = platform.system()
 
+GIF_CACHE_BYTES = 256 * 1024**2  # Max. size of the decoded and resized frames of a ZoomableGIF
+GIF_LOOKAHEAD = 2  # Frames a ZoomableGIF prepares ahead of the current one
+
 
 class Window:
     """A customized Tkinter Window.
@@ -767,7 +773,12 @@ class GIF:
         corner_radius (int):
             specifies the radius of the corners of the GIF in pixel.
         frames (list[ImageTk.PhotoImage]):
-            holds the individual images of the GIF.
+            holds the individual images of the GIF converted so far.
+        decoded (list[Image.Image]):
+            frames resized and rounded off by the loading thread. Set to
+            None once converted to frames.
+        loaded (bool):
+            whether the loading thread decoded all frames.
         delay (int):
             the delay between frames in milliseconds.
         frame_index (int):
@@ -776,6 +787,8 @@ class GIF:
             the actual GIF that is initialized internally with the
             passed parameters.
     """
+    corner_masks = {}  # rounded corner masks by size and radius
+
     def __init__(
             self,
             root,
@@ -897,10 +910,11 @@ class GIF:
         return
 
     def get_gif(self, gif_path: str) -> Tuple[List[ImageTk.PhotoImage], int]:
-        """Extracts individual frames and delay from the original GIF.
+        """Extracts the first frame and delay from the original GIF.
 
-        Extracts individual frames, rescales them to the size specified by the
-        current attributes and rounds off the corners.
+        Rescales the first frame to the size specified by the current
+        attributes and rounds off the corners. The remaining frames are
+        prepared by a background thread and converted on first display.
 
         Args:
             gif_path (str):
@@ -908,44 +922,74 @@ class GIF:
 
         Returns:
             frames (list[ImageTk.PhotoImage]):
-                list of the individual images of the GIF.
+                list holding the first image of the GIF.
             delay (int):
                 the delay between frames in milliseconds.
         """
         gif = Image.open(gif_path)
-        frames = []
         delay = gif.info.get("duration", 100)
 
         # rescale the GIF to the size specified by the current attributes
         original_width, original_height = gif.size
         scale = min(self.width / original_width, self.height / original_height)
-        new_width = int(original_width * scale)
-        new_height = int(original_height * scale)
+        size = (int(original_width * scale), int(original_height * scale))
 
-        try:
-            while True:
-                # extract the individual frames
-                frame = gif.copy().convert("RGBA")
-                frame = frame.resize(
-                    (new_width, new_height),
-                    Image.Resampling.LANCZOS
-                )
-                # round off corners
-                frame = self.round_corners(frame, self.corner_radius)
+        self.decoded = [self.prepare_frame(gif, size)]
+        self.loaded = False
+
+        # prepare the other frames in the background
+        threading.Thread(
+            target=self._load_frames,
+            args=(gif, size),
+            daemon=True
+        ).start()
 
-                # add to list of frames
-                frames.append(ImageTk.PhotoImage(frame))
+        return [ImageTk.PhotoImage(self.decoded[0])], delay
 
+    def _load_frames(self, gif, size):
+        """Extract, rescale and round off all frames after the first one.
+
+        Args:
+            gif (Image.Image):
+                the opened GIF, positioned on its first frame.
+            size (tuple(int,int)):
+                width and height of the frames.
+        """
+        try:
+            while True:
                 # Move to the next frame
-                gif.seek(len(frames))
+                gif.seek(len(self.decoded))
+                self.decoded.append(self.prepare_frame(gif, size))
         except EOFError:
             pass
-        return frames, delay
+        finally:
+            gif.close()
+            self.loaded = True
+
+    def prepare_frame(self, gif, size) -> Image.Image:
+        """Rescale the current frame of a GIF and round off its corners.
+
+        Args:
+            gif (Image.Image):
+                the opened GIF.
+            size (tuple(int,int)):
+                width and height of the frame.
+
+        Returns:
+            frame (Image.Image):
+                the prepared frame.
+        """
+        frame = gif.copy().convert("RGBA")
+        frame = frame.resize(size, Image.Resampling.LANCZOS)
+        # round off corners
+        return self.round_corners(frame, self.corner_radius)
 
-    @staticmethod
-    def round_corners(img: Image.Image, radius: int) -> Image.Image:
+    @classmethod
+    def round_corners(cls, img: Image.Image, radius: int) -> Image.Image:
         """Rounds off the corners of an image.
 
+        The mask is computed once per image size and radius.
+
         Args:
             img (Image.Image):
                 the image whose corner should be rounded off.
@@ -956,12 +1000,15 @@ class GIF:
             img (Image.Image):
                 the image with its corners rounded off.
         """
-        mask = Image.new("L", img.size, 0)
-        draw = ImageDraw.Draw(mask)
-
-        draw.rounded_rectangle((0, 0, img.width, img.height), radius=radius,
-                               fill=255)
-        img.putalpha(mask)
+        key = (img.size, radius)
+        if key not in cls.corner_masks:
+            mask = Image.new("L", img.size, 0)
+            draw = ImageDraw.Draw(mask)
+
+            draw.rounded_rectangle((0, 0, img.width, img.height), radius=radius,
+                                   fill=255)
+            cls.corner_masks[key] = mask
+        img.putalpha(cls.corner_masks[key])
         return img
 
     def update_animation(self):
@@ -969,13 +1016,22 @@ class GIF:
 
         Put the first frame with the current index in the Label.
         Increment the index by one unless the last frame is reached then go back
-        to 0. After the delay time, specified by the delay attribute call this
-        function again.
+        to 0. Frames that are not prepared yet are waited for. After the delay
+        time, specified by the delay attribute call this function again.
         """
-        if self.frames:
+        # convert frames prepared in the background on first display
+        if self.frame_index == len(self.frames) and self.frame_index < len(self.decoded):
+            self.frames.append(ImageTk.PhotoImage(self.decoded[self.frame_index]))
+            self.decoded[self.frame_index] = None
+
+        if self.frame_index < len(self.frames):
             self.label.config(image=self.frames[self.frame_index])
-            self.frame_index = (self.frame_index + 1) % len(self.frames)
-            self.label.after(self.delay, self.update_animation)
+            self.frame_index += 1
+
+        # go back to 0 once all frames were shown
+        if self.loaded and self.frame_index >= len(self.decoded):
+            self.frame_index = 0
+        self.label.after(self.delay, self.update_animation)
 
 
 class ZoomableGIF:
@@ -1027,16 +1083,21 @@ class ZoomableGIF:
             keeps track if currently a zoom process is in action.
         zoom_end (int):
             holds an event id when zooming to end the zoom process.
-        cached_frames (dict[float, List[ImageTk.PhotoImage]]):
-            holds scale values as a key for the individually cached GIF images.
-        frames (list[ImageTk.PhotoImage]):
-            holds the individual images of the GIF.
-        durations (list[int]):
-            the delays between frames in milliseconds.
+        cached_frames (OrderedDict):
+            decoded frames and resized images by scale, resampling method and
+            frame index, least recently used first.
+        cached_bytes (int):
+            estimated memory size of the cached frames in bytes.
+        durations (dict[int, int]):
+            the delays between frames in milliseconds of all decoded frames.
+        frame_count (int):
+            number of frames in the GIF. None until the end was decoded.
         current_frame_index (int):
             holds the current frame index.
         animate_id (int):
             holds an event id when animating to end the animation.
+        prefetch_id (int):
+            holds an event id of the scheduled lookahead.
         orig_size (tuple(int,int)):
             keeps track of the original GIF size.
         image (int):
@@ -1106,7 +1167,9 @@ class ZoomableGIF:
         self.visibility = visibility
 
         self.canvas = self.create_canvas()
-        self.gif = Image.open(gif)
+        # read into memory so the file is not kept open while decoding lazily
+        with open(gif, 'rb') as f:
+            self.gif = Image.open(io.BytesIO(f.read()))
 
         self.rows = rows
         self.cols = cols
@@ -1122,20 +1185,16 @@ class ZoomableGIF:
         self.zoom_factors = [1, 1.5, 2] # discrete zoom levels
         self.modify_zoom_levels()
 
-        self.cached_frames = {}
-        self.frames = []
-        self.durations = []
+        self.cached_frames = OrderedDict()
+        self.cached_bytes = 0
+        self.durations = {}
+        self.frame_count = None
         self.current_frame_index = 0
         self.animate_id = None
+        self.prefetch_id = None
 
-        # Load frames with their duration
-        for frame in ImageSequence.Iterator(self.gif):
-            self.frames.append(frame.convert("RGBA"))
-            self.durations.append(frame.info.get("duration", 100))
-        self.orig_size = self.frames[0].size
-
-        # Ensure the GIF will not run when quitting the program
-        self.gif.close()
+        # frames are decoded on demand
+        self.orig_size = self.gif.size
         self.image = self.canvas.create_image(self.offset_x, self.offset_y, anchor="nw")
 
         self.canvas.bind("<MouseWheel>", self.zoom)
@@ -1220,13 +1279,29 @@ class ZoomableGIF:
     def animate(self):
         """Animate the GIF."""
         # go to next frame and update the canvas with this frame
-        self.current_frame_index = (self.current_frame_index + 1) % len(self.frames)
+        self.current_frame_index = self.next_index(self.current_frame_index)
         self.update_image()
 
         # Delay to ensure correct durations
-        delay = self.durations[self.current_frame_index]
+        delay = self.durations.get(self.current_frame_index, 100)
         self.animate_id = self.root.after(delay, self.animate)
 
+    def next_index(self, index) -> int:
+        """Get the index of the following frame.
+
+        Args:
+            index (int):
+                the current frame index.
+
+        Returns:
+            index (int):
+                the next frame index, wrapping around once the end is known.
+        """
+        index += 1
+        if self.frame_count is not None:
+            index %= self.frame_count
+        return index
+
     def stop(self):
         """Stop animation and cancel all pending after calls."""
         if self.zoom_end is not None:
@@ -1235,6 +1310,9 @@ class ZoomableGIF:
         if self.animate_id is not None:
             self.root.after_cancel(self.animate_id)
             self.animate_id = None
+        if self.prefetch_id is not None:
+            self.root.after_cancel(self.prefetch_id)
+            self.prefetch_id = None
 
     def zoom(self, event):
         """Calculate new scale and offset.
@@ -1338,32 +1416,115 @@ class ZoomableGIF:
         self.pan_start_coord = (event.x, event.y)
         self.update_image()
 
-    def update_image(self):
-        """Updates the currently displayed image on the canvas."""
-        key = round(self.scale, 4)
+    def cache_frame(self, key, image, size):
+        """Add a frame to the cache and evict the least recently used ones.
 
-        # if the frames don't exist in the current zoom level resizes them
-        if key not in self.cached_frames:
-            resized_frames = []
-            # use a faster resampling method while actively zooming
-            resample_method = Image.Resampling.NEAREST \
-                if self.zooming else Image.Resampling.LANCZOS
+        Args:
+            key (tuple):
+                scale, resampling method and frame index of the frame.
+            image (Union[Image.Image, ImageTk.PhotoImage]):
+                the decoded frame or resized image.
+            size (tuple(int,int)):
+                width and height of the frame.
+        """
+        self.cached_frames[key] = (image, size[0] * size[1] * 4)
+        self.cached_bytes += size[0] * size[1] * 4
+
+        # always keep the newest frame
+        while self.cached_bytes > GIF_CACHE_BYTES and len(self.cached_frames) > 1:
+            _, (_, nbytes) = self.cached_frames.popitem(last=False)
+            self.cached_bytes -= nbytes
+
+    def decode_frame(self, index) -> Union[Image.Image, None]:
+        """Decode a frame of the GIF.
+
+        Args:
+            index (int):
+                the frame index.
+
+        Returns:
+            frame (Image.Image):
+                the decoded RGBA frame. None if the GIF has fewer frames.
+        """
+        key = (None, None, index)
+        if key in self.cached_frames:
+            self.cached_frames.move_to_end(key)
+            return self.cached_frames[key][0]
 
-            # resize the frames in the GIF to the specified size
-            for frame in self.frames:
-                new_width = int(frame.width * self.scale)
-                new_height = int(frame.height * self.scale)
-                resized_frame = frame.resize((new_width, new_height), resample=resample_method)
-                resized_frames.append(ImageTk.PhotoImage(resized_frame))
+        try:
+            # sequential seeks only decode one frame
+            self.gif.seek(index)
+        except EOFError:
+            self.frame_count = index
+            return None
+
+        self.durations[index] = self.gif.info.get("duration", 100)
+        frame = self.gif.convert("RGBA")
+        self.cache_frame(key, frame, frame.size)
+        return frame
+
+    def get_frame(self, index) -> Union[ImageTk.PhotoImage, None]:
+        """Get a frame resized to the current scale.
 
-            # cache the resized frames
-            self.cached_frames[key] = resized_frames
+        Args:
+            index (int):
+                the frame index.
+
+        Returns:
+            frame (ImageTk.PhotoImage):
+                the resized frame. None if the GIF has fewer frames.
+        """
+        # use a faster resampling method while actively zooming
+        resample_method = Image.Resampling.NEAREST \
+            if self.zooming else Image.Resampling.LANCZOS
+        key = (round(self.scale, 4), resample_method, index)
+
+        if key in self.cached_frames:
+            self.cached_frames.move_to_end(key)
+            return self.cached_frames[key][0]
+
+        frame = self.decode_frame(index)
+        if frame is None:
+            return None
+
+        # resize the frame to the specified size
+        new_width = max(1, int(frame.width * self.scale))
+        new_height = max(1, int(frame.height * self.scale))
+        resized_frame = ImageTk.PhotoImage(
+            frame.resize((new_width, new_height), resample=resample_method)
+        )
+        self.cache_frame(key, resized_frame, (new_width, new_height))
+        return resized_frame
+
+    def prefetch(self):
+        """Prepare the next frames at the current scale."""
+        self.prefetch_id = None
+        if self.zooming:
+            return
+
+        index = self.current_frame_index
+        for _ in range(GIF_LOOKAHEAD):
+            index = self.next_index(index)
+            if self.get_frame(index) is None:
+                break
+
+    def update_image(self):
+        """Updates the currently displayed image on the canvas."""
+        canvas_gif = self.get_frame(self.current_frame_index)
+
+        # restart once the end of the GIF is reached
+        if canvas_gif is None:
+            self.current_frame_index = 0
+            canvas_gif = self.get_frame(0)
 
         # display the current frame on the canvas
-        canvas_gif = self.cached_frames[key][self.current_frame_index]
         self.canvas.itemconfig(self.image, image=canvas_gif)
         self.canvas.coords(self.image, self.offset_x, self.offset_y)
 
+        # prepare the next frames while idle
+        if self.prefetch_id is None:
+            self.prefetch_id = self.root.after_idle(self.prefetch)
+
 
 class EntryField:
     """A custom tkinter Entry.
@@ -1,8 +1,10 @@
 import os
 import shutil
-import importlib
+import json
+import importlib.util
 import numpy as np
 from random import seed, randint
+from code.config import DEFAULT_PARAMS
 MALFUNCTIONS_EXIST = False
 
 def ensure_directory(d):
@@ -107,6 +109,40 @@ def save_env(tracks, trains, user_params, name="data/running_tmp.lp"):
         write_tracks(tracks, lp)
 
 
+def parse_params(data):
+    """Converts user parameters from JSON and fills missing ones with defaults.
+
+    Args:
+        data (dict): Parameters in the format of data/user_params.json.
+
+    Returns:
+        dict: Complete user parameters.
+    """
+    params = dict(DEFAULT_PARAMS)
+    for key, value in data.items():
+        if value is None or value == []:
+            continue  # Use default
+        if key == 'speedMap':
+            value = {float(k): float(v) for k, v in value.items()}
+        elif key == 'malfunction':
+            value = (value[0], value[1])
+        params[key] = value
+    return params
+
+
+def load_params(path="data/user_params.json"):
+    """Loads user parameters from a JSON file.
+
+    Args:
+        path (str): Path of the JSON file.
+
+    Returns:
+        dict: Complete user parameters.
+    """
+    with open(path, 'r') as file:
+        return parse_params(json.load(file))
+
+
 def delete_tmp_lp():
     """Deletes the temporary .lp file of the environment.
     """
@@ -171,6 +207,9 @@ def delete_tmp_malfunctions():
 def initial_import_test():
     """Checks for essential Python modules required by the program.
 
+    Only locates the modules without importing them, they are loaded
+    when first needed.
+
     Returns:
         list[str]: Missing module names.
     """
@@ -184,11 +223,9 @@ def initial_import_test():
         'matplotlib'
     ]
     missing_modules = []
-    # Iterate over each required module and try to import it
+    # Iterate over each required module and try to locate it
     for module in required_modules:
-        try:
-            importlib.import_module(module)
-        except ImportError:
+        if importlib.util.find_spec(module) is None:
             if module == 'flatland':
                 missing_modules.append('flatland-rl')
             elif module == 'PIL':
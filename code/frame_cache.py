@@ -0,0 +1,147 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import numpy as np
+
+CACHE_DIR = "data/frame_cache"  # Persistent frame cache across sessions
+CACHE_SIZE_LIMIT = 2 * 1024**3  # Max. cache size in bytes (2 GB)
+MANIFEST = "manifest.json"  # Frame list of a cache entry
+
+def scene_key(tracks, trains, screen_res, renderer, remove):
+    """Calculates a content hash for everything of an animation except the plan.
+
+    Args:
+        tracks (list[list[int]] or np.ndarray): 2D list of track types.
+        trains (pd.DataFrame): Train configuration.
+        screen_res (int): Render resolution.
+        renderer (str): Rendering mode.
+        remove (bool): Flag for removing trains without position.
+
+    Returns:
+        str: Hex digest identifying the scene.
+    """
+    h = hashlib.sha256()
+    grid = np.asarray(tracks, dtype=np.uint16)
+    h.update(str(grid.shape).encode())
+    h.update(grid.tobytes())
+    train_cols = ['id', 'x', 'y', 'dir', 'x_end', 'y_end']
+    h.update(trains[train_cols].to_csv(index=False).encode())
+    h.update(f"{screen_res}|{renderer}|{bool(remove)}".encode())
+    return h.hexdigest()
+
+
+def animation_key(scene, df_pos):
+    """Calculates a content hash for a rendered animation.
+
+    Args:
+        scene (str): Scene key of tracks, trains, resolution and renderer.
+        df_pos (pd.DataFrame): Train positions.
+
+    Returns:
+        str: Hex digest identifying the animation.
+    """
+    h = hashlib.sha256(scene.encode())
+    # Positions in a stable order
+    pos_cols = ['trainID', 'x', 'y', 'dir', 'timestep']
+    df_sorted = df_pos[pos_cols].sort_values(by=['trainID', 'timestep'])
+    h.update(df_sorted.to_csv(index=False).encode())
+    return h.hexdigest()
+
+
+def entry_size(entry_dir):
+    """Calculates the size of a cache entry.
+
+    Args:
+        entry_dir (str): Directory of the cache entry.
+
+    Returns:
+        int: Size in bytes.
+    """
+    size = 0
+    for file in os.scandir(entry_dir):
+        if file.is_file():
+            size += file.stat().st_size
+    return size
+
+
+def load_cached_frames(key):
+    """Looks up the frames of an animation in the cache.
+
+    Marks the entry as recently used.
+
+    Args:
+        key (str): Animation key.
+
+    Returns:
+        list[tuple[int, str]] or None: (timestep, frame path) pairs, or None on a miss.
+    """
+    entry_dir = os.path.join(CACHE_DIR, key)
+    manifest_path = os.path.join(entry_dir, MANIFEST)
+    if not os.path.isfile(manifest_path):
+        return None
+    try:
+        with open(manifest_path, 'r') as f:
+            manifest = json.load(f)
+        frames = [(int(t), os.path.join(entry_dir, name)) for t, name in manifest["frames"]]
+    except (OSError, ValueError, KeyError):
+        return None  # Broken entry is treated as a miss
+    if not all(os.path.isfile(path) for _, path in frames):
+        return None
+    os.utime(manifest_path)  # LRU timestamp
+    return frames
+
+
+def store_frames(key, frames):
+    """Copies rendered frames into the cache and enforces the size limit.
+
+    Args:
+        key (str): Animation key.
+        frames (list[tuple[int, str]]): (timestep, frame path) pairs.
+    """
+    entry_dir = os.path.join(CACHE_DIR, key)
+    try:
+        os.makedirs(entry_dir, exist_ok=True)
+        names = []
+        for t, path in frames:
+            name = os.path.basename(path)
+            shutil.copy2(path, os.path.join(entry_dir, name))
+            names.append((t, name))
+        # Manifest is written last, so incomplete entries count as misses
+        with open(os.path.join(entry_dir, MANIFEST), 'w') as f:
+            json.dump({"frames": names, "created": time.time()}, f)
+    except OSError as e:
+        print(f"⚠️ Frame cache could not be written:\n{e}")
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        return
+    enforce_cache_limit(keep=key)
+
+
+def enforce_cache_limit(keep=None, limit=CACHE_SIZE_LIMIT):
+    """Removes least recently used cache entries until the cache fits the limit.
+
+    Args:
+        keep (str): Animation key that must not be removed.
+        limit (int): Max. cache size in bytes.
+    """
+    if not os.path.isdir(CACHE_DIR):
+        return
+    entries = []
+    for entry in os.scandir(CACHE_DIR):
+        if not entry.is_dir():
+            continue
+        manifest_path = os.path.join(entry.path, MANIFEST)
+        # Entries without manifest are oldest
+        last_used = os.path.getmtime(manifest_path) if os.path.isfile(manifest_path) else 0
+        entries.append((last_used, entry.name, entry.path, entry_size(entry.path)))
+    total = sum(e[3] for e in entries)
+    # Oldest entries first
+    for _, name, path, size in sorted(entries):
+        if total <= limit:
+            break
+        if name == keep:
+            continue
+        shutil.rmtree(path, ignore_errors=True)
+        total -= size
+
@@ -1,7 +1,9 @@
+import os
 import math
+import time
 import random
 import warnings
-import matplotlib.pyplot as plt
+import multiprocessing
 import pandas as pd
 import numpy as np
 from flatland.envs.rail_env import RailEnv
@@ -13,11 +15,30 @@ from flatland.envs.observations import GlobalObsForRailEnv
 from flatland.envs.timetable_utils import Line
 from flatland.envs.rail_trainrun_data_structures import Waypoint
 from flatland.utils.rendertools import RenderTool
-from code.build_png import calc_resolution, pil_config
-from code.config import TRACKS, DEAD_ENDS
+from PIL import Image
+from code.build_png import calc_resolution, pil_config, preview_worker
+from code.native_render import render_image, env_agents, native_cell_size
+from code.transitions import TRACK_CODES, TRACK_INDEX, IS_DEAD_END, ALLOWED_DIRS
+
+RAIL_RETRY_SIZES = 5  # Larger grids tried when the rail generator fails
+RAIL_RETRY_SEEDS = 5  # Other seeds tried at the requested size
+
+
+def new_gen_state(parallel_retries=True):
+    """Creates the state shared between the line generator and create_env.
+
+    Every generation gets its own state, so environments can be generated concurrently.
+
+    Args:
+        parallel_retries (bool): Flag for retrying failed rail generations in
+            worker processes, off for callers that already run in one.
+
+    Returns:
+        dict: Station 'hints' and agent 'speeds' of the last line generation,
+              all rail generation 'attempts' and the 'parallel_retries' flag.
+    """
+    return {'hints': None, 'speeds': None, 'attempts': [], 'parallel_retries': parallel_retries}
 
-LAST_HINTS = None
-LAST_SPEEDS = None
 
 def create_agents_from_train_stations(hints, num_agents, np_random):
     """Generates agent positions, directions, and targets from station hints.
@@ -74,22 +95,23 @@ def prep_speed_distr(speed_map):
     return speeds, probs
 
 
-def custom_sparse_line_generator(env_params, seed=1):
+def custom_sparse_line_generator(env_params, seed=1, state=None):
     """Creates a custom line generator for agent generation.
 
     Args:
         env_params (dict): Parameters for the environment.
         seed (int, optional): Random seed. Default is 1.
+        state (dict, optional): Receives the last 'hints' and 'speeds' of the generator.
 
     Returns:
         function: Custom line generator function.
     """
     base_line_gen = sparse_line_generator(env_params["speedMap"], seed)
     speed_v, speed_p = prep_speed_distr(env_params["speedMap"])
+    if state is None:
+        state = new_gen_state()
 
     def generator(rail, num_agents, hints, num_resets, np_random):
-        global LAST_HINTS, LAST_SPEEDS
-        
         # When there are no hints, generate dummy hints.
         if hints is None or 'train_stations' not in hints or 'city_positions' not in hints or 'city_orientations' not in hints:
             hints = {
@@ -100,7 +122,7 @@ def custom_sparse_line_generator(env_params, seed=1):
                 'city_positions': [(0, 0), (env_params['cols']-1, env_params['rows']-1)],
                 'city_orientations': [0, 0]
             }
-        LAST_HINTS = hints  # Save for DF
+        state['hints'] = hints  # Save for DF
 
         # Attempt to generate agents based on the provided hints.
         try:
@@ -114,7 +136,7 @@ def custom_sparse_line_generator(env_params, seed=1):
             # Random speeds
             sampled = np_random.choice(speed_v, size=num_agents, p=speed_p)
             speeds = [x for x in sampled.tolist()]
-            LAST_SPEEDS = speeds  # consistency for create_env
+            state['speeds'] = speeds  # consistency for create_env
             # Line for Flatland
             line = Line(
                 agent_waypoints=waypoints,
@@ -129,31 +151,32 @@ def custom_sparse_line_generator(env_params, seed=1):
     return generator
 
 
-def extract_trains_from_hints(hints, np_random, env_params):
+def extract_trains_from_hints(hints, np_random, env_params, state):
     """Creates a DataFrame of train configuration using station hints.
 
     Args:
         hints (dict): Station information.
         np_random (np.random.RandomState): Random state for reproducibility.
         env_params (dict): Environment parameters.
+        state (dict): Generation state with the last 'speeds'.
 
     Returns:
         pd.DataFrame: Train configuration.
     """
-    global LAST_SPEEDS
     num_agents = env_params["agents"]
     agents_positions, agents_directions, agents_targets = create_agents_from_train_stations(hints, num_agents, np_random)
     direction_map = {0: 'n', 1: 'e', 2: 's', 3: 'w'}
     # Default for Lastest Arrival based on Dimensions and number of Agents
     l_arr = math.ceil(3 * max(env_params['rows'], env_params['cols'])) + 2 * num_agents
     # Inversed Speeds
-    if LAST_SPEEDS is not None and len(LAST_SPEEDS) == num_agents:
-        inv_speeds = [int(round(1.0/float(spd))) for spd in LAST_SPEEDS]
+    speeds = state['speeds']
+    if speeds is not None and len(speeds) == num_agents:
+        inv_speeds = [int(round(1.0/float(spd))) for spd in speeds]
     else:
         speed_v, speed_p = prep_speed_distr(env_params["speedMap"])
         sampled = np_random.choice(speed_v, size=num_agents, p=speed_p)
-        LAST_SPEEDS = [x for x in sampled.tolist()]
-        inv_speeds = [int(round(1.0/float(spd))) for spd in LAST_SPEEDS]
+        state['speeds'] = [x for x in sampled.tolist()]
+        inv_speeds = [int(round(1.0/float(spd))) for spd in state['speeds']]
     # Construct a dictionary for DF columns.
     data = {
         "id": list(range(num_agents)),
@@ -202,118 +225,63 @@ def fallback_reset(env):
     return obs, info
 
 
-def get_allowed_dirs(track):
-    """Determines allowed directions for a given track type.
+def build_track_repairs():
+    """Builds a lookup table that maps every 16-bit transition to a valid track.
 
-    Args:
-        track (int): Track type.
+    Dead-ends become straight tracks, known problematic transitions their
+    intended track and unknown invalid transitions an empty cell.
 
     Returns:
-        list[int]: Allowed direction codes (0: 'n', 1: 'e', 2: 's', 3: 'w').
+        np.ndarray: Repaired track ID for every transition.
     """
-    # If there is no track, return an empty list
-    if track == 0: return []
-    # List for allowed directions
-    allowed_dirs = []
-    # Define track IDs that allow movement in each direction
-    tracks_to_n = [32800, 4608, 16386, 37408,
-                   17411, 32872, 49186, 34864,
-                   5633, 33825, 38433, 50211,
-                   33897, 35889, 38505, 52275,
-                   20994, 16458, 6672]
-    tracks_to_e = [1025, 4608, 2064, 37408,
-                   17411, 3089, 1097, 34864,
-                   5633, 33825, 38433, 50211,
-                   33897, 35889, 38505, 52275,
-                   20994, 2136, 6672]
-    tracks_to_s = [32800, 72, 2064, 37408,
-                   32872, 3089, 49186, 1097,
-                   34864, 33825, 38433, 50211,
-                   33897, 35889, 38505, 52275,
-                   16458, 2136, 6672]
-    tracks_to_w = [1025, 16386, 72, 17411,
-                   32872, 3089, 49186, 1097,
-                   5633, 33825, 38433, 50211,
-                   33897, 35889, 38505, 52275,
-                   20994, 16458, 2136]
-    # Append numeric direction if track is in corresponding list
-    if track in tracks_to_n: allowed_dirs.append(0)
-    if track in tracks_to_e: allowed_dirs.append(1)
-    if track in tracks_to_s: allowed_dirs.append(2)
-    if track in tracks_to_w: allowed_dirs.append(3)
-    return allowed_dirs
-
-
-def validate_track(env, row, col):
-    """Validates and adjusts the track transition for a given cell.
-
-    Checks for dead-ends and known problematic track values.
-    Replaces invalid or unknown track transitions with appropriate defaults,
-    and updates the environment's grid accordingly.
+    repairs = np.zeros(2**16, dtype=np.uint16)  # Unknown cases are removed
+    repairs[TRACK_CODES] = TRACK_CODES
+    # Dead-ends are replaced with a straight track
+    repairs[[4, 256]] = 1025
+    repairs[[8192, 128]] = 32800
+    # Known problem cases
+    repairs[[1285, 1281, 1029]] = 1025
+    repairs[[41120, 40992, 32928]] = 32800
+    repairs[[40996, 32804]] = 49186
+    repairs[32932] = 32872
+    repairs[9473] = 5633
+    repairs[9221] = 17411
+    return repairs
 
-    Args:
-        env (RailEnv): Flatland environment.
-        row (int): Row index of cell.
-        col (int): Column index of cell.
 
-    Returns:
-        int: Validated track value.
-    """
-    transition = env.rail.get_full_transitions(row, col)
-    # If track is a dead-end, replace it with a straight track
-    if transition in DEAD_ENDS:
-        print("> Dead-end at (" + str(row) + "," + str(col) + ") replaced.")
-        if transition == 4 or transition == 256:
-            transition = 1025
-        else:
-            transition = 32800
-    # If the transition is non-zero but invalid, fix it
-    elif transition != 0:
-        if transition not in TRACKS:
-            # Known problem cases
-            if transition in {1285, 1281, 1029}:
-                transition = 1025
-            elif transition in {41120, 40992, 32928}:
-                transition = 32800
-            elif transition in {40996}:
-                transition = 49186
-            elif transition in {32932}:
-                transition = 32872
-            elif transition in {32804}:
-                transition = 49186
-            elif transition in {9473}:
-                transition = 5633
-            elif transition in {9221}:
-                transition = 17411
-            else:
-                # Unknown problem cases
-                print(f"> UNKNOWN: {transition} at ({row},{col}) removed.")
-                transition = 0
-            print(f"> Invalid track at ({row},{col}) replaced.")
-    # Update env with validated transition
-    env.rail.grid[row, col] = transition
-    return int(transition)
+TRACK_REPAIRS = build_track_repairs()
 
 
 def extract_tracks(env):
     """Extracts a 2D list of track types from the environment.
 
+    Replaces dead-ends and invalid transitions on the whole grid at once,
+    updates the environment's grid accordingly and prints a summary.
+
     Args:
         env (RailEnv): Flatland environment.
 
     Returns:
         list[list[int]]: 2D list representing track types for each cell.
     """
-    tracks = []
-    for row in range(env.height):
-        track_row = []
-        for col in range(env.width):
-            # Validate track and add it to the row
-            track = validate_track(env, row, col)
-            track_row.append(track)
-        # Append the row to the tracks list
-        tracks.append(track_row)
-    return tracks
+    grid = np.asarray(env.rail.grid, dtype=np.uint16)
+    tracks = TRACK_REPAIRS[grid]
+    changed = tracks != grid
+    if changed.any():
+        dead_ends = IS_DEAD_END[grid]
+        unknown = changed & (tracks == 0) & ~dead_ends
+        n_dead_ends = int(np.count_nonzero(dead_ends))
+        n_invalid = int(np.count_nonzero(changed & ~dead_ends))
+        if n_dead_ends:
+            print(f"> {n_dead_ends} dead-end(s) replaced.")
+        if unknown.any():
+            print(f"> UNKNOWN: {sorted(np.unique(grid[unknown]).tolist())} "
+                  f"removed at {int(np.count_nonzero(unknown))} cell(s).")
+        if n_invalid:
+            print(f"> {n_invalid} invalid track(s) replaced.")
+        # Update env with validated transitions
+        env.rail.grid[changed] = tracks[changed]
+    return tracks.tolist()
 
 
 def extract_trains(env):
@@ -409,16 +377,154 @@ def render_time_prediction(timesteps, cells):
     return seconds_to_str(sec)
 
 
-def create_env(env_params):
+def build_rail_generator(env_params, seed):
+    """Creates Flatland's sparse rail generator for the environment parameters.
+
+    Args:
+        env_params (dict): Environment parameters.
+        seed (int): Random seed of the generator.
+
+    Returns:
+        function: Rail generator.
+    """
+    return sparse_rail_generator(
+        max_num_cities=env_params['cities'],
+        seed=seed,
+        grid_mode=env_params['grid'],
+        max_rails_between_cities=env_params['intercity'],
+        max_rail_pairs_in_city=env_params['incity']
+    )
+
+
+def rail_attempt(env_params, width, height, seed, number_of_agents, num_resets, np_random):
+    """Generates the rails of one candidate size and seed.
+
+    Args:
+        env_params (dict): Environment parameters.
+        width (int): Width of the candidate grid.
+        height (int): Height of the candidate grid.
+        seed (int): Random seed of the candidate.
+        number_of_agents (int): Number of agents.
+        num_resets (int): Number of environment resets.
+        np_random (np.random.RandomState): Random state of the environment.
+
+    Returns:
+        tuple: Rail and optionals (None on failure), duration in seconds and error message.
+    """
+    start = time.perf_counter()
+    try:
+        with warnings.catch_warnings():
+            warnings.filterwarnings("ignore", category=UserWarning)
+            rail_gen = build_rail_generator(env_params, seed)
+            rail, optionals = rail_gen(width, height, number_of_agents, num_resets, np_random)
+        return rail, optionals, time.perf_counter() - start, ""
+    except Exception as e:
+        return None, None, time.perf_counter() - start, f"{type(e).__name__}: {e}"
+
+
+def record_rail_attempt(state, width, height, seed, seconds, error=None):
+    """Records and prints one rail generation attempt.
+
+    Args:
+        state (dict): Generation state with the list of 'attempts'.
+        width (int): Width of the attempted grid.
+        height (int): Height of the attempted grid.
+        seed (int): Random seed of the attempt.
+        seconds (float): Duration of the attempt, None if it was cancelled.
+        error (Exception or str, optional): Reason of a failed attempt.
+    """
+    if seconds is None:
+        status = 'cancelled'
+    elif error:
+        status = 'error'
+    else:
+        status = 'ok'
+    state['attempts'].append({
+        'width': width,
+        'height': height,
+        'seed': seed,
+        'status': status,
+        'seconds': None if seconds is None else round(seconds, 3),
+        'error': str(error) if error else '',
+    })
+    if status != 'cancelled':
+        symbol = "✅" if status == 'ok' else "❌"
+        print(f"> Rails {height}x{width} (seed {seed}): {symbol} {seconds:.2f}s")
+
+
+def retry_rail_gen(env_params, width, height, number_of_agents, num_resets, np_random, state):
+    """Retries a failed rail generation with several candidates.
+
+    Candidates are larger grids with the same seed, followed by the requested
+    grid with other seeds. The first candidate in this order that succeeds
+    wins, so results stay reproducible.
+
+    Serially, all candidates draw from the environment's random state one
+    after another, like the former size-only retry. In parallel, every
+    candidate gets a copy of the random state after the failed attempt, and
+    the workers of the remaining candidates are terminated once one has
+    succeeded.
+
+    Args:
+        env_params (dict): Environment parameters.
+        width (int): Requested width.
+        height (int): Requested height.
+        number_of_agents (int): Number of agents.
+        num_resets (int): Number of environment resets.
+        np_random (np.random.RandomState): Random state of the environment.
+        state (dict): Generation state with the list of 'attempts' and the 'parallel_retries' flag.
+
+    Returns:
+        tuple: Rail and optionals of the winning candidate.
+    """
+    seed = env_params['seed']
+    candidates = [(width + i, height + i, seed) for i in range(1, RAIL_RETRY_SIZES + 1)]
+    if seed is not None:
+        candidates += [(width, height, seed + i) for i in range(1, RAIL_RETRY_SEEDS + 1)]
+
+    if not state.get('parallel_retries', True):
+        for i, (w, h, s) in enumerate(candidates):
+            rail, optionals, seconds, error = rail_attempt(env_params, w, h, s, number_of_agents, num_resets, np_random)
+            record_rail_attempt(state, w, h, s, seconds, error)
+            if rail is not None:
+                for w_next, h_next, s_next in candidates[i+1:]:
+                    record_rail_attempt(state, w_next, h_next, s_next, None)
+                return rail, optionals
+        raise RuntimeError(f"Rail generation failed in all {len(candidates) + 1} attempts:\n{error}")
+
+    # Spawned workers: forking the threads of the GUI can deadlock
+    pool = multiprocessing.get_context("spawn").Pool(processes=min(len(candidates), os.cpu_count() or 1))
+    try:
+        results = [
+            pool.apply_async(rail_attempt, (env_params, w, h, s, number_of_agents, num_resets, np_random))
+            for w, h, s in candidates
+        ]
+        for i, ((w, h, s), result) in enumerate(zip(candidates, results)):
+            rail, optionals, seconds, error = result.get()
+            record_rail_attempt(state, w, h, s, seconds, error)
+            if rail is not None:
+                # Later candidates are not needed anymore
+                for w_next, h_next, s_next in candidates[i+1:]:
+                    record_rail_attempt(state, w_next, h_next, s_next, None)
+                return rail, optionals
+        raise RuntimeError(f"Rail generation failed in all {len(candidates) + 1} attempts:\n{error}")
+    finally:
+        # Stop attempts that are still running, so they do not keep cores busy behind the GUI
+        pool.terminate()
+
+
+def create_env(env_params, state=None):
     """Creates a Flatland environment based on the provided parameters.
 
     Args:
         env_params (dict): Environment parameters.
+        state (dict, optional): Receives the 'hints' and 'speeds' of the line generator.
 
     Returns:
         RailEnv: Generated Flatland environment.
     """
-    global LAST_SPEEDS
+    if state is None:
+        state = new_gen_state()
 
     used_seed = env_params['seed']
     random.seed(used_seed)
@@ -434,42 +540,30 @@ def create_env(env_params):
     malfunction_gen = ParamMalfunctionGen(parameters=malfunction_params)
     
     def rail_gen_test(width, height, number_of_agents, num_resets, np_random):
+        start = time.perf_counter()
         try:
             # Attempt to generate rails using the original generator
             rail, optionals = rail_gen_original(width, height, number_of_agents, num_resets, np_random)
+            record_rail_attempt(state, width, height, used_seed, time.perf_counter() - start)
             return rail, optionals
         except Exception as e:
+            record_rail_attempt(state, width, height, used_seed, time.perf_counter() - start, e)
             print("Handling rail generator issues...")
-            # If rail generation fails, incrementally increase the grid size.
-            max_attempts = 5
-            for i in range(1, max_attempts + 1):
-                new_width = width + i
-                new_height = height + i
-                try:
-                    rail, optionals = rail_gen_original(new_width, new_height, number_of_agents, num_resets, np_random)
-                    break
-                except Exception as e2:
-                    if i == max_attempts:
-                        raise e2  # Raise exception if all attempts fail
+            # If rail generation fails, try larger grids and other seeds
+            rail, optionals = retry_rail_gen(env_params, width, height, number_of_agents, num_resets, np_random, state)
             # Trim the rail grid back to desired dimensions
-            cropped_grid = rail.grid[:width, :height]
+            cropped_grid = rail.grid[:height, :width]
             rail.grid = cropped_grid
             return rail, optionals
 
     # Original Rail Generator
-    rail_gen_original = sparse_rail_generator(
-        max_num_cities=env_params['cities'],
-        seed=used_seed,
-        grid_mode=env_params['grid'],
-        max_rails_between_cities=env_params['intercity'],
-        max_rail_pairs_in_city=env_params['incity']
-    )
+    rail_gen_original = build_rail_generator(env_params, used_seed)
 
     # Test Rail Generator
     rail_gen = rail_gen_test
 
     # Custom Line Generator
-    line_gen = custom_sparse_line_generator(env_params, used_seed)
+    line_gen = custom_sparse_line_generator(env_params, used_seed, state)
 
     observation_builder = GlobalObsForRailEnv()
     
@@ -493,21 +587,21 @@ def create_env(env_params):
     # Ensure that all agents have positions
     if any(agent.position is None or agent.position[0] < 0 or agent.position[1] < 0 for agent in env.agents):
         np_random = np.random.RandomState(seed=env_params['seed'])
-        agents_positions, agents_directions, agents_targets = create_agents_from_train_stations(LAST_HINTS, env_params['agents'], np_random)
+        agents_positions, agents_directions, agents_targets = create_agents_from_train_stations(state['hints'], env_params['agents'], np_random)
         for idx, agent in enumerate(env.agents):
             agent.position = agents_positions[idx]
             agent.direction = agents_directions[idx]
             agent.target = agents_targets[idx]
     # Speed
-    if LAST_SPEEDS is not None and len(LAST_SPEEDS) == len(env.agents):
-        speeds_for_agents = LAST_SPEEDS
+    if state['speeds'] is not None and len(state['speeds']) == len(env.agents):
+        speeds_for_agents = state['speeds']
     else:  # fallback when inconsistent or no speeds
         speed_v, speed_p = prep_speed_distr(env_params["speedMap"])
         # Generate speeds
         np_random_local = np.random.RandomState(seed=env_params["seed"])
         sampled = np_random_local.choice(speed_v, size=len(env.agents), p=speed_p)
         speeds_for_agents = [x for x in sampled.tolist()]
-        LAST_SPEEDS = speeds_for_agents
+        state['speeds'] = speeds_for_agents
     # SpeedCounter for every agent
     for agent, agent_speed in zip(env.agents, speeds_for_agents):
         agent.speed_counter = SpeedCounter(speed=float(agent_speed))
@@ -518,7 +612,7 @@ def create_env(env_params):
             # Track
             track = int(env.rail.get_full_transitions(row, col))
             # Get allowed direction of track
-            allowed_dirs = get_allowed_dirs(track)
+            allowed_dirs = np.flatnonzero(ALLOWED_DIRS[TRACK_INDEX[track]]).tolist()
             # Set direction
             if allowed_dirs:
                 if agent.direction not in allowed_dirs:
@@ -527,23 +621,127 @@ def create_env(env_params):
             else:
                 # If no allowed directions, adjust using city orientation hints
                 pos = (row, col)
-                for city_idx, stations in enumerate(LAST_HINTS.get('train_stations', [])):
+                for city_idx, stations in enumerate(state['hints'].get('train_stations', [])):
                     # Get station coordinates
                     station_coords = [ (int(s[0][0]), int(s[0][1])) for s in stations ]
                     if pos in station_coords:
                         # Use city_orientations.
-                        desired_dir = LAST_HINTS.get('city_orientations', [])[city_idx]
+                        desired_dir = state['hints'].get('city_orientations', [])[city_idx]
                         if agent.direction != desired_dir:
                             agent.direction = desired_dir
                         break
     return env
 
 
-def gen_env(env_params):
+def generate_env(env_params, state=None):
+    """Generates a Flatland environment with its tracks and trains.
+
+    Holds no module state, so it can run in several processes at once.
+
+    Args:
+        env_params (dict): Parameters for environment.
+        state (dict, optional): Receives the generation state, e.g. the rail 'attempts'.
+
+    Returns:
+        tuple: Generated environment, 2D list of track types and a DataFrame of train configuration.
+    """
+    if state is None:
+        state = new_gen_state()
+    env = create_env(env_params, state)
+    tracks = extract_tracks(env)
+    trains = extract_trains(env)
+    # If no trains are generated, use hints to extract trains
+    if trains.empty:
+        np_random = np.random.RandomState(seed=env_params['seed'])
+        trains = extract_trains_from_hints(state['hints'], np_random, env_params, state)
+    return env, tracks, trains
+
+
+def save_native_png(env, tracks, env_params, path):
+    """Renders the environment with Clingonia's sprite renderer and saves it.
+
+    Args:
+        env (RailEnv): Flatland environment.
+        tracks (list[list[int]]): 2D list of track types.
+        env_params (dict): Parameters for environment.
+        path (str): File path to save the PNG.
+    """
+    # Sprite tiles are fast enough for large environments in full quality
+    screen_res = calc_resolution(env_params['lowQuality'], tracks)
+    cell_size = native_cell_size(screen_res, env.height, env.width)
+    image = render_image(tracks, env_agents(env), cell_size)
+    Image.fromarray(image).save(path, compress_level=1)
+
+
+def save_flatland_png(env, tracks, env_params, path):
+    """Renders the environment with Flatland's RenderTool and saves it.
+
+    Args:
+        env (RailEnv): Flatland environment.
+        tracks (list[list[int]]): 2D list of track types.
+        env_params (dict): Parameters for environment.
+        path (str): File path to save the PNG.
+    """
+    import matplotlib.pyplot as plt  # Loaded on the first Flatland render only
+    if env.width * env.height > 1000000:
+        low_quality_mode = True  # Force low quality on large environments
+    else:
+        low_quality_mode = env_params['lowQuality']
+    screen_res = calc_resolution(low_quality_mode, tracks)
+    graphics_lib = "PIL" if low_quality_mode else "PILSVG"  # Rendering lib based on quality
+    renderer = RenderTool(env, gl=graphics_lib, screen_height=screen_res, screen_width=screen_res)
+    if graphics_lib == "PIL":
+        pil_config(renderer)
+    renderer.render_env(show=False)
+    # Save image
+    image_data = renderer.get_image()
+    plt.imsave(path, image_data)
+
+
+def render_preview(env, tracks, env_params, path, generation):
+    """Renders Flatland's image on the preview worker and replaces the quick preview with it.
+
+    Args:
+        env (RailEnv): Flatland environment.
+        tracks (list[list[int]]): 2D list of track types.
+        env_params (dict): Parameters for environment.
+        path (str): File path of the preview.
+        generation (int): Generation number of the render job.
+    """
+    root, ext = os.path.splitext(path)
+    tmp_path = f"{root}_hq{ext}"
+    try:
+        with warnings.catch_warnings():
+            warnings.filterwarnings("ignore", category=UserWarning)
+            save_flatland_png(env, tracks, env_params, tmp_path)
+    except Exception as e:
+        print(f"⚠️ Full quality image could not be rendered:\n{e}")
+        return
+    # Drop the image if the environment was replaced in the meantime
+    if preview_worker.is_current(generation):
+        os.replace(tmp_path, path)
+        print("✅ Full quality image rendered.")
+    else:
+        os.remove(tmp_path)
+
+
+def preview_pending():
+    """Checks whether a background render is still running.
+
+    Returns:
+        bool: True while the preview worker is busy, False otherwise.
+    """
+    return preview_worker.thread is not None
+
+
+def gen_env(env_params, render=True, background=False):
     """Generates a Flatland environment and saves a PNG of it.
 
     Args:
         env_params (dict): Parameters for environment.
+        render (bool): Flag for saving a PNG, skipped in headless use.
+        background (bool): Flag for saving a quick sprite preview first and
+            rendering Flatland's image on the preview worker.
 
     Returns:
         tuple: 2D list of track types and a DataFrame of train configuration,
@@ -555,30 +753,25 @@ def gen_env(env_params):
         print("\nGenerating environment...")
         try:
             # Environment, Tracks, Trains
-            env = create_env(env_params)
-            tracks = extract_tracks(env)
-            trains = extract_trains(env)
-            # If no trains are generated, use hints to extract trains
-            if trains.empty:
-                np_random = np.random.RandomState(seed=env_params['seed'])
-                trains = extract_trains_from_hints(LAST_HINTS, np_random, env_params)
+            env, tracks, trains = generate_env(env_params)
+            preview_worker.cancel()  # Renders of previous environments are outdated
             # Render image
-            est_render_time = render_time_prediction(1, env.height*env.width)
-            print(f"Rendering image (~{est_render_time})...")
-            if env.width * env.height > 1000000:
-                low_quality_mode = True  # Force low quality on large environments
-            else:
-                low_quality_mode = env_params['lowQuality']
-            screen_res = calc_resolution(low_quality_mode, tracks)
-            graphics_lib = "PIL" if low_quality_mode else "PILSVG"  # Rendering lib based on quality
-            renderer = RenderTool(env, gl=graphics_lib, screen_height=screen_res, screen_width=screen_res)
-            if graphics_lib == "PIL":
-                pil_config(renderer)
-            renderer.render_env(show=False)
-            # Save image
-            image_data = renderer.get_image()
-            path = "data/running_tmp.png"
-            plt.imsave(path, image_data)
+            if render:
+                path = "data/running_tmp.png"
+                est_render_time = render_time_prediction(1, env.height*env.width)
+                if env_params.get('nativeRender', False):
+                    print(f"Rendering image (~{est_render_time})...")
+                    save_native_png(env, tracks, env_params, path)
+                elif background:
+                    # The environment is usable right away, Flatland's image follows
+                    save_native_png(env, tracks, env_params, path)
+                    print(f"Rendering image in the background (~{est_render_time})...")
+                    preview_worker.submit(
+                        lambda generation: render_preview(env, tracks, env_params, path, generation)
+                    )
+                else:
+                    print(f"Rendering image (~{est_render_time})...")
+                    save_flatland_png(env, tracks, env_params, path)
             print("✅ Environment generated.")
         except OverflowError as e:
             print(f"❌ Environment could not be generated:\n{e}")
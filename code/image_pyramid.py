@@ -0,0 +1,255 @@
+"""Provides a tiled image pyramid and a resize worker for zoomable canvases.
+
+Example usage:
+    import image_pyramid
+
+    pyramid = image_pyramid.ImagePyramid(image)
+    region = pyramid.crop((0, 0, 4000, 4000), (800, 800))
+"""
+
+import math
+import threading
+from collections import OrderedDict
+from typing import Tuple
+
+from PIL import Image
+
+
+TILE_SIZE = 512  # Edge length of a tile in pixels
+TILE_CACHE_SIZE = 128  # Max. number of cached tiles (about 1 MB each in RGBA)
+
+
+class ImagePyramid:
+    """Precomputed downscaled levels of an image, cut into fixed-size tiles.
+
+    Level 0 is the original image, every following level halves its width
+    and height. Tiles are cut on first use and kept in an LRU cache.
+
+    Attributes:
+        levels (list[Image.Image]):
+            images of all levels that are built so far.
+        tile_size (int):
+            edge length of a tile in pixels.
+        cache_size (int):
+            max. number of cached tiles.
+        tiles (OrderedDict):
+            cached tiles by (level, column, row), least recently used first.
+        lock (threading.Lock):
+            guards the tile cache, which is used by the main and resize threads.
+    """
+    def __init__(
+            self,
+            image: Image.Image,
+            tile_size: int = TILE_SIZE,
+            cache_size: int = TILE_CACHE_SIZE,
+    ):
+        """Initializes the pyramid and builds the levels in the background.
+
+        Args:
+            image (Image.Image):
+                full resolution image.
+            tile_size (int):
+                edge length of a tile in pixels.
+            cache_size (int):
+                max. number of cached tiles.
+        """
+        if image.mode not in ("RGB", "RGBA", "L"):
+            image = image.convert("RGBA")  # reduce() needs a non-palette mode
+        self.levels = [image]
+        self.tile_size = tile_size
+        self.cache_size = cache_size
+        self.tiles = OrderedDict()
+        self.lock = threading.Lock()
+
+        threading.Thread(target=self.build_levels, daemon=True).start()
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        """Size of the full resolution image."""
+        return self.levels[0].size
+
+    def build_levels(self):
+        """Downscales the image by 2 until it fits into a single tile."""
+        level = self.levels[0]
+        while max(level.size) > self.tile_size:
+            level = level.reduce(2)
+            # appending keeps the list valid for concurrent readers
+            self.levels.append(level)
+
+    def choose_level(self, factor) -> int:
+        """Calculate the coarsest level that still has enough resolution.
+
+        Falls back to the finest level if the requested one is not built yet.
+
+        Args:
+            factor (float):
+                downscale factor from the original image to the output.
+
+        Returns:
+            level (int):
+                index of the level.
+        """
+        level = int(math.log2(factor)) if factor >= 2 else 0
+        return min(level, len(self.levels) - 1)
+
+    def get_tile(self, level, col, row) -> Image.Image:
+        """Get a tile from the cache or cut it from its level.
+
+        Args:
+            level (int):
+                index of the level.
+            col (int):
+                column of the tile.
+            row (int):
+                row of the tile.
+
+        Returns:
+            tile (Image.Image):
+                tile image, smaller at the right and bottom edges.
+        """
+        key = (level, col, row)
+        with self.lock:
+            tile = self.tiles.get(key)
+            if tile is not None:
+                self.tiles.move_to_end(key)
+                return tile
+
+        level_image = self.levels[level]
+        left = col * self.tile_size
+        top = row * self.tile_size
+        tile = level_image.crop((
+            left,
+            top,
+            min(left + self.tile_size, level_image.width),
+            min(top + self.tile_size, level_image.height),
+        ))
+        tile.load()
+
+        with self.lock:
+            self.tiles[key] = tile
+            while len(self.tiles) > self.cache_size:
+                self.tiles.popitem(last=False)
+        return tile
+
+    def crop(self, box, size) -> Image.Image:
+        """Assemble a region of the image from the tiles of the closest level.
+
+        Args:
+            box (tuple(float,float,float,float)):
+                left, top, right and bottom of the region on the original image.
+            size (tuple(int,int)):
+                width and height the region will be displayed with.
+
+        Returns:
+            region (Image.Image):
+                the region in the resolution of the chosen level, at least
+                as large as the requested size unless the original is smaller.
+        """
+        left, top, right, bottom = box
+        factor = min((right - left) / max(size[0], 1), (bottom - top) / max(size[1], 1))
+        level = self.choose_level(factor)
+        level_image = self.levels[level]
+        scale = level_image.width / self.size[0]
+
+        # project the region onto the level
+        lvl_left = max(0, int(left * scale))
+        lvl_top = max(0, int(top * scale))
+        lvl_right = min(level_image.width, max(lvl_left + 1, math.ceil(right * scale)))
+        lvl_bottom = min(level_image.height, max(lvl_top + 1, math.ceil(bottom * scale)))
+
+        region = Image.new(
+            level_image.mode,
+            (max(1, lvl_right - lvl_left), max(1, lvl_bottom - lvl_top))
+        )
+        # paste all tiles that overlap the region
+        for row in range(lvl_top // self.tile_size, (lvl_bottom - 1) // self.tile_size + 1):
+            for col in range(lvl_left // self.tile_size, (lvl_right - 1) // self.tile_size + 1):
+                tile = self.get_tile(level, col, row)
+                region.paste(tile, (col * self.tile_size - lvl_left, row * self.tile_size - lvl_top))
+        return region
+
+
+class ResizeWorker:
+    """A single reusable worker thread for high quality resizes.
+
+    Every submitted job gets a new generation number. Submitting or
+    cancelling makes all older jobs obsolete, so a job only has to compare
+    its generation to drop stale work before and after resizing.
+
+    Attributes:
+        error_label (str):
+            name of the jobs in the message of a failed job.
+        generation (int):
+            generation number of the newest job.
+        job (tuple(int,callable)):
+            the pending job and its generation. None if there is none.
+        lock (threading.Lock):
+            guards the pending job and the worker thread.
+        thread (threading.Thread):
+            the worker thread. None while idle.
+    """
+    def __init__(self, error_label="High quality resize"):
+        """Initializes an idle worker.
+
+        Args:
+            error_label (str):
+                name of the jobs in the message of a failed job.
+        """
+        self.error_label = error_label
+        self.generation = 0
+        self.job = None
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def submit(self, job) -> int:
+        """Replace the pending job and start the worker if it is idle.
+
+        Args:
+            job (callable):
+                function called on the worker thread with its generation.
+
+        Returns:
+            generation (int):
+                generation number of the job.
+        """
+        with self.lock:
+            self.generation += 1
+            self.job = (self.generation, job)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, daemon=True)
+                self.thread.start()
+            return self.generation
+
+    def cancel(self):
+        """Drop the pending job and mark running jobs as obsolete."""
+        with self.lock:
+            self.generation += 1
+            self.job = None
+
+    def is_current(self, generation) -> bool:
+        """Check whether a job is still the newest one.
+
+        Args:
+            generation (int):
+                generation number of the job.
+
+        Returns:
+            bool (boolean):
+                whether no newer job was submitted or cancelled since.
+        """
+        return generation == self.generation
+
+    def _run(self):
+        """Run pending jobs until there are none left."""
+        while True:
+            with self.lock:
+                if self.job is None:
+                    # idle workers end and are restarted by the next submit
+                    self.thread = None
+                    return
+                generation, job = self.job
+                self.job = None
+            try:
+                job(generation)
+            except Exception as e:
+                print(f"⚠️ {self.error_label} failed:\n{e}")
@@ -1,6 +1,6 @@
 import os
 import pandas as pd
-from code.config import TRACKS, DEAD_ENDS
+from code.transitions import is_track, is_dead_end
 
 def file_in_directory(path):
     """Checks whether a file exists at the given path.
@@ -64,11 +64,11 @@ def add_cell(df_tracks, pred):
             return -12  # Report cells with negative coordinates
         track = int(cell[2].strip())
         # Check if track is a dead-end
-        if track in DEAD_ENDS:
+        if is_dead_end(track):
             print(f"❌ cell(({y},{x}),_) Dead end is not allowed.")
             return -14  # Report dead end
         # Check if track is invalid
-        elif track not in TRACKS:
+        elif not is_track(track):
             track = 0  # Remove track and provide empty cell
             print(f"⚠️ cell(({y},{x}),_) Warning: Invalid track type was replaced by 0.")
     except ValueError:
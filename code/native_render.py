@@ -0,0 +1,257 @@
+import math
+import numpy as np
+import pandas as pd
+from PIL import Image, ImageDraw
+from code.config import SPRITES, AGENT_COLORS
+from code.transitions import TRACK_CODES
+
+BACKGROUND_COLOR = "#313338"  # Color of cells without track
+MAX_CELL_SIZE = 300  # Resolution of the sprites in data/png
+TRAIN_TINT = 0.65  # Share of agent color on train sprites
+STATION_TINT = 0.5  # Share of agent color on station sprites
+PATH_SPREAD = 0.3  # Share of a cell over which parallel paths are spread
+PATH_TICK_MIN_CELL = 12  # Min. cell size in pixels for timestep ticks
+
+atlas_cache = {}  # Track atlas per cell size
+sprite_cache = {}  # Agent sprites per (sprite ID, color, cell size)
+
+def hex_to_rgb(hex_str):
+    """Converts a hex color string to an RGB tuple.
+
+    Args:
+        hex_str (str): Hex color code, e.g. '#313338'.
+
+    Returns:
+        tuple[int, int, int]: RGB values.
+    """
+    hex_str = hex_str.lstrip('#')
+    return tuple(int(hex_str[i:i+2], 16) for i in (0, 2, 4))
+
+
+def load_sprite(sprite_id, cell_size):
+    """Loads a sprite from data/png, rotated and scaled to the cell size.
+
+    Args:
+        sprite_id (int): Key of the sprite in SPRITES.
+        cell_size (int): Edge length of a cell in pixels.
+
+    Returns:
+        np.ndarray: (cell_size, cell_size, 4) float RGBA array, alpha in [0, 1].
+    """
+    filename, rotation = SPRITES[sprite_id]
+    with Image.open(f'data/png/{filename}.png') as image:
+        sprite = image.convert("RGBA").rotate(rotation)
+        sprite = sprite.resize((cell_size, cell_size), Image.Resampling.LANCZOS)
+    sprite = np.asarray(sprite, dtype=np.float32)
+    sprite[..., 3] /= 255
+    return sprite
+
+
+def build_atlas(cell_size):
+    """Builds the tile atlas of all tracks for a cell size.
+
+    Every track sprite is blended onto the background once,
+    so rendering only needs to copy tiles.
+
+    Args:
+        cell_size (int): Edge length of a cell in pixels.
+
+    Returns:
+        np.ndarray: (tracks, cell_size, cell_size, 3) uint8 tiles, tile 0 is an empty cell.
+        np.ndarray: Lookup of the tile index for every 16-bit track ID.
+    """
+    if cell_size in atlas_cache:
+        return atlas_cache[cell_size]
+    background = np.array(hex_to_rgb(BACKGROUND_COLOR), dtype=np.float32)
+    tiles = [np.broadcast_to(background, (cell_size, cell_size, 3))]
+    lookup = np.zeros(2**16, dtype=np.intp)  # Unknown IDs stay empty
+    for track in TRACK_CODES[1:].tolist():
+        sprite = load_sprite(track, cell_size)
+        alpha = sprite[..., 3:]
+        tiles.append(sprite[..., :3] * alpha + background * (1 - alpha))
+        lookup[track] = len(tiles) - 1
+    atlas = np.stack(tiles).round().astype(np.uint8)
+    atlas_cache[cell_size] = (atlas, lookup)
+    return atlas, lookup
+
+
+def agent_sprite(sprite_id, color, cell_size):
+    """Returns a sprite tinted in an agent color.
+
+    Args:
+        sprite_id (int): Key of the sprite in SPRITES.
+        color (str): Hex color code of the agent.
+        cell_size (int): Edge length of a cell in pixels.
+
+    Returns:
+        np.ndarray: (cell_size, cell_size, 4) float RGBA array, alpha in [0, 1].
+    """
+    key = (sprite_id, color, cell_size)
+    if key not in sprite_cache:
+        sprite = load_sprite(sprite_id, cell_size)
+        tint = TRAIN_TINT if sprite_id < 5 else STATION_TINT
+        rgb = np.array(hex_to_rgb(color), dtype=np.float32)
+        sprite[..., :3] = rgb * tint + sprite[..., :3] * (1 - tint)
+        sprite_cache[key] = sprite
+    return sprite_cache[key]
+
+
+def render_tracks(tracks, cell_size):
+    """Renders the track layer by copying one atlas tile per cell.
+
+    Args:
+        tracks (list[list[int]] or np.ndarray): 2D list of track types.
+        cell_size (int): Edge length of a cell in pixels.
+
+    Returns:
+        np.ndarray: (rows*cell_size, cols*cell_size, 3) uint8 RGB image.
+    """
+    atlas, lookup = build_atlas(cell_size)
+    grid = np.asarray(tracks, dtype=np.uint16)
+    rows, cols = grid.shape
+    # (rows, cols, cell, cell, 3) -> (rows*cell, cols*cell, 3)
+    cells = atlas[lookup[grid]]
+    return cells.transpose(0, 2, 1, 3, 4).reshape(rows * cell_size, cols * cell_size, 3)
+
+
+def blit_cell(image, tile, row, col, cell_size):
+    """Alpha-blends an RGBA tile onto one cell of an image.
+
+    Args:
+        image (np.ndarray): RGB image, modified in place.
+        tile (np.ndarray): (cell_size, cell_size, 4) float RGBA tile.
+        row (int): Row of the cell.
+        col (int): Column of the cell.
+        cell_size (int): Edge length of a cell in pixels.
+    """
+    y, x = row * cell_size, col * cell_size
+    cell = image[y:y+cell_size, x:x+cell_size]
+    if cell.shape[:2] != tile.shape[:2]:
+        return  # Cell outside of the image
+    alpha = tile[..., 3:]
+    cell[...] = (tile[..., :3] * alpha + cell * (1 - alpha)).round().astype(np.uint8)
+
+
+def render_stations(image, agents, cell_size):
+    """Draws the stations of all agents.
+
+    Args:
+        image (np.ndarray): RGB image, modified in place.
+        agents (list[tuple]): (position, direction, target) of every agent.
+        cell_size (int): Edge length of a cell in pixels.
+    """
+    for i, (_, _, target) in enumerate(agents):
+        if target is None or target[0] < 0 or target[1] < 0:
+            continue  # Agent without station
+        color = AGENT_COLORS[i % len(AGENT_COLORS)]
+        blit_cell(image, agent_sprite(5, color, cell_size), target[0], target[1], cell_size)
+
+
+def render_trains(image, agents, cell_size):
+    """Draws all agents that have a position.
+
+    Args:
+        image (np.ndarray): RGB image, modified in place.
+        agents (list[tuple]): (position, direction, target) of every agent.
+        cell_size (int): Edge length of a cell in pixels.
+    """
+    for i, (position, direction, _) in enumerate(agents):
+        if position is None or direction is None:
+            continue  # Agent not on the map
+        color = AGENT_COLORS[i % len(AGENT_COLORS)]
+        sprite_id = int(direction) + 1  # Train sprites facing n, e, s, w
+        blit_cell(image, agent_sprite(sprite_id, color, cell_size), position[0], position[1], cell_size)
+
+
+def render_image(tracks, agents, cell_size):
+    """Renders tracks, stations and trains into one image.
+
+    Args:
+        tracks (list[list[int]] or np.ndarray): 2D list of track types.
+        agents (list[tuple]): (position, direction, target) of every agent.
+        cell_size (int): Edge length of a cell in pixels.
+
+    Returns:
+        np.ndarray: RGB image.
+    """
+    image = render_tracks(tracks, cell_size)
+    render_stations(image, agents, cell_size)
+    render_trains(image, agents, cell_size)
+    return image
+
+
+def env_agents(env):
+    """Collects positions, directions and targets of all agents of an environment.
+
+    Args:
+        env (RailEnv): Flatland environment.
+
+    Returns:
+        list[tuple]: (position, direction, target) of every agent.
+    """
+    return [(agent.position, agent.direction, agent.target) for agent in env.agents]
+
+
+def native_cell_size(screen_res, rows, cols):
+    """Calculates the cell size for a screen resolution.
+
+    Args:
+        screen_res (int): Screen resolution of the longer image side.
+        rows (int): Number of rows.
+        cols (int): Number of columns.
+
+    Returns:
+        int: Edge length of a cell in pixels.
+    """
+    return max(1, min(MAX_CELL_SIZE, screen_res // max(rows, cols)))
+
+
+def render_paths(paths, colors, bounds, cell_size, ticks=True):
+    """Rasterizes train paths into a transparent overlay.
+
+    Every train is drawn as a polyline through its cell centers, shifted by
+    a small per-train offset so paths on the same track stay apart.
+
+    Args:
+        paths (pd.DataFrame): trainID, x, y and timestep of the shown trains.
+        colors (dict): Path color of every train ID.
+        bounds (tuple[int, int, int, int]): First and last (exclusive) row and column of the overlay.
+        cell_size (float): Edge length of a cell in pixels.
+        ticks (bool): Flag for marking every timestep with a dot.
+
+    Returns:
+        Image.Image: RGBA overlay of the bounds.
+    """
+    row_start, row_end, col_start, col_end = bounds
+    width = max(1, math.ceil((col_end - col_start) * cell_size))
+    height = max(1, math.ceil((row_end - row_start) * cell_size))
+    image = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+    if paths.empty:
+        return image
+    draw = ImageDraw.Draw(image)
+
+    paths = paths.sort_values(['trainID', 'timestep'])
+    codes, trains = pd.factorize(paths['trainID'])
+    # Per-train shift on a 3x3 grid around the cell center
+    spread = PATH_SPREAD * cell_size / 2
+    shift_x = (codes % 3 - 1) * spread
+    shift_y = (codes // 3 % 3 - 1) * spread
+    px = (paths['x'].to_numpy() - col_start + 0.5) * cell_size + shift_x
+    py = (paths['y'].to_numpy() - row_start + 0.5) * cell_size + shift_y
+
+    line_width = max(1, round(cell_size / 10))
+    radius = cell_size / 12
+    inside = (px >= 0) & (px < width) & (py >= 0) & (py < height)
+    starts = np.flatnonzero(np.diff(codes)) + 1
+    for train, xs, ys, visible in zip(
+            trains, np.split(px, starts), np.split(py, starts), np.split(inside, starts)):
+        if not visible.any():
+            continue  # Path outside of the overlay
+        color = colors[train]
+        points = list(zip(xs.tolist(), ys.tolist()))
+        if len(points) > 1:
+            draw.line(points, fill=color, width=line_width, joint="curve")
+        if ticks and cell_size >= PATH_TICK_MIN_CELL:
+            for x, y in zip(xs[visible].tolist(), ys[visible].tolist()):
+                draw.ellipse((x - radius, y - radius, x + radius, y + radius), fill=color)
+    return image
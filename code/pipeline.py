@@ -0,0 +1,225 @@
+"""Provides the headless pipeline to load, solve, validate and render environments.
+
+Runs the same steps as the graphical interface without a display. Every
+instance gets its own output directory with positions, timetable,
+ActErr log and optional GIF. A results.jsonl file holds one JSON line per
+instance with its status, validation results and timings of every step.
+
+Example usage:
+    import pipeline
+
+    params = files.load_params()
+    results = pipeline.run_pipeline(params, ['env/example.lp'], gif=True)
+"""
+
+import os
+import json
+import time
+import shutil
+
+import pandas as pd
+
+from code.clingo_actions import solve_clingo, get_clingo_cost
+from code.files import ensure_directory, save_malfunctions
+from code.load_env import load_env
+from code.positions import actions_to_positions, timetable, timetable_text
+
+
+def find_lp_files(paths):
+    """Lists the .lp files of the given files and directories.
+
+    Args:
+        paths (list[str]): .lp files or directories containing them.
+
+    Returns:
+        list[str]: Paths of the .lp files, directories sorted by file name.
+    """
+    lp_files = []
+    for path in paths:
+        if os.path.isdir(path):
+            lp_files += [os.path.join(path, name) for name in sorted(os.listdir(path))
+                         if name.endswith(".lp")]
+        else:
+            lp_files.append(path)
+    return lp_files
+
+
+def instance_params(params, tracks, trains, global_max_time):
+    """Adapts user parameters to a loaded environment.
+
+    Args:
+        params (dict): User parameters.
+        tracks (list[list[int]]): 2D list of track types.
+        trains (pd.DataFrame): Train configuration.
+        global_max_time (int or None): global(MaxTime) of the environment.
+
+    Returns:
+        dict: Parameters of the environment.
+    """
+    env_params = dict(params)
+    env_params['rows'] = len(tracks)
+    env_params['cols'] = len(tracks[0])
+    env_params['agents'] = len(trains)
+    if global_max_time is not None:
+        env_params['globalTimeLimit'] = global_max_time
+    return env_params
+
+
+def validation_summary(df_pos, trains, table, act_err_trains):
+    """Summarizes how well the positions follow the train configuration.
+
+    Args:
+        df_pos (pd.DataFrame): Train positions.
+        trains (pd.DataFrame): Train configuration.
+        table (pd.DataFrame): Timetable by train ID.
+        act_err_trains (list[int]): IDs of trains with invalid paths.
+
+    Returns:
+        dict: Makespan, arrived, late and invalid trains.
+    """
+    last = df_pos.sort_values('timestep').groupby('trainID').last()
+    last = last.join(trains.set_index('id')[['x_end', 'y_end']], how='inner')
+    arrived = (last['x'] == last['x_end']) & (last['y'] == last['y_end'])
+    # '--' and 'ActErr' have no actual arrival
+    arrivals = pd.to_numeric(table['a_arr'], errors='coerce')
+    late = table.index[arrivals > pd.to_numeric(table['l_arr'])]
+    return {
+        'valid': not act_err_trains,
+        'makespan': int(df_pos['timestep'].max()) if len(df_pos) else 0,
+        'arrived': int(arrived.sum()),
+        'act_err_trains': [int(id) for id in act_err_trains],
+        'late_trains': [int(id) for id in late],
+    }
+
+
+def solve_summary(output, answer_number):
+    """Summarizes the Clingo output of a simulation.
+
+    Args:
+        output (str or None): Clingo output, None if Clingo did not run.
+        answer_number (int): Chosen answer number.
+
+    Returns:
+        dict: Costs of the chosen answer, optimality and time limit flags.
+    """
+    output = output or ""
+    return {
+        'cost': get_clingo_cost(output, answer_number),
+        'optimal': "OPTIMUM FOUND" in output,
+        'timeout': "TIME LIMIT" in output or "INTERRUPTED" in output,
+    }
+
+
+def run_instance(lp_file, params, out_dir, gif=False, time_limit=None):
+    """Loads, solves, validates and optionally renders one environment.
+
+    Args:
+        lp_file (str): Path of the environment .lp file.
+        params (dict): User parameters, lpFiles are the encodings to solve with.
+        out_dir (str): Output directory of the instance.
+        gif (bool): Flag for rendering a GIF of the solution.
+        time_limit (int, optional): Seconds after which Clingo stops solving.
+
+    Returns:
+        dict: Result of the instance.
+    """
+    name = os.path.splitext(os.path.basename(lp_file))[0]
+    result = {'name': name, 'lp': lp_file, 'status': 'ok', 'error_code': 0, 'error': '',
+              'trains': 0, 'timings': {}}
+    timings = result['timings']
+    start = time.perf_counter()
+
+    def lap(step, since):
+        timings[step] = round(time.perf_counter() - since, 3)
+        return time.perf_counter()
+
+    try:
+        # Load
+        step = time.perf_counter()
+        loaded = load_env(lp_file)
+        step = lap('load', step)
+        if isinstance(loaded[0], int):
+            result.update(status='load_error', error_code=loaded[0])
+            return result
+        tracks, trains, global_max_time = loaded
+        env_params = instance_params(params, tracks, trains, global_max_time)
+        result.update(rows=env_params['rows'], cols=env_params['cols'], trains=len(trains))
+        save_malfunctions(env_params)
+        # Solve
+        clingo_options = list(env_params['clingoOptions'])
+        if time_limit:
+            clingo_options = [opt for opt in clingo_options if not opt.startswith("--time-limit")]
+            clingo_options.append(f"--time-limit={time_limit}")
+        step = time.perf_counter()
+        df_actions, output = solve_clingo(env_params['clingo'], clingo_options,
+                                          list(env_params['lpFiles']) + [lp_file], env_params['answer'])
+        step = lap('solve', step)
+        result.update(solve_summary(output, env_params['answer']))
+        if result['timeout']:
+            result['status'] = 'timeout'
+        if isinstance(df_actions, int):
+            if not result['timeout']:
+                result['status'] = 'unsat' if df_actions == -3 else 'solve_error'
+            result['error_code'] = df_actions
+            return result
+        # Validate
+        df_pos, act_err_trains = actions_to_positions(df_actions, trains, tracks)
+        step = lap('validate', step)
+        ensure_directory(out_dir)
+        result['positions'] = os.path.join(out_dir, "positions.csv")
+        df_pos.to_csv(result['positions'], index=False)
+        # Timetable
+        table, _ = timetable(df_pos, trains)
+        result['timetable'] = os.path.join(out_dir, "timetable.txt")
+        with open(result['timetable'], 'w') as file:
+            file.write(timetable_text(table))
+        result.update(validation_summary(df_pos, trains, table, act_err_trains))
+        if result['act_err_trains']:
+            result['act_err'] = os.path.join(out_dir, "act_err.txt")
+            shutil.copy2("data/act_err.txt", result['act_err'])
+        step = lap('timetable', step)
+        # Render
+        if gif:
+            from code.build_gif import render_gif
+            result['gif'] = os.path.join(out_dir, f"{name}.gif")
+            render_gif(tracks, trains, df_pos, env_params, result['gif'],
+                       env_params['frameRate'], env_params['lowQualityGIF'])
+            lap('render', step)
+    except Exception as e:
+        result.update(status='error', error=f"{type(e).__name__}: {e}")
+    finally:
+        timings['total'] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def run_pipeline(params, paths, out_dir="data/runs", gif=False):
+    """Runs the pipeline on every environment and saves the results.
+
+    Args:
+        params (dict): User parameters.
+        paths (list[str]): .lp files or directories containing them.
+        out_dir (str): Output directory, one subdirectory per instance.
+        gif (bool): Flag for rendering a GIF of every solution.
+
+    Returns:
+        list[dict]: Results of all instances, also saved as results.jsonl.
+    """
+    ensure_directory(out_dir)
+    lp_files = find_lp_files(paths)
+    results_path = os.path.join(out_dir, "results.jsonl")
+    print(f"\nRunning {len(lp_files)} environment(s)...")
+    results = []
+    with open(results_path, 'w') as file:
+        for index, lp_file in enumerate(lp_files):
+            name = os.path.splitext(os.path.basename(lp_file))[0]
+            result = run_instance(lp_file, params, os.path.join(out_dir, name), gif)
+            results.append(result)
+            file.write(json.dumps(result) + "\n")
+            file.flush()
+            status = "✅" if result['status'] == 'ok' else f"❌ {result['status']} {result['error_code'] or result['error']}"
+            print(f"> [{index + 1}/{len(lp_files)}] {name} ({result['timings']['total']}s) {status}")
+    failed = sum(result['status'] != 'ok' for result in results)
+    if failed:
+        print(f"⚠️ {failed} of {len(lp_files)} environment(s) failed.")
+    print(f"✅ Results saved in {results_path}.")
+    return results
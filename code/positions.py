@@ -3,84 +3,11 @@ import platform
 import subprocess
 import pandas as pd
 from code.clingo_actions import clingo_to_df
+from code.config import DIR_MAP
+from code.transitions import DIRS, ACTIONS, TRACK_INDEX, NEXT_DIR, VALID_ACTION
 
 invalid_path = None
 
-# Directional changes - (DirIn, Type): DirOut
-fw_tracks = {
-    # Curves
-    ('n', 4608):  'w',
-    ('e', 4608):  's',
-    ('n', 16386): 'e',
-    ('w', 16386): 's',
-    ('s', 72):    'e',
-    ('w', 72):    'n',
-    ('s', 2064):  'w',
-    ('e', 2064):  'n',
-    # Switches
-    ('e', 37408): 's',
-    ('n', 17411): 'e',
-    ('w', 32872): 'n',
-    ('s', 3089):  'w',
-    ('w', 49186): 's',
-    ('s', 1097):  'e',
-    ('e', 34864): 'n',
-    ('n', 5633):  'w',
-    # Splits
-    ('e', 20994): 's',
-    ('w', 20994): 's',
-    ('n', 16458): 'e',
-    ('s', 16458): 'e',
-    ('e', 2136):  'n',
-    ('w', 2136):  'n',
-    ('n', 6672):  'w',
-    ('s', 6672):  'w'
-}
-
-to_left_tracks = {
-    # Switches
-    ('n', 37408): 'w',
-    ('w', 17411): 's',
-    ('s', 32872): 'e',
-    ('e', 3089): 'n',
-    # Crossings
-    ('n', 38433): 'w',
-    ('w', 50211): 's',
-    ('s', 33897): 'e',
-    ('e', 35889): 'n',
-    ('n', 38505): 'w',
-    ('s', 38505): 'e',
-    ('e', 52275): 'n',
-    ('w', 52275): 's',
-    # Splits
-    ('n', 20994): 'w',
-    ('w', 16458): 's',
-    ('s', 2136): 'e',
-    ('e', 6672): 'n'
-}
-
-to_right_tracks = {
-    # Switches
-    ('n', 49186): 'e',
-    ('w', 1097): 'n',
-    ('s', 34864): 'w',
-    ('e', 5633): 's',
-    # Crossings
-    ('e', 38433): 's',
-    ('n', 50211): 'e',
-    ('w', 33897): 'n',
-    ('s', 35889): 'w',
-    ('e', 38505): 's',
-    ('w', 38505): 'n',
-    ('n', 52275): 'e',
-    ('s', 52275): 'w',
-    # Splits
-    ('n', 20994): 'e',
-    ('w', 16458): 'n',
-    ('s', 2136): 'w',
-    ('e', 6672): 's'
-}
-
 def pos_change(x, y, dir):
     """Calculates new (x, y) coordinates based on given direction.
 
@@ -113,7 +40,7 @@ def dir_change(id, x, y, action, dir, tracks):
     Returns:
         str: New direction after applying the action; unchanged if no valid change.
     """
-    global invalid_path, fw_tracks, to_left_tracks, to_right_tracks
+    global invalid_path
     # Validate that the coordinates are within grid boundaries
     if not (0 <= y < len(tracks) and 0 <= x < len(tracks[0])):
         # Invalid: No dir change: path will be adjusted later
@@ -121,24 +48,16 @@ def dir_change(id, x, y, action, dir, tracks):
             invalid_path = id
         return dir
 
-    track = tracks[y][x]
+    track = TRACK_INDEX[tracks[y][x]]
+    heading = DIR_MAP[dir]
+    move = ACTIONS[action]
 
-    # Determine new direction based on action and track
-    if action == "move_forward":
-        if (dir, track) in fw_tracks:
-            return fw_tracks[(dir, track)]
-    elif action == "move_left":
-        if (dir, track) in to_left_tracks:
-            return to_left_tracks[(dir, track)]
-        if invalid_path == None:
-            invalid_path = id
-    elif action == "move_right":
-        if (dir, track) in to_right_tracks:
-            return to_right_tracks[(dir, track)]
+    # Report turns the track does not allow: No dir change: path will be adjusted later
+    if action != "move_forward" and not VALID_ACTION[track, heading, move]:
         if invalid_path == None:
             invalid_path = id
-    # If track does not allow the action: No dir change: path will be adjusted later
-    return dir
+    # Determine new direction based on action and track
+    return DIRS[NEXT_DIR[track, heading, move]]
 
 
 def get_start_pos(id, trains):
@@ -334,6 +253,9 @@ def write_act_err_txt(original, adjusted, trains):
         original (pd.DataFrame): Original action predicates.
         adjusted (pd.DataFrame): Adjusted action predicates.
         trains (pd.DataFrame): Train configuration.
+
+    Returns:
+        list[int]: IDs of trains with invalid paths.
     """
     # Identify trains with invalid path
     act_err_trains = set(original["trainID"]) - set(adjusted["trainID"])
@@ -342,7 +264,7 @@ def write_act_err_txt(original, adjusted, trains):
         with open("data/act_err.txt", "w") as f, open("data/act_err_min.txt", "w") as f_min:
             f.write("")
             f_min.write("")
-        return
+        return []
     # Filter original actions for trains with errors and sort them
     df_act_err = original[original["trainID"].isin(act_err_trains)]
     df_act_err = df_act_err.sort_values(by=["trainID", "timestep"])
@@ -427,6 +349,7 @@ def write_act_err_txt(original, adjusted, trains):
             else:
                 f.write(f"=== Train {id} has no missing timesteps.\n\n\n\n")
                 f_min.write(f"=== Train {id} has no missing timesteps.\n\n\n\n")
+    return sorted(act_err_trains)
 
 
 def beep_feedback():
@@ -451,7 +374,7 @@ def beep_feedback():
             return
 
 
-def position_df(tracks, trains, clingo_path, clingo_options, lp_files, answer_number):
+def position_df(tracks, trains, clingo_path, clingo_options, lp_files, answer_number, beep=True):
     """Creates a DataFrame of train positions and directions at each timestep.
 
     Converts Clingo action predicates into a positions DataFrame,
@@ -465,6 +388,7 @@ def position_df(tracks, trains, clingo_path, clingo_options, lp_files, answer_nu
         clingo_options (list[str]): List of additional Clingo options.
         lp_files (list[str]): List of ASP files.
         answer_number (int): Desired answer number from Clingo.
+        beep (bool): Flag for audio feedback.
 
     Returns:
         pd.DataFrame: DataFrame with trainID, x, y, direction, and timestep.
@@ -472,6 +396,26 @@ def position_df(tracks, trains, clingo_path, clingo_options, lp_files, answer_nu
     # Actions into DF
     df_actions_original = clingo_to_df(clingo_path, clingo_options, lp_files, answer_number)
     if isinstance(df_actions_original, int): return df_actions_original  # Error Handling
+    df_pos, _ = actions_to_positions(df_actions_original, trains, tracks)
+    print("Run Simulation: DONE")
+    # Audio Feedback
+    if beep:
+        beep_feedback()
+    return df_pos
+
+
+def actions_to_positions(df_actions_original, trains, tracks):
+    """Validates action predicates and converts them into train positions.
+
+    Args:
+        df_actions_original (pd.DataFrame): Action predicates from Clingo.
+        trains (pd.DataFrame): Train configuration.
+        tracks (list[list[int]]): 2D list of track types.
+
+    Returns:
+        pd.DataFrame: DataFrame with trainID, x, y, direction, and timestep.
+        list[int]: IDs of trains with invalid paths.
+    """
     # Save original df_actions to provide a faulty list of action predicates, later.
     df_actions = df_actions_original.copy(deep=True)
     # Actions to positions
@@ -480,10 +424,65 @@ def position_df(tracks, trains, clingo_path, clingo_options, lp_files, answer_nu
     print("Validating actions...")
     df_actions, df_pos = adjust_actions(df_pos, trains, df_actions, tracks)
     # Put invalid action-predicate paths
-    write_act_err_txt(df_actions_original, df_actions, trains)
+    act_err_trains = write_act_err_txt(df_actions_original, df_actions, trains)
     # Make sure that every train has a position
     df_pos = ensure_train_spawns(df_pos, trains)
-    print("Run Simulation: DONE")
-    # Audio Feedback
-    beep_feedback()
-    return df_pos
+    return df_pos, act_err_trains
+
+
+def timetable(df_pos, trains):
+    """Creates a timetable of earliest, actual and latest departures and arrivals.
+
+    Actual times are '--' for trains that start at their station
+    and 'ActErr' for trains whose actions could not be visualized.
+
+    Args:
+        df_pos (pd.DataFrame): Train positions.
+        trains (pd.DataFrame): Train configuration.
+
+    Returns:
+        pd.DataFrame: Columns e_dep, a_dep, l_arr and a_arr by train ID.
+        bool: True if a train has an action error, False otherwise.
+    """
+    act_err = False
+    a_dep = (
+        df_pos.groupby("trainID")["timestep"]
+        .apply(lambda x: x.iloc[0] if len(x) == 1 else x.nsmallest(2).iloc[-1])
+        .tolist()
+    )
+    a_arr = df_pos.groupby("trainID")["timestep"].max().tolist()
+    for index, (_, row) in enumerate(trains.iterrows()):
+        at_station = row['x'] == row['x_end'] and row['y'] == row['y_end']
+        if at_station:
+            a_dep[index] = '--'
+            a_arr[index] = '--'
+        if not at_station and a_dep[index] == a_arr[index] and a_arr[index] == 0:
+            a_dep[index] = 'ActErr'
+            a_arr[index] = 'ActErr'
+            act_err = True
+    table = pd.DataFrame({
+        'e_dep': trains['e_dep'].tolist(),
+        'a_dep': a_dep,
+        'l_arr': trains['l_arr'].tolist(),
+        'a_arr': a_arr,
+    }, index=trains['id'].tolist())
+    return table, act_err
+
+
+def timetable_text(table):
+    """Formats a timetable as a text table.
+
+    Args:
+        table (pd.DataFrame): Timetable by train ID.
+
+    Returns:
+        str: Text table with one line per train.
+    """
+    header = ("|          |      Departure    |     Arrival     |\n"
+              "| Train ID | Earliest | Actual | Latest | Actual |")
+    divider = "|----------|----------|--------|--------|--------|"
+    lines = [header, divider]
+    for index, row in table.iterrows():
+        lines.append(f"| {index:>8} | {row['e_dep']:>8} | {row['a_dep']:>6} | "
+                     f"{row['l_arr']:>6} | {row['a_arr']:>6} |")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,87 @@
+"""Provides a benchmark of the program startup.
+
+Every stage of the startup is timed in a fresh interpreter, so that module
+imports are measured cold. The window waits for the import check and the
+GUI modules only; Flatland and the render test load in the background.
+
+Example usage:
+    import startup_bench
+
+    results = startup_bench.bench_startup(repeat=5)
+"""
+
+import sys
+import time
+import subprocess
+
+import pandas as pd
+
+# Code of every startup stage, timed in its own interpreter
+STARTUP_STAGES = {
+    'interpreter': "pass",
+    'import check': "from code.files import initial_import_test; initial_import_test()",
+    'gui modules': "import code.views",
+    'flatland': "import code.build_png, code.gen_png",
+    'render test': "from code.build_png import initial_render_test; initial_render_test()",
+}
+
+# Stages the window waits for
+WINDOW_STAGES = ['interpreter', 'import check', 'gui modules']
+
+
+def time_stage(code):
+    """Times a stage in a fresh interpreter.
+
+    Args:
+        code (str): Python code of the stage.
+
+    Returns:
+        float: Seconds of the stage itself.
+        float: Seconds of the whole process.
+        str: Error of the stage, empty if it succeeded.
+    """
+    script = ("import time\n"
+              "start = time.perf_counter()\n"
+              f"{code}\n"
+              "print(time.perf_counter() - start)\n")
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True)
+    total = time.perf_counter() - start
+    if result.returncode != 0:
+        lines = result.stderr.strip().splitlines()
+        return 0.0, total, lines[-1] if lines else f"exit code {result.returncode}"
+    return float(result.stdout.strip().splitlines()[-1]), total, ''
+
+
+def bench_startup(repeat=5):
+    """Benchmarks every startup stage.
+
+    Args:
+        repeat (int): Number of runs per stage.
+
+    Returns:
+        pd.DataFrame: Median and minimum seconds of every stage.
+    """
+    print(f"\nBenchmarking startup ({repeat} run(s) per stage)...")
+    rows = []
+    for stage, code in STARTUP_STAGES.items():
+        runs = [time_stage(code) for _ in range(repeat)]
+        errors = [error for _, _, error in runs if error]
+        stage_times = pd.Series([seconds for seconds, _, _ in runs])
+        process_times = pd.Series([total for _, total, _ in runs])
+        rows.append({
+            'stage': stage,
+            'status': 'error' if errors else 'ok',
+            'error': errors[0] if errors else '',
+            'median': round(stage_times.median(), 3),
+            'min': round(stage_times.min(), 3),
+            'process_median': round(process_times.median(), 3),
+        })
+        status = "✅" if not errors else f"❌ {errors[0]}"
+        print(f"> {stage}: {rows[-1]['median']}s (process {rows[-1]['process_median']}s) {status}")
+    results = pd.DataFrame(rows)
+    window = results.loc[results['stage'].isin(WINDOW_STAGES[1:]), 'median'].sum()
+    window += results.loc[results['stage'] == 'interpreter', 'process_median'].sum()
+    background = results.loc[results['stage'] == 'render test', 'median'].sum()
+    print(f"✅ Window ready after ~{window:.3f}s, background render test ~{background:.3f}s.")
+    return results
@@ -0,0 +1,149 @@
+"""
+Compiled Transition Model of the Flatland Track Encoding.
+
+A Flatland cell is a 16-bit number: one nibble per heading of the agent
+(n, e, s, w from the highest bits), each nibble one bit per direction the
+agent may leave the cell in (n, e, s, w from the highest bit).
+All tables below are derived from these bits once at import time.
+
+- DIRS (str): Direction letters by numeric direction.
+- ACTIONS (dict): Maps move actions to numeric values.
+- TRACK_CODES (np.ndarray): Supported track IDs, index 0 is the empty cell.
+- TRACK_INDEX (np.ndarray): Index into TRACK_CODES for every 16-bit ID, 0 for unsupported IDs.
+- IS_TRACK (np.ndarray): Flag for every 16-bit ID whether it is a supported track.
+- IS_DEAD_END (np.ndarray): Flag for every 16-bit ID whether it is a dead-end.
+- ALLOWED_DIRS (np.ndarray): (track index, heading) flag whether the heading can pass the track.
+- NEXT_DIR (np.ndarray): (track index, heading, action) new heading, unchanged if not possible.
+- VALID_ACTION (np.ndarray): (track index, heading, action) flag whether the action is possible.
+- ENTRY_DIR (np.ndarray): (track index, heading) closest heading that can pass the track.
+"""
+
+import numpy as np
+from code.config import TRACKS
+
+DIRS = 'nesw'
+
+ACTIONS = {'move_forward': 0, 'move_left': 1, 'move_right': 2}
+
+
+def transition_bits(codes):
+    """Splits 16-bit track IDs into their transitions.
+
+    Args:
+        codes (np.ndarray): Track IDs.
+
+    Returns:
+        np.ndarray: (codes, heading, exit direction) boolean transitions.
+    """
+    shifts = np.arange(15, -1, -1, dtype=np.uint32)
+    bits = (np.asarray(codes, dtype=np.uint32)[..., None] >> shifts) & 1
+    return bits.astype(bool).reshape(*np.shape(codes), 4, 4)
+
+
+def build_dead_ends():
+    """Flags every 16-bit ID whose only transition turns the agent around.
+
+    Returns:
+        np.ndarray: Dead-end flag for every track ID.
+    """
+    bits = transition_bits(np.arange(2**16))
+    u_turns = bits[:, [0, 1, 2, 3], [2, 3, 0, 1]]
+    return (bits.sum(axis=(1, 2)) == 1) & u_turns.any(axis=1)
+
+
+def build_moves(outs):
+    """Builds the heading changes of all move actions.
+
+    Follows Flatland: moving forward takes the only exit if there is
+    exactly one, turning left or right needs a switch with that exit.
+
+    Args:
+        outs (np.ndarray): (tracks, heading, exit direction) transitions.
+
+    Returns:
+        np.ndarray: (tracks, heading, action) new heading.
+        np.ndarray: (tracks, heading, action) flag whether the action is possible.
+    """
+    tracks = len(outs)
+    heading = np.broadcast_to(np.arange(4), (tracks, 4))
+    exits = outs.sum(axis=2)
+    next_dir = np.repeat(heading[..., None], len(ACTIONS), axis=2).astype(np.int8)
+    valid = np.zeros((tracks, 4, len(ACTIONS)), dtype=bool)
+    # Forward: straight ahead, or along a curve
+    forward = ACTIONS['move_forward']
+    single = exits == 1
+    next_dir[..., forward] = np.where(single, outs.argmax(axis=2), heading)
+    valid[..., forward] = np.take_along_axis(outs, next_dir[..., forward, None].astype(np.intp), axis=2)[..., 0]
+    # Left and right: only on switches
+    for action, turn in (('move_left', 3), ('move_right', 1)):
+        target = (heading + turn) % 4
+        possible = (exits > 1) & np.take_along_axis(outs, target[..., None], axis=2)[..., 0]
+        next_dir[..., ACTIONS[action]] = np.where(possible, target, heading)
+        valid[..., ACTIONS[action]] = possible
+    return next_dir, valid
+
+
+def build_entry_dirs(outs, allowed):
+    """Builds the closest passable heading for every heading of a track.
+
+    An agent facing a direction it cannot pass gets the heading it would have
+    entered with to leave in that direction, otherwise the next passable one clockwise.
+
+    Args:
+        outs (np.ndarray): (tracks, heading, exit direction) transitions.
+        allowed (np.ndarray): (tracks, heading) flag whether the heading can pass.
+
+    Returns:
+        np.ndarray: (tracks, heading) corrected heading, unchanged if it is passable.
+    """
+    entry = np.broadcast_to(np.arange(4, dtype=np.int8), allowed.shape).copy()
+    for index in range(len(outs)):
+        for heading in range(4):
+            if allowed[index, heading] or not allowed[index].any():
+                continue
+            turns = [(heading + turn) % 4 for turn in (1, 3)]
+            # Prefer the heading that leaves in the faced direction
+            candidates = [d for d in turns if outs[index, d, heading]]
+            candidates += [d for d in turns if allowed[index, d]]
+            entry[index, heading] = candidates[0] if candidates else (heading + 2) % 4
+    return entry
+
+
+def is_track(code):
+    """Checks whether a track ID is a supported track.
+
+    Args:
+        code (int): Track ID.
+
+    Returns:
+        bool: True if the ID is in TRACK_CODES, False otherwise.
+    """
+    return 0 <= code < 2**16 and bool(IS_TRACK[code])
+
+
+def is_dead_end(code):
+    """Checks whether a track ID is a dead-end.
+
+    Args:
+        code (int): Track ID.
+
+    Returns:
+        bool: True if the only transition turns the agent around, False otherwise.
+    """
+    return 0 <= code < 2**16 and bool(IS_DEAD_END[code])
+
+
+TRACK_CODES = np.array(sorted(TRACKS), dtype=np.uint16)
+
+TRACK_INDEX = np.zeros(2**16, dtype=np.intp)
+TRACK_INDEX[TRACK_CODES] = np.arange(len(TRACK_CODES))
+
+IS_TRACK = np.zeros(2**16, dtype=bool)
+IS_TRACK[TRACK_CODES] = True
+
+IS_DEAD_END = build_dead_ends()
+
+_outs = transition_bits(TRACK_CODES)
+ALLOWED_DIRS = _outs.any(axis=2)
+NEXT_DIR, VALID_ACTION = build_moves(_outs)
+ENTRY_DIR = build_entry_dirs(_outs, ALLOWED_DIRS)
@@ -13,7 +13,6 @@ Example usage:
 """
 
 import os
-import re
 import ast
 import json
 import shutil
@@ -21,13 +20,11 @@ from tkinter import filedialog, font
 
 import pandas as pd
 
-from code.build_png import create_custom_env, save_png
-from code.build_gif import render_gif
+from code.config import DEFAULT_PARAMS
 from code.custom_canvas import *
-from code.files import save_env, save_malfunctions, delete_tmp_lp, delete_tmp_png, delete_tmp_gif, delete_tmp_frames, delete_tmp_malfunctions
-from code.gen_png import gen_env, render_time_prediction
+from code.files import load_params, save_env, save_malfunctions, delete_tmp_lp, delete_tmp_png, delete_tmp_gif, delete_tmp_frames, delete_tmp_malfunctions
 from code.load_env import load_env
-from code.positions import position_df
+from code.positions import position_df, timetable, timetable_text
 
 
 
@@ -135,31 +132,7 @@ scroll_bars = {}
 
 
 # Parameter Dictionaries
-default_params = {
-    'rows': 40,
-    'cols': 40,
-    'agents': 4,
-    'cities': 4,
-    'seed': 1,
-    'globalTimeLimit': 100,
-    'grid': False,
-    'intercity': 2,
-    'incity': 2,
-    'remove': True,
-    'speedMap': {1.0 : 1.0},
-    'malfunction': (0, 30),
-    'min': 2,
-    'max': 6,
-    'malfuncRepro': False,
-    'lowQuality': False,
-    'saveImage': False,
-    'answer': 1,
-    'clingo': 'clingo',
-    'clingoOptions': [],
-    'lpFiles': [],
-    'lowQualityGIF': False,
-    'frameRate': 2.0,
-}
+default_params = dict(DEFAULT_PARAMS)
 user_params = {
     'rows': None,
     'cols': None,
@@ -184,6 +157,7 @@ user_params = {
     'lpFiles': [],
     'lowQualityGIF': False,
     'frameRate': None,
+    'nativeRender': False,
 }
 user_params_backup = user_params.copy()
 
@@ -315,6 +289,7 @@ current_modify_backup_df = current_df.copy()
 current_img = None
 current_gif = None
 current_timestep = None
+current_timestep_renderer = None
 
 # Train Paths Dataframe
 current_paths = pd.DataFrame()
@@ -2691,6 +2666,8 @@ def random_gen_para_to_env():
         user_params_backup (dict):
             backup for the user parameters.
     """
+    from code.gen_png import gen_env, preview_pending
+
     global first_build_try, current_img, current_df, current_array, env_counter, \
         user_params_backup
 
@@ -2718,7 +2695,7 @@ def random_gen_para_to_env():
     frames['random_gen_para_frame'].frame.update()
 
     try:
-        tracks, trains = gen_env(user_params)
+        tracks, trains = gen_env(user_params, background=True)
         save_malfunctions(user_params)
         delete_tmp_frames()
         env_counter += 1
@@ -2801,6 +2778,29 @@ def random_gen_para_to_env():
     user_params_backup = user_params.copy()
     build_random_gen_env_viewer()
     build_random_gen_env_menu()
+    if preview_pending():
+        watch_preview(env_counter)
+
+def watch_preview(counter):
+    """Show the full quality image once its background render is done.
+
+    Args:
+        counter (int):
+            env_counter of the generated environment.
+    """
+    from code.gen_png import preview_pending
+
+    if counter != env_counter:
+        return
+
+    if preview_pending():
+        windows['flatland_window'].window.after(250, watch_preview, counter)
+        return
+
+    # refresh the viewers that still show the quick preview
+    for name in ['gen_env_viewer_canvas', 'main_menu_env_viewer_canvas']:
+        if name in canvases and canvases[name].canvas.winfo_exists():
+            canvases[name].set_image(current_img)
 
 def build_random_gen_env_viewer():
     """Builds random generation environment viewer frame."""
@@ -5246,6 +5246,8 @@ def builder_train_grid_to_env():
         env_counter:
             tracks changes to the current environment.
     """
+    from code.build_png import create_custom_env, save_png
+
     global current_img, current_builder_backup_array, current_builder_backup_df, \
         current_modify_backup_array, current_modify_backup_df, env_counter, \
         current_df
@@ -5347,7 +5349,7 @@ def builder_train_grid_to_env():
     delete_tmp_frames()
     env_counter += 1
     os.makedirs("data", exist_ok=True)
-    if save_png(env, "data/running_tmp.png", user_params["lowQuality"]) == -1:
+    if save_png(env, "data/running_tmp.png", user_params["lowQuality"], user_params.get("nativeRender", False)) == -1:
         labels['builder_status_label'].label.config(
             text='Flatland failed to create image.\n'
                  'Please restart the program.',
@@ -5782,6 +5784,8 @@ def build_result_env_viewer():
 
 def build_result_menu():
     """Builds the result menu frame."""
+    from code.gen_png import render_time_prediction
+
     frames['result_menu_frame'] = Frame(
         root=windows['flatland_window'].window,
         width=int(screenwidth * 0.5),
@@ -5856,6 +5860,23 @@ def build_result_menu():
         style_map=base_button_style_map,
     )
 
+    buttons['show_timestep_viewer_button'] = Button(
+        root=frames['result_menu_frame'].frame,
+        width=25,
+        height=1,
+        grid_pos=(1, 1),
+        padding=(0, 0),
+        sticky='swe',
+        command=toggle_timestep_viewer,
+        text='Timestep Viewer',
+        font=base_font_layout,
+        foreground_color=label_color,
+        background_color=button_color,
+        border_width=0,
+        visibility=True,
+        style_map=base_button_style_map,
+    )
+
     min_t = int(pos_df['timestep'].min())
     max_t = int(pos_df['timestep'].max())
     timesteps = max_t - min_t + 1
@@ -6190,14 +6211,34 @@ def build_result_gif_frame():
     frames['result_gif_frame'].frame.grid_propagate(False)
 
 def build_timestep_viewer_frame():
-    """Builds the result timestep viewer frame."""
-    min_timestep = int(pos_df['timestep'].min())
-    timestep_file_format = str(min_timestep).zfill(4)
+    """Builds the result timestep viewer frame.
+
+    Timestep images are rendered on demand, so the viewer does not need a
+    rendered GIF.
+
+    Modifies:
+        current_timestep (int):
+            global tracker of the current timestep in the result timestep view.
+        current_timestep_renderer (TimestepRenderer):
+            renders the images of the timestep viewer.
+    """
+    from code.build_gif import timestep_renderer
+
+    global current_timestep, current_timestep_renderer
+
+    current_timestep_renderer = timestep_renderer(
+        current_array[0], get_trains(), current_paths, user_params,
+        user_params['lowQualityGIF']
+    )
+    min_timestep = current_timestep_renderer.min_timestep
+    current_timestep = min_timestep
+    timestep_image = current_timestep_renderer.render(min_timestep)
+    current_timestep_renderer.prefetch([min_timestep + 1, min_timestep + 2])
 
     frames['timestep_viewer_frame'] = Frame(
         root=windows['flatland_window'].window,
-        width=frames['result_gif_frame'].width ,
-        height=frames['result_gif_frame'].height * 0.9,
+        width=int(screenwidth * 0.5),
+        height=screenheight * 0.9,
         grid_pos=(0, 0),
         padding=(0, 0),
         sticky='new',
@@ -6229,7 +6270,7 @@ def build_timestep_viewer_frame():
         background_color=canvas_color,
         grid_color=grid_color,
         border_width=0,
-        image=f'data/tmp_frames/frame_{timestep_file_format}.png',
+        image=timestep_image,
         rows=user_params['rows'],
         cols=user_params['cols'],
     )
@@ -6521,7 +6562,15 @@ def toggle_result_gif():
     frames['result_menu_frame'].frame.update()
 
 def toggle_timestep_viewer():
-    """Opens or hides the result help frame."""
+    """Hides the timetable and help frames and opens or closes the timestep viewer frame."""
+    if ('result_timetable_frame' in frames and
+            frames['result_timetable_frame'].visibility):
+        frames['result_timetable_frame'].toggle_visibility()
+
+    if ('result_help_frame' in frames and
+            frames['result_help_frame'].visibility):
+        frames['result_help_frame'].toggle_visibility()
+
     if 'timestep_viewer_frame' in frames :
         frames['timestep_viewer_frame'].toggle_visibility()
         frames['timestep_viewer_frame'].frame.rowconfigure(0, weight=2)
@@ -6541,19 +6590,8 @@ def show_previous_timestep():
     """
     global current_timestep
 
-    frame_list = []
-
-    for file in os.listdir('data/tmp_frames'):
-        frame_list.append(file)
-
-    # sort the list by the frame numbers
-    frame_list = sorted(
-        frame_list,
-        key=lambda x: int(re.search(r'\d{4}', x).group())
-    )
-
-    min_t = int(pos_df['timestep'].min())
-    max_t = int(pos_df['timestep'].max())
+    min_t = current_timestep_renderer.min_timestep
+    max_t = current_timestep_renderer.max_timestep
     if current_timestep is None:
         current_timestep = min_t
     
@@ -6562,12 +6600,9 @@ def show_previous_timestep():
     else:
         current_timestep -= 1
 
-    # show the new timestep image and update the displayed timestep on the frame
-    pic = f'data/tmp_frames/{frame_list[current_timestep-min_t]}'
-    canvases['timestep_pic'].image = canvases['timestep_pic'].get_image(pic)
-    canvases['timestep_pic'].draw_image()
-    labels['current_timestep_label'].label.config(text=str(current_timestep))
-    frames['timestep_pic_container_frame'].frame.update()
+    show_timestep(current_timestep)
+    # render the following steps in the background
+    current_timestep_renderer.prefetch([current_timestep - 1, current_timestep - 2])
     return
 
 def show_next_timestep():
@@ -6579,34 +6614,33 @@ def show_next_timestep():
     """
     global current_timestep
 
-    frame_list = []
-
-    for file in os.listdir('data/tmp_frames'):
-        frame_list.append(file)
-
-    # sort the list by the frame numbers
-    frame_list = sorted(
-        frame_list,
-        key=lambda x: int(re.search(r'\d{4}', x).group())
-    )
-
-    min_t = int(pos_df['timestep'].min())
+    min_t = current_timestep_renderer.min_timestep
+    max_t = current_timestep_renderer.max_timestep
     if current_timestep is None:
         current_timestep = min_t
     
-    if current_timestep-min_t < len(frame_list)-1:
+    if current_timestep < max_t:
         current_timestep += 1
     else:
         current_timestep = min_t
 
-    # show the new timestep image and update the displayed timestep on the frame
-    pic = f'data/tmp_frames/{frame_list[current_timestep-min_t]}'
-    canvases['timestep_pic'].image = canvases['timestep_pic'].get_image(pic)
-    canvases['timestep_pic'].draw_image()
-    labels['current_timestep_label'].label.config(text=str(current_timestep))
-    frames['timestep_pic_container_frame'].frame.update()
+    show_timestep(current_timestep)
+    # render the following steps in the background
+    current_timestep_renderer.prefetch([current_timestep + 1, current_timestep + 2])
     return
 
+def show_timestep(timestep):
+    """Shows the image of a timestep in the timestep viewer.
+
+    Args:
+        timestep (int):
+            the timestep to display, rendered on demand if necessary.
+    """
+    pic = current_timestep_renderer.render(timestep)
+    canvases['timestep_pic'].set_image(pic)
+    labels['current_timestep_label'].label.config(text=str(timestep))
+    frames['timestep_pic_container_frame'].frame.update()
+
 def show_error_logs():
     """Builds the result error log viewer.
 
@@ -6843,6 +6877,8 @@ def create_gif():
         last_gif_params (tuple(float, bool)):
             parameters at the time of the last GIF rendering.
     """
+    from code.build_gif import render_gif
+
     global current_gif, last_gif_params
 
     tracks = current_array[0]
@@ -6851,7 +6887,7 @@ def create_gif():
     fps = user_params['frameRate']
     low_q = user_params['lowQualityGIF']
     last_gif_params = (fps, low_q)
-    render_gif(tracks, trains, current_paths, user_params, env_counter, current_gif, fps, low_q)
+    render_gif(tracks, trains, current_paths, user_params, current_gif, fps, low_q)
 
 def save_gif():
     """Opens file dialog and saves GIF in selected location."""
@@ -6878,46 +6914,12 @@ def df_to_timetable_text():
     """
     global show_act_err_logs
 
-    def format_row(idx, line) -> str:
-        """Helper function to format a timetable row."""
-        new_line = (f"| {idx:>8} | {line['e_dep']:>8} | {line['a_dep']:>6} | "
-                    f"{line['l_arr']:>6} | {line['a_arr']:>6} |")
-        return new_line
-
-    a_dep = (
-        current_paths.groupby("trainID")["timestep"]
-        .apply(lambda x: x.iloc[0] if len(x) == 1 else x.nsmallest(2).iloc[-1])
-        .tolist()
-    )
-    a_arr = current_paths.groupby("trainID")["timestep"].max().tolist()
-
-    for index, (_, row) in enumerate(current_df.iterrows()):
-        if row['start_pos'] == row['end_pos']:
-            a_dep[index] = '--'
-            a_arr[index] = '--'
-        if (row['start_pos'] != row['end_pos'] and
-                a_dep[index] == a_arr[index]  and a_arr[index] == 0):
-            a_dep[index] = 'ActErr'
-            a_arr[index] = 'ActErr'
-            show_act_err_logs = True
-
-    df = pd.DataFrame({
-        'e_dep': current_df['e_dep'],
-        'a_dep': a_dep,
-        'l_arr': current_df['l_arr'],
-        'a_arr': a_arr,
-    })
-
-    header = ("|          |      Departure    |     Arrival     |\n"
-              "| Train ID | Earliest | Actual | Latest | Actual |")
-    divider = "|----------|----------|--------|--------|--------|"
-
-    new_rows = [format_row(index, row) for index, row in df.iterrows()]
+    table, act_err = timetable(current_paths, get_trains())
+    if act_err:
+        show_act_err_logs = True
 
     with open('data/info_text.txt', "w") as file:
-        file.write(header + "\n")
-        file.write(divider + "\n")
-        file.writelines(new_row + "\n" for new_row in new_rows)
+        file.write(timetable_text(table))
 
 def get_load_info():
     """Prepares the info of the loaded environment.
@@ -7036,21 +7038,9 @@ def load_user_data_from_file():
     """
     global user_params, user_params_backup
 
-    with open('data/user_params.json', 'r') as file:
-        data = json.load(file)
-
-    if data['speedMap'] is not None:
-        data['speedMap'] = {float(k): float(v) for k, v in data['speedMap'].items()}
-    if data['malfunction'] is not None:
-        data['malfunction'] = (data['malfunction'][0], data['malfunction'][1])
-
-    user_params = data
-    user_params_backup = data
-
-    # use default if no user parameters given
-    for key in user_params:
-        if user_params[key] is None or user_params[key] == []:
-            user_params[key] = default_params[key]
+    # use default if no user parameters given, also for missing keys
+    user_params = load_params('data/user_params.json')
+    user_params_backup = user_params
 
 def load_env_from_file():
     """Load an environment from a .lp file.
@@ -7084,6 +7074,8 @@ def load_env_from_file():
             for the modify mode.
 
     """
+    from code.build_png import create_custom_env, save_png
+
     global current_array, current_df, current_img, env_counter, \
         current_builder_backup_array, current_builder_backup_df, \
         current_modify_backup_array, current_modify_backup_df
@@ -7172,7 +7164,7 @@ def load_env_from_file():
     delete_tmp_frames()
     env_counter += 1
     os.makedirs("data", exist_ok=True)
-    if save_png(env, "data/running_tmp.png") == -1:
+    if save_png(env, "data/running_tmp.png", native=user_params.get("nativeRender", False)) == -1:
         if last_menu == 'start':
             labels['start_load_status_label'].label.config(
                 text='Flatland failed to create image.\n'
@@ -1,4 +1,10 @@
 import sys
+import json
+import argparse
+import threading
+
+# Result of the background render test
+render_test = {'thread': None, 'error': None}
 
 def import_error_handling(missing_modules):
     """Handles missing module errors by printing instructions and exiting the program.
@@ -33,33 +39,61 @@ def initial_import_authorization():
         import_error_handling(missing_modules)
 
 
-def initial_render_authorization():
-    """Ensures that Flatland can render a simple image.
+def initial_render_test_thread():
+    """Runs initial_render_test from code.build_png and records a fatal error.
 
-    Imports and runs initial_render_test from code.build_png.
-    Exits the program if an OverflowError is encountered.
+    Only an OverflowError marks the launch as abnormal, other errors are warnings.
     """
     try:
         from code.build_png import initial_render_test
         initial_render_test()
     except OverflowError as e:
+        render_test['error'] = e
+    except Exception as e:
+        print(f'⚠️ Warning: Render test failed.\n{type(e).__name__}: {e}')
+
+
+def initial_render_authorization():
+    """Ensures that Flatland can render a simple image.
+
+    Starts initial_render_test on a background thread, so the window
+    opens without waiting for Flatland to load and render.
+    """
+    render_test['error'] = None
+    render_test['thread'] = threading.Thread(target=initial_render_test_thread, daemon=True)
+    render_test['thread'].start()
+
+
+def check_render_authorization(window):
+    """Waits for the background render test and closes the program if it failed.
+
+    Args:
+        window (Window): Program window.
+    """
+    if render_test['thread'].is_alive():
+        window.window.after(250, check_render_authorization, window)
+        return
+    if render_test['error'] is not None:
         # If rendering fails, print error and exit
-        print(f'❌ Error: Launch abnormal. Please try again.\n{e}')
-        sys.exit()
+        print(f'❌ Error: Launch abnormal. Please try again.\n{render_test["error"]}')
+        window.close_window()
 
 
 def start_clingonia():
     """Starts the Clingonia application.
 
     Removes temporary data and initializes the Flatland window, start menu, and simulation.
+    The render test runs once the window is up.
     Exits the program if an exception occurs.
     """
     try:
-        from code.views import build_flatland_window, create_start_menu, start_flatland
+        from code.views import build_flatland_window, create_start_menu, start_flatland, windows
         from code.files import remove_data_remnants
         remove_data_remnants()
         build_flatland_window()
         create_start_menu()
+        initial_render_authorization()  # Test that rendering pipeline is functional
+        check_render_authorization(windows['flatland_window'])
         start_flatland()
     except Exception as e:
         # If any error occurs during startup, print error and exit
@@ -67,11 +101,117 @@ def start_clingonia():
         sys.exit()
 
 
+def run_gen_batch(args):
+    """Generates a batch of environments without the graphical interface.
+
+    The sweep file holds base parameters in the format of data/user_params.json
+    under "params" and lists of values per parameter under "sweep".
+
+    Args:
+        args (argparse.Namespace): Parsed command line arguments.
+    """
+    from code.files import parse_params
+    from code.batch_gen import gen_batch
+    with open(args.sweep, 'r') as file:
+        config = json.load(file)
+    params = parse_params(config.get('params', {}))
+    gen_batch(params, config.get('sweep', {}), args.out, args.workers, args.png)
+
+
+def run_pipeline(args):
+    """Loads, solves, validates and renders environments without the graphical interface.
+
+    Args:
+        args (argparse.Namespace): Parsed command line arguments.
+    """
+    from code.files import load_params
+    from code.pipeline import run_pipeline
+    params = load_params(args.params)
+    run_pipeline(params, args.envs, args.out, args.gif)
+
+
+def run_solve_batch(args):
+    """Solves directories of environments across a worker pool.
+
+    Args:
+        args (argparse.Namespace): Parsed command line arguments.
+    """
+    from code.files import load_params
+    from code.batch_solve import solve_batch
+    params = load_params(args.params)
+    solve_batch(params, args.envs, args.out, args.workers, args.time_limit, args.parquet, args.fresh)
+
+
+def run_bench_startup(args):
+    """Benchmarks the program startup and optionally saves the results.
+
+    Args:
+        args (argparse.Namespace): Parsed command line arguments.
+    """
+    from code.startup_bench import bench_startup
+    results = bench_startup(args.repeat)
+    if args.out:
+        results.to_csv(args.out, index=False)
+        print(f"✅ Results saved in {args.out}.")
+
+
+def parse_args(argv):
+    """Parses the command line arguments.
+
+    Args:
+        argv (list[str]): Command line arguments without the program name.
+
+    Returns:
+        argparse.Namespace: Parsed arguments, command is None for the graphical interface.
+    """
+    parser = argparse.ArgumentParser(
+        prog='main.py',
+        description='Clingonia. Starts the graphical interface without a command.'
+    )
+    commands = parser.add_subparsers(dest='command')
+    gen_batch = commands.add_parser('gen-batch', help='generate a sweep of environments headlessly')
+    gen_batch.add_argument('sweep', help='JSON file with "params" and "sweep"')
+    gen_batch.add_argument('--out', default='data/batch', help='output directory (default: data/batch)')
+    gen_batch.add_argument('--workers', type=int, default=None, help='worker processes (default: CPU count)')
+    gen_batch.add_argument('--png', action='store_true', help='save a PNG of every environment')
+    run = commands.add_parser('run', help='load, solve, validate and render environments headlessly')
+    run.add_argument('envs', nargs='+', help='environment .lp files or directories containing them')
+    run.add_argument('--params', default='data/user_params.json',
+                     help='JSON file in the format of data/user_params.json (default: data/user_params.json)')
+    run.add_argument('--out', default='data/runs', help='output directory (default: data/runs)')
+    run.add_argument('--gif', action='store_true', help='render a GIF of every solution')
+    solve = commands.add_parser('solve-batch', help='solve directories of environments with a worker pool')
+    solve.add_argument('envs', nargs='+', help='environment .lp files or directories containing them')
+    solve.add_argument('--params', default='data/user_params.json',
+                       help='JSON file in the format of data/user_params.json (default: data/user_params.json)')
+    solve.add_argument('--out', default='data/solve', help='output directory (default: data/solve)')
+    solve.add_argument('--workers', type=int, default=None, help='worker processes (default: CPU count)')
+    solve.add_argument('--time-limit', type=int, default=None, help='seconds per environment')
+    solve.add_argument('--parquet', action='store_true', help='also save the report as Parquet')
+    solve.add_argument('--fresh', action='store_true', help='solve all environments again instead of resuming')
+    bench_startup = commands.add_parser('bench-startup', help='benchmark the startup stages')
+    bench_startup.add_argument('--repeat', type=int, default=5, help='runs per stage (default: 5)')
+    bench_startup.add_argument('--out', default=None, help='CSV file for the results')
+    return parser.parse_args(argv)
+
+
 def main():
-    """Performs initial authorizations and starts the application.
+    """Performs initial authorizations and starts the application or a command.
     """
+    args = parse_args(sys.argv[1:])
     initial_import_authorization()  # Check for required Python modules
-    initial_render_authorization()  # Test that rendering pipeline is functional
+    if args.command == 'gen-batch':
+        run_gen_batch(args)
+        return
+    if args.command == 'run':
+        run_pipeline(args)
+        return
+    if args.command == 'solve-batch':
+        run_solve_batch(args)
+        return
+    if args.command == 'bench-startup':
+        run_bench_startup(args)
+        return
     start_clingonia()
 
 